@@ -0,0 +1,171 @@
+"""Measure the cost of building per-channel agent trees against cache hits.
+
+Usage:
+    python -m benchmarks.agent_trees
+    python -m benchmarks.agent_trees --profiles 50 --cache-size 8 --requests 2000
+    python -m benchmarks.agent_trees --largest-tree   # every parallel mode enabled
+
+Every profile is a distinct ``ChannelInfo``. The report has:
+
+- the time to build a tree for a channel that is not cached (a miss);
+- the time to look up a cached tree (a hit);
+- the memory each cached tree holds, traced while ``--profiles`` trees are
+  built and kept;
+- the hit rate and total build time of ``--requests`` lookups spread over the
+  profiles with a Zipf-like skew, through a cache of ``--cache-size`` trees;
+- one stubbed root agent turn for each of ``--sessions`` channels, run
+  concurrently in this process.
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import gc
+import json
+import random
+import statistics
+import time
+import tracemalloc
+from typing import Any, Dict, List
+
+from google.adk.agents import BaseAgent
+
+from script_writer_agent.agent import create_root_agent
+from script_writer_agent.agent_factory import AgentTreeCache
+from script_writer_agent.config import ChannelInfo, config
+
+from .common import llm_agents, run_agent
+from .stub_model import StubLlm
+
+
+def channel_profiles(count: int) -> List[ChannelInfo]:
+    return [
+        dataclasses.replace(
+            config.channel_info,
+            channel_name=f"Channel {index}",
+            creator_name=f"Creator {index}",
+            target_audience=f"Audience segment {index}",
+            expertise_areas=[f"Topic {index}", f"Topic {index + 1}"],
+        )
+        for index in range(count)
+    ]
+
+
+def count_agents(agent: BaseAgent) -> int:
+    return 1 + sum(count_agents(sub_agent) for sub_agent in agent.sub_agents)
+
+
+def _milliseconds(values: List[float]) -> Dict[str, float]:
+    return {
+        "median_ms": round(statistics.median(values) * 1000, 4),
+        "max_ms": round(max(values) * 1000, 4),
+    }
+
+
+def measure_lookups(profiles: List[ChannelInfo]) -> Dict[str, Any]:
+    cache = AgentTreeCache(max_trees=len(profiles))
+    misses, hits = [], []
+    for profile in profiles:
+        started = time.perf_counter()
+        cache.get(profile)
+        misses.append(time.perf_counter() - started)
+    for profile in profiles:
+        started = time.perf_counter()
+        cache.get(profile)
+        hits.append(time.perf_counter() - started)
+    return {
+        "miss": _milliseconds(misses),
+        "hit": _milliseconds(hits),
+        "speedup": round(statistics.median(misses) / statistics.median(hits)),
+    }
+
+
+def measure_memory(profiles: List[ChannelInfo]) -> Dict[str, Any]:
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    trees = [create_root_agent(profile) for profile in profiles]
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return {
+        "trees": len(trees),
+        "kib_per_tree": round(held / len(trees) / 1024, 1),
+        "total_mib": round(held / 2**20, 2),
+    }
+
+
+def measure_workload(
+    profiles: List[ChannelInfo], cache_size: int, requests: int, seed: int
+) -> Dict[str, Any]:
+    cache = AgentTreeCache(max_trees=cache_size)
+    generator = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(profiles))]
+    started = time.perf_counter()
+    for profile in generator.choices(profiles, weights=weights, k=requests):
+        cache.get(profile)
+    stats = cache.stats()
+    stats["seconds"] = round(time.perf_counter() - started, 3)
+    return stats
+
+
+async def measure_sessions(profiles: List[ChannelInfo]) -> Dict[str, Any]:
+    cache = AgentTreeCache(max_trees=len(profiles))
+    trees = [cache.get(profile) for profile in profiles]
+    for tree in trees:
+        for agent in llm_agents(tree):
+            agent.model = StubLlm(latency_seconds=0.2, output_chars=200)
+
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(
+            run_agent(tree, "Hello", session_id=f"channel-{index}")
+            for index, tree in enumerate(trees)
+        )
+    )
+    return {
+        "channels": len(trees),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profiles", type=int, default=20)
+    parser.add_argument("--cache-size", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--largest-tree",
+        action="store_true",
+        help="enable the parallel research, writing and directing agents",
+    )
+    args = parser.parse_args()
+
+    if args.largest_tree:
+        config.parallel_research = True
+        config.parallel_script_writing = True
+        config.pipelined_directing = True
+
+    profiles = channel_profiles(args.profiles)
+    # The first build imports the sub-agent modules, which is not a per-tree cost
+    create_root_agent(config.channel_info)
+
+    report = {
+        "profiles": args.profiles,
+        "agents_per_tree": count_agents(create_root_agent(config.channel_info)),
+        "lookup": measure_lookups(profiles),
+        "memory": measure_memory(profiles),
+        "workload": {
+            "cache_size": args.cache_size,
+            "requests": args.requests,
+            **measure_workload(profiles, args.cache_size, args.requests, args.seed),
+        },
+        "concurrent_sessions": await measure_sessions(profiles[: args.sessions]),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
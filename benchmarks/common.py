@@ -0,0 +1,70 @@
+"""Helpers shared by the benchmark scripts"""
+
+import statistics
+import time
+from typing import Any, Dict, List, Optional
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+APP_NAME = "script_writer_benchmark"
+USER_ID = "benchmark"
+
+
+def llm_agents(agent: BaseAgent) -> List[LlmAgent]:
+    """Return every LlmAgent in the tree rooted at ``agent``"""
+    found = [agent] if isinstance(agent, LlmAgent) else []
+    for sub_agent in agent.sub_agents:
+        found.extend(llm_agents(sub_agent))
+    return found
+
+
+async def run_agent(
+    agent: BaseAgent,
+    message: str,
+    state: Optional[Dict[str, Any]] = None,
+    session_service: Optional[InMemorySessionService] = None,
+    session_id: str = "benchmark",
+) -> Dict[str, Any]:
+    """Run ``agent`` once in a fresh session and return the final session state"""
+    session_service = session_service or InMemorySessionService()
+    await session_service.create_session(
+        app_name=APP_NAME, user_id=USER_ID, session_id=session_id, state=state or {}
+    )
+    runner = Runner(agent=agent, app_name=APP_NAME, session_service=session_service)
+    async for _ in runner.run_async(
+        user_id=USER_ID,
+        session_id=session_id,
+        new_message=types.Content(role="user", parts=[types.Part(text=message)]),
+    ):
+        pass
+    session = await session_service.get_session(
+        app_name=APP_NAME, user_id=USER_ID, session_id=session_id
+    )
+    return session.state
+
+
+async def time_runs(
+    agent: BaseAgent,
+    message: str,
+    runs: int,
+    state: Optional[Dict[str, Any]] = None,
+) -> List[float]:
+    """Return wall-clock seconds for ``runs`` independent runs of ``agent``"""
+    timings = []
+    for index in range(runs):
+        started = time.perf_counter()
+        await run_agent(agent, message, state=state, session_id=f"run-{index}")
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def summarize(timings: List[float]) -> Dict[str, float]:
+    """Return min/median/max of a list of timings in seconds"""
+    return {
+        "min": round(min(timings), 3),
+        "median": round(statistics.median(timings), 3),
+        "max": round(max(timings), 3),
+    }
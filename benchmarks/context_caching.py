@@ -0,0 +1,148 @@
+"""Measure how many prompt tokens provider-side context caching moves to the cache.
+
+Usage:
+    python -m benchmarks.context_caching            # offline, local cache backend
+    python -m benchmarks.context_caching --live     # against the configured Gemini model
+
+Every session runs the researcher, planner, writer and director once. The
+uncached pass sends each agent's full system instruction on every call; the
+cached pass references one cached content per agent instruction, created on
+the first session and reused by all later ones.
+"""
+
+import argparse
+import asyncio
+import json
+from typing import Any, Dict, List, Optional
+
+from google.adk.agents import LlmAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmResponse
+from google.adk.sessions import InMemorySessionService
+
+from script_writer_agent.context_cache import (
+    ContextCache,
+    GeminiContextCacheBackend,
+    LocalContextCacheBackend,
+)
+from script_writer_agent.config import config
+from script_writer_agent.sub_agents.researcher import create_researcher
+from script_writer_agent.sub_agents.script_director import create_script_director
+from script_writer_agent.sub_agents.script_panner import create_script_panner
+from script_writer_agent.sub_agents.script_writer import create_script_writer
+
+from .common import run_agent
+from .stub_model import StubLlm
+
+STAGE_AGENTS = [
+    create(config.channel_info)
+    for create in (
+        create_researcher,
+        create_script_panner,
+        create_script_writer,
+        create_script_director,
+    )
+]
+
+
+class UsageCollector:
+    """Sums the token usage reported by every model response"""
+
+    def __init__(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+
+    def after_model_callback(
+        self, callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> Optional[LlmResponse]:
+        usage = llm_response.usage_metadata
+        if usage is not None and not llm_response.partial:
+            self.calls += 1
+            self.prompt_tokens += usage.prompt_token_count or 0
+            self.cached_tokens += usage.cached_content_token_count or 0
+        return None
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "cached_tokens": self.cached_tokens,
+            "uncached_tokens": self.prompt_tokens - self.cached_tokens,
+        }
+
+
+def stage_agents(
+    collector: UsageCollector,
+    cache: Optional[ContextCache],
+    model: Any,
+) -> List[LlmAgent]:
+    """Copy the stage agents with the benchmark callbacks installed"""
+    return [
+        agent.model_copy(
+            update={
+                "parent_agent": None,
+                "model": model or agent.model,
+                "before_model_callback": cache.before_model_callback if cache else None,
+                "after_model_callback": collector.after_model_callback,
+            }
+        )
+        for agent in STAGE_AGENTS
+    ]
+
+
+async def run_sessions(
+    sessions: int, topic: str, cache: Optional[ContextCache], model: Any
+) -> Dict[str, Any]:
+    collector = UsageCollector()
+    agents = stage_agents(collector, cache, model)
+    for index in range(sessions):
+        session_service = InMemorySessionService()
+        for agent in agents:
+            await run_agent(
+                agent,
+                topic,
+                state={"research_topic": topic},
+                session_service=session_service,
+                session_id=f"session-{index}-{agent.name}",
+            )
+    return collector.report()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--live", action="store_true", help="call the real model")
+    parser.add_argument("--sessions", type=int, default=5)
+    parser.add_argument("--topic", default="MLflow model registry")
+    parser.add_argument("--min-tokens", type=int, default=1024)
+    args = parser.parse_args()
+
+    if args.live:
+        backend = GeminiContextCacheBackend()
+        model = None
+    else:
+        backend = LocalContextCacheBackend()
+        model = StubLlm(latency_seconds=0.0, cache_backend=backend)
+
+    cache = ContextCache(backend=backend, min_tokens=args.min_tokens)
+    uncached = await run_sessions(args.sessions, args.topic, None, model)
+    cached = await run_sessions(args.sessions, args.topic, cache, model)
+    print(
+        json.dumps(
+            {
+                "mode": "live" if args.live else "stub",
+                "sessions": args.sessions,
+                "uncached": uncached,
+                "cached": cached,
+                "cache": cache.stats(),
+                "uncached_token_reduction": round(
+                    1 - cached["uncached_tokens"] / uncached["uncached_tokens"], 3
+                ),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
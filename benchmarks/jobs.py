@@ -0,0 +1,138 @@
+"""Drive the job service end to end with stub models.
+
+Usage:
+    python -m benchmarks.jobs
+    python -m benchmarks.jobs --jobs 200 --workers 16 --queue-size 20 --latency 0.05
+
+Every model in the tree is replaced by a stub, as in ``benchmarks.pipeline``.
+``--jobs`` jobs are submitted as fast as the bounded queue accepts them, so
+the producer is held back once ``--queue-size`` jobs are waiting. One job is
+cancelled while it runs and one while it is queued. The report gives the
+throughput, the job latency, the peak queue depth and in-flight gauges
+sampled while the jobs ran, and checks that every finished job has all stage
+outputs in its session state.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Any, Dict, List
+
+from script_writer_agent.config import config
+
+from .pipeline import install_stub_models
+
+
+async def sample_gauges(service: Any, samples: List[Dict[str, Any]]) -> None:
+    while True:
+        samples.append(service.stats())
+        await asyncio.sleep(0.01)
+
+
+async def cancel_after_first_stage(service: Any, job: Any) -> None:
+    while job.status in ("queued", "running") and not job.completed_stages:
+        await asyncio.sleep(0.001)
+    service.cancel(job.id)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--queue-size", type=int, default=10)
+    parser.add_argument("--topic", default="MLflow model registry")
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--search-latency", type=float, default=0.0)
+    parser.add_argument("--searches", type=int, default=1)
+    parser.add_argument(
+        "--search-cache",
+        action="store_true",
+        help="keep search results in memory, so later jobs reuse them",
+    )
+    parser.add_argument("--output-chars", type=int, default=4000)
+    parser.add_argument("--chars-per-second", type=float, default=1e9)
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.jobs <= args.workers + 1:
+        # One job is cancelled while running and one while queued behind the workers
+        parser.error("--jobs must be greater than --workers + 1")
+
+    # The agent tree reads these when it is built, so set them first
+    config.research_cache_enabled = False
+    config.stage_cache_enabled = False
+    from script_writer_agent.agent import build_root_agent
+    from script_writer_agent.jobs import CANCELLED, DONE, JobService
+    from script_writer_agent.pipeline import ScriptPipeline
+
+    root_agent = build_root_agent()
+    install_stub_models(root_agent, args)
+    pipeline = ScriptPipeline(root_agent)
+    service = JobService(
+        pipeline,
+        workers=args.workers,
+        queue_size=args.queue_size,
+        history_size=args.jobs,
+    ).start()
+
+    samples: List[Dict[str, Any]] = []
+    sampler = asyncio.ensure_future(sample_gauges(service, samples))
+    started = time.perf_counter()
+    submit_waits = []
+    jobs = []
+    for index in range(args.jobs):
+        submitted = time.perf_counter()
+        jobs.append(await service.submit(f"{args.topic} #{index}"))
+        submit_waits.append(time.perf_counter() - submitted)
+        if index == 0:
+            canceller = asyncio.ensure_future(
+                cancel_after_first_stage(service, jobs[0])
+            )
+        if index == args.workers + 1:
+            # Still waiting in the queue behind the first batch
+            service.cancel(jobs[-1].id)
+
+    await asyncio.gather(canceller, *(service.wait(job.id) for job in jobs))
+    elapsed = time.perf_counter() - started
+    sampler.cancel()
+    await service.close()
+
+    done = [job for job in jobs if job.status == DONE]
+    complete = 0
+    for job in done:
+        result = await service.result(job.id)
+        complete += all(result.values())
+    latencies = [job.finished_at - job.submitted_at for job in done]
+
+    print(
+        json.dumps(
+            {
+                "jobs": args.jobs,
+                "workers": args.workers,
+                "queue_size": args.queue_size,
+                "seconds": round(elapsed, 3),
+                "jobs_per_second": round(len(done) / elapsed, 1),
+                "latency_seconds": {
+                    "p50": round(statistics.median(latencies), 3),
+                    "max": round(max(latencies), 3),
+                },
+                "max_submit_wait_seconds": round(max(submit_waits), 3),
+                "peak_queue_depth": max(s["queue_depth"] for s in samples),
+                "peak_in_flight": max(s["in_flight"] for s in samples),
+                "cancelled": {
+                    "running": jobs[0].status == CANCELLED,
+                    "running_after_stages": jobs[0].completed_stages,
+                    "queued": jobs[args.workers + 1].status == CANCELLED,
+                },
+                "jobs_with_all_outputs": f"{complete}/{len(done)}",
+                "stats": service.stats(),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,262 @@
+"""Drive full root-agent sessions offline and report per-stage timings and memory.
+
+Usage:
+    python -m benchmarks.pipeline                          # pure orchestration overhead
+    python -m benchmarks.pipeline --latency 0.5 --search-latency 1.5
+    python -m benchmarks.pipeline --parallel-research --parallel-script-writing
+
+Every model in the tree is replaced by a scripted stub. The root agent's
+stub transfers each user turn to the stage agent, as Gemini would. The
+planner returns a valid outline, the editor approves it, and every other
+agent returns filler markdown of the configured size. Agents that have the
+``web_search`` tool first call it ``--searches`` times. The calls go through
+the real tool, its search budget and spacing and the shared search cache;
+only the grounded Gemini call behind it is stubbed and takes
+``--search-latency``. Search results are only cached across sessions with
+``--search-cache``.
+
+Each session sends one user turn per stage: research, plan, edit, write and
+direct. The report gives the median wall time, the simulated model time and
+the peak traced memory per stage and end to end.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import tracemalloc
+from typing import Any, AsyncGenerator, Dict, List, Tuple
+
+from google.adk.models import LlmResponse
+from google.adk.models.llm_request import LlmRequest
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from script_writer_agent.config import config
+
+from .common import APP_NAME, USER_ID, llm_agents
+from .stub_model import (
+    SAMPLE_OUTLINE,
+    SAMPLE_OUTLINE_JSON,
+    StubLlm,
+    install_stub_search,
+)
+
+# (stage, agent the root transfers to, user message)
+STAGE_TURNS: List[Tuple[str, str, str]] = [
+    ("research", "robust_researcher", "Research the topic: {topic}"),
+    ("plan", "robust_script_panner", "Create a script outline about: {topic}"),
+    ("edit", "robust_script_editor", "Validate the script outline."),
+    ("write", "robust_script_writer", "Write the script from the outline."),
+    ("direct", "robust_script_director", "Create the production script."),
+]
+
+APPROVED_RESULT = """**COMPLIANCE STATUS: APPROVED**
+
+All guidelines are met."""
+
+APPROVED_RESULT_JSON = '{"status": "APPROVED", "summary": "All guidelines are met."}'
+
+
+class RootStubLlm(StubLlm):
+    """Transfers each user turn to the stage agent its message belongs to"""
+
+    routes: Dict[str, str] = {}
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        self.calls += 1
+        self.busy_seconds += self.latency_seconds
+        await asyncio.sleep(self.latency_seconds)
+
+        last = llm_request.contents[-1] if llm_request.contents else None
+        message = "".join(part.text or "" for part in (last.parts if last else []))
+        target = self.routes.get(message)
+        if target is None:
+            part = types.Part(text="Done.")
+        else:
+            part = types.Part(
+                function_call=types.FunctionCall(
+                    name="transfer_to_agent", args={"agent_name": target}
+                )
+            )
+        yield LlmResponse(content=types.Content(role="model", parts=[part]))
+
+
+class FixedStubLlm(StubLlm):
+    """Returns the same text on every call"""
+
+    text: str = ""
+
+    def response_text(self, llm_request: LlmRequest) -> str:
+        return self.text
+
+
+def install_stub_models(root_agent: Any, args: argparse.Namespace) -> List[StubLlm]:
+    """Give every agent in the tree its own stub model and stub the search backend"""
+    install_stub_search(args.search_latency, cache=args.search_cache)
+    common = {
+        "latency_seconds": args.latency,
+        "chars_per_second": args.chars_per_second,
+    }
+    root_agent.model = RootStubLlm(
+        latency_seconds=args.latency,
+        routes={
+            message.format(topic=args.topic): agent for _, agent, message in STAGE_TURNS
+        },
+    )
+    stubs = [root_agent.model]
+    for agent in llm_agents(root_agent):
+        if agent is root_agent:
+            continue
+        searches = args.searches if agent.tools else 0
+        # Every agent runs its own queries
+        common["search_prefix"] = f"{agent.name} query"
+        if agent.name == "script_panner":
+            outline = (
+                SAMPLE_OUTLINE_JSON if config.structured_outputs else SAMPLE_OUTLINE
+            )
+            agent.model = FixedStubLlm(text=outline, searches=searches, **common)
+        elif agent.name == "script_editor":
+            result = (
+                APPROVED_RESULT_JSON if config.structured_outputs else APPROVED_RESULT
+            )
+            agent.model = FixedStubLlm(text=result, searches=0, **common)
+        else:
+            agent.model = StubLlm(
+                output_chars=args.output_chars, searches=searches, **common
+            )
+        stubs.append(agent.model)
+    return stubs
+
+
+async def run_session(
+    runner: Runner,
+    session_service: InMemorySessionService,
+    session_id: str,
+    topic: str,
+    stubs: List[StubLlm],
+) -> Dict[str, Dict[str, float]]:
+    """Run one session turn by turn and measure every stage"""
+    # The stub root does not call set_research_topic, so the topic is preset
+    await session_service.create_session(
+        app_name=APP_NAME,
+        user_id=USER_ID,
+        session_id=session_id,
+        state={"research_topic": topic},
+    )
+    timings = {}
+    for stage, agent_name, message in STAGE_TURNS:
+        busy_before = sum(stub.busy_seconds for stub in stubs)
+        tracemalloc.reset_peak()
+        started = time.perf_counter()
+        authors = set()
+        async for event in runner.run_async(
+            user_id=USER_ID,
+            session_id=session_id,
+            new_message=types.Content(
+                role="user", parts=[types.Part(text=message.format(topic=topic))]
+            ),
+        ):
+            authors.add(event.author)
+        wall_seconds = time.perf_counter() - started
+        if agent_name not in authors:
+            raise RuntimeError(f"Stage '{stage}' never reached {agent_name}")
+
+        timings[stage] = {
+            "wall_seconds": wall_seconds,
+            "model_seconds": sum(stub.busy_seconds for stub in stubs) - busy_before,
+            "peak_mb": tracemalloc.get_traced_memory()[1] / 2**20,
+        }
+    return timings
+
+
+def median_report(sessions: List[Dict[str, Dict[str, float]]]) -> Dict[str, Any]:
+    report: Dict[str, Any] = {}
+    for stage, _, _ in STAGE_TURNS:
+        report[stage] = {
+            metric: round(statistics.median(s[stage][metric] for s in sessions), 4)
+            for metric in ("wall_seconds", "model_seconds", "peak_mb")
+        }
+    report["end_to_end"] = {
+        "wall_seconds": round(
+            statistics.median(
+                sum(stage["wall_seconds"] for stage in s.values()) for s in sessions
+            ),
+            4,
+        ),
+        "model_seconds": round(
+            statistics.median(
+                sum(stage["model_seconds"] for stage in s.values()) for s in sessions
+            ),
+            4,
+        ),
+        "peak_mb": round(
+            max(stage["peak_mb"] for s in sessions for stage in s.values()), 4
+        ),
+    }
+    return report
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=5)
+    parser.add_argument("--topic", default="MLflow model registry")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--search-latency", type=float, default=0.0)
+    parser.add_argument("--searches", type=int, default=1)
+    parser.add_argument(
+        "--search-cache",
+        action="store_true",
+        help="keep search results in memory, so later sessions reuse them",
+    )
+    parser.add_argument("--output-chars", type=int, default=4000)
+    parser.add_argument("--chars-per-second", type=float, default=1e9)
+    parser.add_argument("--parallel-research", action="store_true")
+    parser.add_argument("--parallel-script-writing", action="store_true")
+    args = parser.parse_args()
+
+    # The agent tree reads these when it is built, so set them first
+    config.parallel_research = args.parallel_research
+    config.parallel_script_writing = args.parallel_script_writing
+    config.research_cache_enabled = False
+    config.stage_cache_enabled = False
+    from script_writer_agent.agent import build_root_agent
+    from script_writer_agent.search_budget import search_budget
+    from script_writer_agent.search_cache import search_cache
+
+    root_agent = build_root_agent()
+    stubs = install_stub_models(root_agent, args)
+    session_service = InMemorySessionService()
+    runner = Runner(
+        agent=root_agent, app_name=APP_NAME, session_service=session_service
+    )
+
+    tracemalloc.start()
+    sessions = [
+        await run_session(runner, session_service, f"session-{i}", args.topic, stubs)
+        for i in range(args.sessions)
+    ]
+    tracemalloc.stop()
+
+    print(
+        json.dumps(
+            {
+                "sessions": args.sessions,
+                "model_calls": sum(stub.calls for stub in stubs),
+                "searches": {
+                    **search_cache.stats(),
+                    "budget_exhausted": search_budget.exhausted,
+                },
+                "median": median_report(sessions),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,89 @@
+"""Compare the serial researcher against the parallel per-platform research mode.
+
+Usage:
+    python -m benchmarks.research_modes            # offline, with stub models
+    python -m benchmarks.research_modes --live     # against the configured Gemini model
+
+The offline mode gives every agent its own stub model and stubs the backend
+of the web_search tool. The serial researcher runs one search per platform
+and writes the full report. Each platform researcher runs one search and
+writes a quarter of the report, and the merger writes the full report again
+without searching. Search results are not cached between runs.
+"""
+
+import argparse
+import asyncio
+import json
+
+from script_writer_agent.config import config
+from script_writer_agent.sub_agents.parallel_researcher import (
+    create_parallel_researcher,
+)
+from script_writer_agent.sub_agents.researcher import create_researcher
+
+from .common import summarize, time_runs
+from .stub_model import StubLlm, install_stub_search
+
+researcher = create_researcher(config.channel_info)
+parallel_researcher = create_parallel_researcher(config.channel_info)
+platform_researchers = parallel_researcher.find_agent("platform_research").sub_agents
+research_merger = parallel_researcher.find_agent("research_merger")
+
+
+def install_stub_models(args: argparse.Namespace) -> None:
+    install_stub_search(args.search_latency)
+
+    def stub(name: str, searches: int, output_chars: int) -> StubLlm:
+        return StubLlm(
+            latency_seconds=args.latency,
+            searches=searches,
+            search_prefix=f"{name} query",
+            output_chars=output_chars,
+            chars_per_second=args.chars_per_second,
+        )
+
+    researcher.model = stub(
+        researcher.name, len(platform_researchers), args.report_chars
+    )
+    for platform_researcher in platform_researchers:
+        platform_researcher.model = stub(
+            platform_researcher.name, 1, args.report_chars // len(platform_researchers)
+        )
+    research_merger.model = stub(research_merger.name, 0, args.report_chars)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--live", action="store_true", help="call the real model")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--topic", default="Research the topic: MLflow model registry")
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--search-latency", type=float, default=1.5)
+    parser.add_argument("--report-chars", type=int, default=6000)
+    parser.add_argument("--chars-per-second", type=float, default=1500.0)
+    args = parser.parse_args()
+
+    if not args.live:
+        install_stub_models(args)
+
+    serial = await time_runs(researcher, args.topic, args.runs)
+    parallel = await time_runs(parallel_researcher, args.topic, args.runs)
+
+    serial_median = summarize(serial)["median"]
+    parallel_median = summarize(parallel)["median"]
+    print(
+        json.dumps(
+            {
+                "mode": "live" if args.live else "stub",
+                "runs": args.runs,
+                "serial_seconds": summarize(serial),
+                "parallel_seconds": summarize(parallel),
+                "speedup": round(serial_median / parallel_median, 2),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,166 @@
+"""Measure how much research context retrieval removes from prompts, and what it keeps.
+
+Usage:
+    python -m benchmarks.research_retrieval
+    python -m benchmarks.research_retrieval --subtopics 12 --paragraphs 3 --top-k 4
+
+A synthetic research report has one section per platform and, in each, a few
+paragraphs and a source list for every subtopic. Each paragraph carries a
+marker fact for its platform and subtopic. The planner query is the topic;
+every section query is a roadmap point about one subtopic, like the plans
+the section writers get.
+
+The report compares the research text each agent is sent: the whole findings,
+shortened by state compaction as before, against the retrieved snippets. It
+also gives the share of a section's marker facts that were retrieved (recall)
+and the share of retrieved snippets about the section's subtopic (precision),
+plus the time to index the report and to answer a query.
+"""
+
+import argparse
+import json
+import statistics
+import time
+from typing import Dict, List
+
+from script_writer_agent.config import config
+from script_writer_agent.research_index import (
+    ResearchIndex,
+    chunk_research,
+    retrieve_research,
+)
+from script_writer_agent.state_compaction import compact_markdown
+
+PLATFORMS = ["YouTube", "Google", "StackOverflow", "Reddit"]
+
+SUBTOPICS = [
+    "model registry versioning",
+    "feature store freshness",
+    "drift monitoring alerts",
+    "canary deployment traffic",
+    "experiment tracking lineage",
+    "data validation schemas",
+    "GPU autoscaling costs",
+    "rollback strategy incidents",
+    "batch inference scheduling",
+    "shadow testing comparisons",
+    "latency budget profiling",
+    "access control auditing",
+]
+
+PARAGRAPH = (
+    "On {platform}, practitioners discussing {subtopic} report that teams "
+    "underestimate the operational work involved. Fact {marker}: the most "
+    "upvoted answers recommend automating {subtopic} checks early and keeping "
+    "them in the deployment pipeline, with clear ownership and dashboards."
+)
+
+
+def marker(platform: str, subtopic: str, paragraph: int) -> str:
+    return f"f{PLATFORMS.index(platform)}x{SUBTOPICS.index(subtopic)}x{paragraph}"
+
+
+def synthetic_findings(subtopics: List[str], paragraphs: int) -> str:
+    parts = ["# Research Findings: MLOps in production", ""]
+    for platform in PLATFORMS:
+        parts.extend([f"## {platform}", ""])
+        for subtopic in subtopics:
+            parts.extend([f"### {subtopic.capitalize()}", ""])
+            for index in range(paragraphs):
+                parts.extend(
+                    [
+                        PARAGRAPH.format(
+                            platform=platform,
+                            subtopic=subtopic,
+                            marker=marker(platform, subtopic, index),
+                        ),
+                        "",
+                    ]
+                )
+            slug = subtopic.replace(" ", "-")
+            parts.extend(
+                [
+                    "Sources:",
+                    f"- https://{platform.lower()}.example.com/{slug}/1",
+                    f"- https://{platform.lower()}.example.com/{slug}/2",
+                    "",
+                ]
+            )
+    return "\n".join(parts)
+
+
+def section_query(subtopic: str) -> str:
+    return (
+        "What is the worst mistake for ML engineers shipping models?\n"
+        f"{subtopic.capitalize()}\n"
+        f"### 2. {subtopic.capitalize()}\n"
+        f"- Why {subtopic} fails in production\n"
+        f"- How to automate {subtopic}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--subtopics", type=int, default=8)
+    parser.add_argument("--paragraphs", type=int, default=2)
+    parser.add_argument("--top-k", type=int, default=config.research_top_k)
+    parser.add_argument(
+        "--outline-top-k", type=int, default=config.research_outline_top_k
+    )
+    args = parser.parse_args()
+
+    subtopics = SUBTOPICS[: args.subtopics]
+    findings = synthetic_findings(subtopics, args.paragraphs)
+
+    started = time.perf_counter()
+    index = ResearchIndex(chunk_research(findings))
+    index_ms = (time.perf_counter() - started) * 1000
+
+    compacted = compact_markdown(findings, config.compaction_max_input_chars)
+    planner = retrieve_research(
+        findings, "MLOps in production: worst mistakes", args.outline_top_k
+    )
+
+    recalls, precisions, query_ms, section_chars = [], [], [], []
+    for subtopic in subtopics:
+        query = section_query(subtopic)
+        started = time.perf_counter()
+        snippets = index.search(query, args.top_k)
+        query_ms.append((time.perf_counter() - started) * 1000)
+        text = "\n".join(snippet.text for snippet in snippets)
+        section_chars.append(len(retrieve_research(findings, query, args.top_k)))
+        wanted = [
+            marker(platform, subtopic, paragraph)
+            for platform in PLATFORMS
+            for paragraph in range(args.paragraphs)
+        ]
+        recalls.append(sum(fact in text for fact in wanted) / len(wanted))
+        precisions.append(
+            sum(subtopic.capitalize() in snippet.headings for snippet in snippets)
+            / max(len(snippets), 1)
+        )
+
+    report: Dict[str, object] = {
+        "findings_chars": len(findings),
+        "snippets": len(index.snippets),
+        "index_ms": round(index_ms, 2),
+        "query_ms_median": round(statistics.median(query_ms), 3),
+        "planner_research_chars": {
+            "compacted_findings": len(compacted),
+            "retrieved": len(planner),
+        },
+        "section_research_chars": {
+            "compacted_findings": len(compacted),
+            "retrieved_median": int(statistics.median(section_chars)),
+        },
+        "section_prompt_reduction": round(
+            1 - statistics.median(section_chars) / len(compacted), 3
+        ),
+        "section_fact_recall": round(statistics.mean(recalls), 3),
+        "section_snippet_precision": round(statistics.mean(precisions), 3),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
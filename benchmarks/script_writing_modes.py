@@ -0,0 +1,83 @@
+"""Compare the single-call script writer against section-parallel writing.
+
+Usage:
+    python -m benchmarks.script_writing_modes            # offline, with stub models
+    python -m benchmarks.script_writing_modes --live     # against the configured Gemini model
+
+The offline mode lets the full writer produce the whole script in one call and
+each section writer produce an equal share of it.
+"""
+
+import argparse
+import asyncio
+import json
+
+from script_writer_agent.sub_agents.section_writer import (
+    create_section_parallel_writer,
+    plan_script_sections,
+)
+from script_writer_agent.config import config
+from script_writer_agent.sub_agents.script_writer import (
+    SCRIPT_WRITER_INSTRUCTION,
+    create_script_writer,
+)
+
+from .common import summarize, time_runs
+from .stub_model import SAMPLE_OUTLINE, StubLlm
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--live", action="store_true", help="call the real model")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--script-chars", type=int, default=9000)
+    parser.add_argument("--chars-per-second", type=float, default=1500.0)
+    args = parser.parse_args()
+
+    full_writer = create_script_writer(config.channel_info).model_copy(
+        update={"instruction": SCRIPT_WRITER_INSTRUCTION}
+    )
+    section_writer = create_section_parallel_writer(
+        create_script_writer(config.channel_info),
+        max_concurrency=args.concurrency,
+    )
+    sections = len(plan_script_sections(SAMPLE_OUTLINE))
+
+    if not args.live:
+        full_writer.model = StubLlm(
+            latency_seconds=args.latency,
+            output_chars=args.script_chars,
+            chars_per_second=args.chars_per_second,
+        )
+        for writer in section_writer.section_writers:
+            writer.model = StubLlm(
+                latency_seconds=args.latency,
+                output_chars=args.script_chars // sections,
+                chars_per_second=args.chars_per_second,
+            )
+
+    state = {"script_outline": SAMPLE_OUTLINE}
+    single = await time_runs(full_writer, "Write the script", args.runs, state)
+    parallel = await time_runs(section_writer, "Write the script", args.runs, state)
+    print(
+        json.dumps(
+            {
+                "mode": "live" if args.live else "stub",
+                "runs": args.runs,
+                "sections": sections,
+                "concurrency": args.concurrency,
+                "single_call_seconds": summarize(single),
+                "section_parallel_seconds": summarize(parallel),
+                "speedup": round(
+                    summarize(single)["median"] / summarize(parallel)["median"], 2
+                ),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
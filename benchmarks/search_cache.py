@@ -0,0 +1,104 @@
+"""Measure how many web searches the shared search cache avoids.
+
+Usage:
+    python -m benchmarks.search_cache                      # offline stub backend
+    python -m benchmarks.search_cache --search-latency 2.0 --sessions 10
+
+Each session replays the searches the stage agents typically issue for one
+topic: the platform researchers run concurrently and overlap with each
+other, and the planner, writer, director and editor repeat some of the
+researcher's queries in slightly different words. Topics repeat across
+sessions. The uncached pass calls the backend for every query; the cached
+pass goes through ``SearchCache`` with its in-flight deduplication and
+memory and disk layers.
+"""
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from script_writer_agent.disk_cache import DiskCache
+from script_writer_agent.search_cache import SearchCache
+
+from .stub_model import StubSearchBackend
+
+# Searches of one session, grouped by the agents that run concurrently
+SESSION_SEARCHES: List[List[str]] = [
+    [
+        "{topic} tutorial youtube",
+        "{topic} common problems stackoverflow",
+        "{topic} reddit opinions",
+        "{topic} best practices",
+        "best practices {topic}",
+        "{topic} tutorial on youtube",
+    ],
+    ["{topic} best practices", "{topic} examples"],
+    ["{topic} examples", "examples of {topic}"],
+    ["{topic} common problems stackoverflow"],
+    ["{topic} best practices"],
+]
+
+
+async def run_sessions(search: Any, topics: List[str]) -> float:
+    started = time.perf_counter()
+    for index, topic in enumerate(topics):
+        for group in SESSION_SEARCHES:
+            await asyncio.gather(
+                *(
+                    search(query.format(topic=topic), f"session-{index}")
+                    for query in group
+                )
+            )
+    return time.perf_counter() - started
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=6)
+    parser.add_argument("--topics", type=int, default=3, help="distinct topics")
+    parser.add_argument("--search-latency", type=float, default=0.2)
+    args = parser.parse_args()
+
+    topics = [f"topic {index % args.topics}" for index in range(args.sessions)]
+
+    uncached_backend = StubSearchBackend(args.search_latency)
+    uncached_seconds = await run_sessions(
+        lambda query, session_id: uncached_backend.search(query), topics
+    )
+
+    cached_backend = StubSearchBackend(args.search_latency)
+    with tempfile.TemporaryDirectory() as directory:
+        cache = SearchCache(
+            backend=cached_backend,
+            store=DiskCache(directory, ttl_seconds=3600, max_entries=1000),
+            ttl_seconds=3600,
+        )
+        cached_seconds = await run_sessions(
+            lambda query, session_id: cache.search(query, session_id), topics
+        )
+
+    print(
+        json.dumps(
+            {
+                "sessions": args.sessions,
+                "uncached": {
+                    "backend_calls": uncached_backend.calls,
+                    "seconds": round(uncached_seconds, 3),
+                },
+                "cached": {
+                    "backend_calls": cached_backend.calls,
+                    "seconds": round(cached_seconds, 3),
+                },
+                "first_session": cache.session_stats("session-0"),
+                "cache": cache.stats(),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,149 @@
+"""Measure the overhead of durable SQLite sessions and stage checkpoints.
+
+Usage:
+    python -m benchmarks.session_store
+    python -m benchmarks.session_store --sessions 200 --concurrency 50
+
+Every session replays the events of a pipeline run: for each of the five
+stages a few model and tool events, then the stage output as a state delta,
+then a checkpoint. The same workload runs against ``InMemorySessionService``
+(which has no checkpoints) and ``SqliteSessionService``, with up to
+``--concurrency`` sessions at a time, and the report compares append and
+checkpoint latency and total throughput.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import statistics
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from google.adk.events import Event, EventActions
+from google.adk.sessions import BaseSessionService, InMemorySessionService
+from google.genai import types
+
+from script_writer_agent.pipeline import PIPELINE_STAGES
+from script_writer_agent.session_store import SqliteSessionService
+
+from .common import APP_NAME, USER_ID
+from .stub_model import filler_markdown
+
+
+def _milliseconds(values: List[float]) -> Dict[str, float]:
+    ordered = sorted(values)
+    return {
+        "p50_ms": round(statistics.median(ordered) * 1000, 3),
+        "p99_ms": round(ordered[math.ceil(len(ordered) * 0.99) - 1] * 1000, 3),
+    }
+
+
+async def run_session(
+    service: BaseSessionService,
+    session_id: str,
+    events_per_stage: int,
+    output_chars: int,
+    timings: Dict[str, List[float]],
+) -> None:
+    session = await service.create_session(
+        app_name=APP_NAME, user_id=USER_ID, session_id=session_id
+    )
+    for stage in PIPELINE_STAGES:
+        for index in range(events_per_stage):
+            last = index == events_per_stage - 1
+            text = filler_markdown(output_chars if last else 200)
+            event = Event(
+                author=stage.agent_name,
+                content=types.Content(role="model", parts=[types.Part(text=text)]),
+                actions=EventActions(
+                    state_delta={stage.output_key: text} if last else {}
+                ),
+            )
+            started = time.perf_counter()
+            await service.append_event(session, event)
+            timings["append"].append(time.perf_counter() - started)
+
+        if isinstance(service, SqliteSessionService):
+            started = time.perf_counter()
+            await service.save_checkpoint(
+                APP_NAME, USER_ID, session_id, stage.name, session.state
+            )
+            timings["checkpoint"].append(time.perf_counter() - started)
+
+
+async def run_workload(
+    service: BaseSessionService, args: argparse.Namespace
+) -> Dict[str, Any]:
+    timings: Dict[str, List[float]] = {"append": [], "checkpoint": []}
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def bounded(index: int) -> None:
+        async with semaphore:
+            await run_session(
+                service,
+                f"session-{index}",
+                args.events_per_stage,
+                args.output_chars,
+                timings,
+            )
+
+    started = time.perf_counter()
+    await asyncio.gather(*(bounded(index) for index in range(args.sessions)))
+    elapsed = time.perf_counter() - started
+
+    report: Dict[str, Any] = {
+        "seconds": round(elapsed, 3),
+        "sessions_per_second": round(args.sessions / elapsed, 1),
+        "append": _milliseconds(timings["append"]),
+    }
+    if timings["checkpoint"]:
+        report["checkpoint"] = _milliseconds(timings["checkpoint"])
+    return report
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--events-per-stage", type=int, default=6)
+    parser.add_argument("--output-chars", type=int, default=8000)
+    args = parser.parse_args()
+
+    in_memory = await run_workload(InMemorySessionService(), args)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "sessions.db")
+        service = SqliteSessionService(path)
+        sqlite = await run_workload(service, args)
+
+        started = time.perf_counter()
+        checkpoint = await service.load_checkpoint(APP_NAME, USER_ID, "session-0")
+        sqlite["resume_lookup_ms"] = round((time.perf_counter() - started) * 1000, 3)
+        sqlite["resumed_stages"] = len(checkpoint.stages) if checkpoint else 0
+        sqlite["database_mb"] = round(
+            sum(
+                os.path.getsize(os.path.join(directory, name))
+                for name in os.listdir(directory)
+            )
+            / 2**20,
+            2,
+        )
+        service.close()
+
+    print(
+        json.dumps(
+            {
+                "sessions": args.sessions,
+                "concurrency": args.concurrency,
+                "in_memory": in_memory,
+                "sqlite": sqlite,
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,93 @@
+"""Measure import time and time to first response in fresh interpreters.
+
+Usage:
+    python -m benchmarks.startup                          # print the timings
+    python -m benchmarks.startup --save startup.json      # record a baseline
+    python -m benchmarks.startup --compare startup.json   # exit 1 on a regression
+
+Every scenario runs in a new Python process, so nothing is cached between
+runs. The first-request scenario builds the agent tree, installs a stub model
+and runs one root agent turn, so it measures startup without network latency.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from typing import Dict
+
+SCENARIOS: Dict[str, str] = {
+    "import_config": "import script_writer_agent.config",
+    "import_setup_channel": "import script_writer_agent.setup_channel",
+    "import_package": "import script_writer_agent",
+    "build_root_agent": "from script_writer_agent import root_agent",
+    "first_request": """
+import asyncio
+from script_writer_agent import root_agent
+from benchmarks.common import llm_agents, run_agent
+from benchmarks.stub_model import StubLlm
+
+for agent in llm_agents(root_agent):
+    agent.model = StubLlm(latency_seconds=0.0, output_chars=200)
+asyncio.run(run_agent(root_agent, "Hello"))
+""",
+}
+
+TIMER = """
+import time
+_started = time.perf_counter()
+{code}
+print(time.perf_counter() - _started)
+"""
+
+
+def time_scenario(code: str) -> float:
+    """Run ``code`` in a fresh interpreter and return its wall-clock seconds"""
+    result = subprocess.run(
+        [sys.executable, "-c", TIMER.format(code=code)],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--save", help="write the medians to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="allowed slowdown against the baseline, as a fraction",
+    )
+    args = parser.parse_args()
+
+    medians = {
+        name: round(statistics.median(time_scenario(code) for _ in range(args.runs)), 4)
+        for name, code in SCENARIOS.items()
+    }
+    print(json.dumps({"runs": args.runs, "median_seconds": medians}, indent=2))
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as file:
+            json.dump(medians, file, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+        regressions = {
+            name: {"baseline": baseline[name], "current": seconds}
+            for name, seconds in medians.items()
+            if name in baseline and seconds > baseline[name] * (1 + args.tolerance)
+        }
+        if regressions:
+            print(json.dumps({"regressions": regressions}, indent=2))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
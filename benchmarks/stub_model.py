@@ -0,0 +1,199 @@
+"""Deterministic stand-in for Gemini used by the offline benchmarks"""
+
+import asyncio
+from typing import Any, AsyncGenerator, Dict
+
+from google.adk.models import BaseLlm, LlmResponse
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+
+from script_writer_agent.agent_utils import current_tool_turns
+from script_writer_agent.search_cache import search_cache
+
+SEARCH_TOOL = "web_search"
+
+FILLER = (
+    "Production systems fail in boring ways, and the boring fixes are the ones "
+    "that keep paying off. "
+)
+
+
+# An outline that passes the rule-based checks, with four roadmap points
+SAMPLE_OUTLINE = """# Script Outline
+
+**Title:** What is the worst mistake for ML engineers shipping models? And how to avoid it using MLflow?
+
+## Main Message
+- Hook: a model that silently degrades in production for weeks.
+- Why care: every stale prediction costs money and trust.
+- Why trust me: years of running production ML systems.
+
+## Roadmap
+
+### 1. How silent failures happen
+### 2. Why teams miss them
+### 3. Tracking models with MLflow
+### 4. Solution options
+- Step 1. Quick win: alert on prediction drift
+- Step 2. Systematic solution: model registry with stage gates
+- Step 3. Overkill solution with extra contingency: shadow deployments
+
+## Weaknesses and Constraints
+- Not worth it for one-off batch scoring jobs.
+"""
+
+# The same outline as the planner's structured JSON reply
+SAMPLE_OUTLINE_JSON = """{
+  "title": "What is the worst mistake for ML engineers shipping models? And how to avoid it using MLflow?",
+  "main_message": "A model that silently degrades in production for weeks costs money and trust, and I have run production ML systems for years.",
+  "roadmap": [
+    {"heading": "How silent failures happen", "points": []},
+    {"heading": "Why teams miss them", "points": []},
+    {"heading": "Tracking models with MLflow", "points": []}
+  ],
+  "solution_steps": [
+    {"name": "Quick win", "description": "Alert on prediction drift."},
+    {"name": "Systematic solution", "description": "Model registry with stage gates."},
+    {"name": "Overkill solution with extra contingency", "description": "Shadow deployments."}
+  ],
+  "constraints": ["Not worth it for one-off batch scoring jobs."]
+}"""
+
+
+def filler_markdown(chars: int, heading: str = "Stub output") -> str:
+    """Return deterministic markdown of roughly ``chars`` characters"""
+    body = (FILLER * (chars // len(FILLER) + 1))[:chars]
+    return f"## {heading}\n\n{body}\n"
+
+
+class StubSearchBackend:
+    """Answers every query after a fixed delay, in place of the grounded Gemini call"""
+
+    def __init__(self, latency_seconds: float):
+        self.latency_seconds = latency_seconds
+        self.calls = 0
+
+    async def search(self, query: str) -> Dict[str, Any]:
+        self.calls += 1
+        await asyncio.sleep(self.latency_seconds)
+        return {"query": query, "summary": f"Results for {query}", "sources": []}
+
+
+def install_stub_search(
+    latency_seconds: float, cache: bool = False
+) -> StubSearchBackend:
+    """Stub the backend of the shared ``web_search`` tool and return it.
+
+    Searches still go through the search budget, the call spacer and the
+    in-flight deduplication of ``search_cache``. Results are only kept in
+    memory with ``cache``, so by default every run pays the search latency.
+    """
+    backend = StubSearchBackend(latency_seconds)
+    search_cache.backend = backend
+    search_cache.store = None
+    if not cache:
+        search_cache.memory_entries = 0
+    return backend
+
+
+class StubLlm(BaseLlm):
+    """Sleeps like a model call would and returns filler text.
+
+    Each call takes ``latency_seconds`` plus the time to emit ``output_chars``
+    at ``chars_per_second``. Agents with the ``web_search`` tool first call
+    it ``searches`` times, one model call per search, so searches run through
+    the real tool and its stubbed backend (see ``install_stub_search``).
+
+    Requests that reference a cached content are resolved through
+    ``cache_backend`` so the reported usage splits cached and uncached tokens.
+    """
+
+    model: str = "gemini-2.5-flash-stub"
+    latency_seconds: float = 0.2
+    searches: int = 0
+    search_prefix: str = "stub query"
+    output_chars: int = 2000
+    chars_per_second: float = 20000.0
+    calls: int = 0
+    busy_seconds: float = 0.0
+    cache_backend: Any = None
+
+    def simulated_seconds(self) -> float:
+        return self.latency_seconds + self.output_chars / self.chars_per_second
+
+    def searches_done(self, llm_request: LlmRequest) -> int:
+        """Count the search results of the current model turn"""
+        return sum(
+            1
+            for content in current_tool_turns(llm_request.contents)
+            for part in content.parts or []
+            if part.function_response and part.function_response.name == SEARCH_TOOL
+        )
+
+    def response_text(self, llm_request: LlmRequest) -> str:
+        return filler_markdown(self.output_chars)
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        self.calls += 1
+        searches = self.searches if SEARCH_TOOL in llm_request.tools_dict else 0
+        searched = self.searches_done(llm_request)
+        if searched < searches:
+            self.busy_seconds += self.latency_seconds
+            await asyncio.sleep(self.latency_seconds)
+            call = types.FunctionCall(
+                name=SEARCH_TOOL,
+                args={"query": f"{self.search_prefix} {searched + 1}"},
+            )
+            yield LlmResponse(
+                content=types.Content(
+                    role="model", parts=[types.Part(function_call=call)]
+                )
+            )
+            return
+
+        text = self.response_text(llm_request)
+        self.busy_seconds += self.latency_seconds + len(text) / self.chars_per_second
+        await asyncio.sleep(self.latency_seconds)
+
+        if stream:
+            chunk_size = max(1, len(text) // 10)
+            for start in range(0, len(text), chunk_size):
+                chunk = text[start : start + chunk_size]
+                await asyncio.sleep(len(chunk) / self.chars_per_second)
+                yield LlmResponse(
+                    content=types.Content(role="model", parts=[types.Part(text=chunk)]),
+                    partial=True,
+                )
+        else:
+            await asyncio.sleep(len(text) / self.chars_per_second)
+
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+            usage_metadata=self.usage_metadata(llm_request, text),
+        )
+
+    def usage_metadata(
+        self, llm_request: LlmRequest, text: str
+    ) -> types.GenerateContentResponseUsageMetadata:
+        prompt_chars = sum(
+            len(part.text or "")
+            for content in llm_request.contents
+            for part in content.parts or []
+        )
+        instruction = llm_request.config.system_instruction
+        if isinstance(instruction, str):
+            prompt_chars += len(instruction)
+
+        cached_chars = 0
+        cached_content = llm_request.config.cached_content
+        if cached_content and self.cache_backend is not None:
+            _, cached_instruction, _ = self.cache_backend.resolve(cached_content)
+            cached_chars = len(cached_instruction)
+
+        return types.GenerateContentResponseUsageMetadata(
+            prompt_token_count=(prompt_chars + cached_chars) // 4,
+            cached_content_token_count=cached_chars // 4,
+            candidates_token_count=len(text) // 4,
+        )
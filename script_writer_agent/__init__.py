@@ -1 +1,10 @@
-from . import agent
+import importlib
+
+
+def __getattr__(name):
+    # Importing the package must not pull in google.adk; the agent tree is
+    # only imported and built when ``agent`` or ``root_agent`` is accessed
+    if name in ("agent", "root_agent"):
+        agent = importlib.import_module(".agent", __name__)
+        return agent if name == "agent" else agent.root_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,11 +1,6 @@
-from dotenv import load_dotenv
-from google.adk.agents import Agent
+import functools
 
-from script_writer_agent.sub_agents.script_panner import robust_script_panner
-from script_writer_agent.sub_agents.script_writer import robust_script_writer
-from script_writer_agent.sub_agents.script_director import robust_script_director
-from script_writer_agent.sub_agents.script_editor import robust_script_editor
-from script_writer_agent.sub_agents.researcher import robust_researcher
+from dotenv import load_dotenv
 
 from script_writer_agent.config import config
 
@@ -24,6 +19,8 @@ setup_channel_interactive()
 ```
 Or programmatically with specific values. All scripts will be personalized based on your channel setup.
 
+As soon as the user has told you what the video is about, save the topic with the set_research_topic tool, before calling any sub-agent. Save it again if the user changes the topic.
+
 Your workflow is as follows:
 1. **Research** (Optional but recommended) Use the robust_researcher agent to gather comprehensive information from YouTube, Google, StackOverflow, and Reddit about the video topic. This will help you understand:
    - What content already exists and how to differentiate
@@ -39,7 +36,7 @@ Your workflow is as follows:
    - Repeat validation until the outline is approved
 4. Ask the user whether they want to update the outline based on their experience.
 5. **Outline Modification Logic:**
-   - For simple edits (removing items, reordering, minor text changes): Edit the existing outline content directly
+   - For simple edits (removing items, reordering, minor text changes): Edit the existing outline content directly and save the complete edited outline with the save_edited_artifact tool
    - For changes requiring additional research (new topics, latest information, technical details): You can call the robust_researcher agent again for specific queries, or update the outline with the new requirements and call the robust_script_panner agent
    - After any modifications, validate again with the robust_script_editor
 6. **Write** You will write the script for the video. To do this use the robust_script_writer agent.
@@ -52,7 +49,7 @@ Your workflow is as follows:
 9. **Final Validation** Use the robust_script_editor agent to validate that the final production script maintains compliance with the initial guidelines while incorporating the directorial elements.
 
 Guidelines for outline modifications:
-- Simple modifications: Edit the outline directly in your response
+- Simple modifications: Edit the outline directly and save it with save_edited_artifact (artifact_key "script_outline"), so only the changed sections are validated again
 - Research-heavy modifications: Use robust_researcher for targeted information gathering, or update the outline with new requirements and delegate to robust_script_panner
 - Always preserve the existing good parts of the outline while incorporating user feedback
 - Always validate with script_editor after modifications
@@ -68,6 +65,7 @@ Guidelines for validation workflow:
 - If "REQUIRES CHANGES", carefully review the specific feedback and implement the suggested corrections
 - Continue the validation loop until approval is achieved
 - The script_editor ensures compliance with the original script planner guidelines throughout the entire process
+- Sections that were already approved and have not changed are not reviewed again, so small edits validate quickly
 
 The final output will include:
 - Script outline (from planner, validated by editor)
@@ -75,16 +73,98 @@ The final output will include:
 - Production-ready script (from director, validated by editor) with integrated visual guidance, camera directions, and engagement strategies embedded throughout
 """
 
-root_agent = Agent(
-    name="script_writer_agent",
-    model=config.main_model,
-    description=("Agent to write scripts for a video."),
-    instruction=ROOT_AGENT_INSTRUCTION,
-    sub_agents=[
-        robust_researcher,
-        robust_script_panner,
-        robust_script_writer,
-        robust_script_director,
-        robust_script_editor,
-    ],
-)
+STREAMED_OUTPUT_INSTRUCTION = """
+Stage outputs:
+- The research findings, outline, script and production script are streamed to the user while they are generated
+- They are stored in the session state keys research_findings, script_outline, script and production_script
+- Do not repeat or rewrite these documents in your responses. Summarize the result in a few sentences and refer to the document by name
+"""
+
+
+def create_root_agent(channel_info):
+    """Build the agent tree for one channel profile.
+
+    google.adk and the sub-agent modules are only imported here, so modules
+    like ``config`` and ``setup_channel`` stay cheap to import.
+    """
+    from google.adk.agents import Agent
+
+    from script_writer_agent.agent_utils import callback_chain
+    from script_writer_agent.context_cache import context_cache
+    from script_writer_agent.models import model_for
+    from script_writer_agent.sub_agents.researcher import create_robust_researcher
+    from script_writer_agent.sub_agents.script_director import (
+        create_robust_script_director,
+    )
+    from script_writer_agent.sub_agents.script_editor import (
+        create_robust_script_editor,
+    )
+    from script_writer_agent.sub_agents.script_panner import (
+        create_robust_script_panner,
+    )
+    from script_writer_agent.sub_agents.script_writer import (
+        create_robust_script_writer,
+    )
+    from script_writer_agent.state_compaction import compact_history_callback
+    from script_writer_agent.tools import save_edited_artifact, set_research_topic
+
+    root_agent = Agent(
+        name="script_writer_agent",
+        model=model_for("script_writer_agent"),
+        description=("Agent to write scripts for a video."),
+        instruction=(
+            ROOT_AGENT_INSTRUCTION + STREAMED_OUTPUT_INSTRUCTION
+            if config.stream_stage_outputs
+            else ROOT_AGENT_INSTRUCTION
+        ),
+        tools=[set_research_topic, save_edited_artifact],
+        before_model_callback=callback_chain(
+            compact_history_callback if config.state_compaction else None,
+            context_cache.before_model_callback if config.context_caching else None,
+        ),
+        sub_agents=[
+            create_robust_researcher(channel_info),
+            create_robust_script_panner(channel_info),
+            create_robust_script_writer(channel_info),
+            create_robust_script_director(channel_info),
+            create_robust_script_editor(channel_info),
+        ],
+    )
+    if config.instrumentation_enabled:
+        from script_writer_agent.instrumentation import (
+            instrument_agent_tree,
+            instrumentation,
+        )
+
+        instrument_agent_tree(root_agent, instrumentation)
+    return root_agent
+
+
+@functools.lru_cache(maxsize=None)
+def build_root_agent():
+    """Build the agent tree of the configured channel.
+
+    ``config.channel_profile`` is loaded first, and the tree follows later
+    changes of the configured channel, e.g. a reloaded profile, from the
+    next invocation that starts while no other one runs.
+    """
+    from script_writer_agent.agent_factory import ChannelSwitcher
+    from script_writer_agent.channel_profiles import (
+        channel_listeners,
+        load_configured_profile,
+    )
+
+    load_configured_profile()
+    root_agent = create_root_agent(config.channel_info)
+    switcher = ChannelSwitcher(root_agent)
+    channel_listeners.append(lambda old, new: switcher.request(new))
+    return root_agent
+
+
+def __getattr__(name):
+    # root_agent is built on first access
+    if name == "root_agent":
+        root_agent = build_root_agent()
+        globals()["root_agent"] = root_agent
+        return root_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
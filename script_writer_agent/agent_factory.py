@@ -0,0 +1,283 @@
+"""Agent trees built per channel profile, so one process serves many channels"""
+
+import collections
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.sessions import BaseSessionService, InMemorySessionService
+
+from .agent import create_root_agent
+from .channel_profiles import profile_store
+from .channel_utils import channel_fingerprint
+from .config import ChannelInfo, config
+from .pipeline import ScriptPipeline, SpeculationStats
+from .research_cache import ResearchCache
+from .stage_cache import StageCache
+
+
+def _tree(agent: BaseAgent) -> List[BaseAgent]:
+    agents = [agent]
+    for sub_agent in agent.sub_agents:
+        agents.extend(_tree(sub_agent))
+    return agents
+
+
+def apply_channel_profile(
+    root_agent: BaseAgent,
+    channel_info: ChannelInfo,
+    build: Callable[[ChannelInfo], BaseAgent] = create_root_agent,
+) -> List[str]:
+    """Switch a built agent tree to ``channel_info`` in place.
+
+    A tree of the new channel is built and every instruction that differs
+    from it is replaced, so agents whose instruction does not depend on the
+    channel are left alone. Instruction providers are swapped for the new
+    channel's ones and the research and stage caches are re-keyed. A run in
+    progress would pick the new instructions up with its next model call, so
+    a tree that is serving requests is switched by a ``ChannelSwitcher``.
+    Returns the names of the agents whose instruction text was regenerated.
+    """
+    fresh = {agent.name: agent for agent in _tree(build(channel_info))}
+    regenerated = []
+    for agent in _tree(root_agent):
+        if isinstance(agent, LlmAgent) and agent.name in fresh:
+            instruction = fresh[agent.name].instruction
+            if callable(instruction):
+                agent.instruction = instruction
+            elif instruction != agent.instruction:
+                agent.instruction = instruction
+                regenerated.append(agent.name)
+        for callback in (
+            agent.canonical_before_agent_callbacks
+            + agent.canonical_after_agent_callbacks
+        ):
+            owner = getattr(callback, "__self__", None)
+            if isinstance(owner, (ResearchCache, StageCache)):
+                owner.channel_info = channel_info
+    return regenerated
+
+
+class ChannelSwitcher:
+    """Switches a served agent tree to a new channel between invocations.
+
+    ``request`` only records the channel and bumps ``version``, so it is
+    safe to call from any thread. ``before_invocation`` runs first among the
+    root agent's before-agent callbacks and applies the latest requested
+    channel when no other invocation of the tree is running, so every run
+    plans and writes for one channel. Running invocations are tracked by
+    weak references to their contexts, so a run that fails or is cancelled
+    stops counting once it is gone.
+    """
+
+    def __init__(
+        self,
+        root_agent: BaseAgent,
+        build: Callable[[ChannelInfo], BaseAgent] = create_root_agent,
+    ):
+        self.root_agent = root_agent
+        self.build = build
+        self.version = 0
+        self.applied_version = 0
+        self._requested: Optional[Tuple[int, ChannelInfo]] = None
+        self._running: "weakref.WeakValueDictionary[str, Any]" = (
+            weakref.WeakValueDictionary()
+        )
+        root_agent.before_agent_callback = [
+            self.before_invocation
+        ] + root_agent.canonical_before_agent_callbacks
+        root_agent.after_agent_callback = root_agent.canonical_after_agent_callbacks + [
+            self.after_invocation
+        ]
+
+    def request(self, channel_info: ChannelInfo) -> int:
+        """Switch to ``channel_info`` at the next free invocation start"""
+        self.version += 1
+        self._requested = (self.version, channel_info)
+        return self.version
+
+    def before_invocation(self, callback_context: CallbackContext) -> None:
+        requested = self._requested
+        if requested is not None and not self._running:
+            version, channel_info = requested
+            apply_channel_profile(self.root_agent, channel_info, self.build)
+            self.applied_version = version
+            if self._requested is requested:
+                self._requested = None
+        self._running[callback_context.invocation_id] = (
+            callback_context._invocation_context
+        )
+        return None
+
+    def after_invocation(self, callback_context: CallbackContext) -> None:
+        self._running.pop(callback_context.invocation_id, None)
+        return None
+
+    @property
+    def pending(self) -> bool:
+        return self.applied_version != self.version
+
+
+class AgentTreeCache:
+    """Keeps the built agent trees of the most recently used channel profiles.
+
+    Every ``ChannelInfo`` ends up in the instructions of its tree, so a tree
+    can only serve the channel it was built for. Trees are keyed by the
+    channel fingerprint and the least recently used tree is dropped beyond
+    ``max_trees``. Sessions that are still running keep their tree alive.
+    """
+
+    def __init__(
+        self,
+        max_trees: Optional[int] = None,
+        build: Callable[[ChannelInfo], BaseAgent] = create_root_agent,
+    ):
+        self.max_trees = max_trees or config.agent_tree_cache_size
+        self.build = build
+        self._trees: "collections.OrderedDict[str, BaseAgent]" = (
+            collections.OrderedDict()
+        )
+        self._lock = threading.Lock()
+        # Building takes long enough for two requests of a new channel to race
+        self._building: Dict[str, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.build_seconds = 0.0
+
+    def get(self, channel_info: Optional[ChannelInfo] = None) -> BaseAgent:
+        """Return the agent tree of ``channel_info``, building it on first use"""
+        channel_info = channel_info or config.channel_info
+        key = channel_fingerprint(channel_info)
+        with self._lock:
+            tree = self._hit(key)
+            if tree is not None:
+                return tree
+            build_lock = self._building.setdefault(key, threading.Lock())
+
+        # Only requests for the same channel wait for the build
+        with build_lock:
+            with self._lock:
+                tree = self._hit(key)
+                if tree is not None:
+                    return tree
+                self.misses += 1
+            started = time.perf_counter()
+            try:
+                tree = self.build(channel_info)
+            finally:
+                with self._lock:
+                    self._building.pop(key, None)
+            with self._lock:
+                self.build_seconds += time.perf_counter() - started
+                self._store(key, tree)
+            return tree
+
+    def _hit(self, key: str) -> Optional[BaseAgent]:
+        tree = self._trees.get(key)
+        if tree is not None:
+            self._trees.move_to_end(key)
+            self.hits += 1
+        return tree
+
+    def _store(self, key: str, tree: BaseAgent) -> None:
+        self._trees[key] = tree
+        self._trees.move_to_end(key)
+        while len(self._trees) > self.max_trees:
+            self._trees.popitem(last=False)
+            self.evictions += 1
+
+    def update(self, old: ChannelInfo, new: ChannelInfo) -> Optional[BaseAgent]:
+        """Move the cached tree of ``old`` to ``new`` without rebuilding it.
+
+        Used when a channel profile changes, so the loaded tree keeps serving
+        the channel. Returns None if ``old`` has no cached tree.
+        """
+        with self._lock:
+            tree = self._trees.pop(channel_fingerprint(old), None)
+        if tree is None:
+            return None
+        apply_channel_profile(tree, new, self.build)
+        with self._lock:
+            self._store(channel_fingerprint(new), tree)
+        return tree
+
+    def clear(self) -> None:
+        with self._lock:
+            self._trees.clear()
+
+    def __len__(self) -> int:
+        return len(self._trees)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "trees": len(self._trees),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "build_seconds": round(self.build_seconds, 3),
+        }
+
+
+agent_trees = AgentTreeCache()
+
+
+class ChannelPipelines:
+    """Pipelines over the agent trees of many channel profiles.
+
+    ``get`` loads the latest version of a stored profile when a job starts
+    and returns a pipeline over its tree from ``trees``, so every channel's
+    tree is built once and shared by its jobs. Without a profile name the
+    configured profile, or else the configured channel, is used. A profile
+    saved later applies to the jobs started after it, while running jobs
+    keep the tree they started with. All pipelines share one session service
+    and one ``SpeculationStats``.
+    """
+
+    def __init__(
+        self,
+        trees: Optional[AgentTreeCache] = None,
+        session_service: Optional[BaseSessionService] = None,
+        **pipeline_options: Any,
+    ):
+        self.trees = trees if trees is not None else agent_trees
+        self.session_service = session_service or InMemorySessionService()
+        self.pipeline_options = pipeline_options
+        self.speculation = SpeculationStats()
+        self._pipelines: "collections.OrderedDict[str, Tuple[BaseAgent, ScriptPipeline]]" = (
+            collections.OrderedDict()
+        )
+
+    def channel_info(self, profile: Optional[str] = None) -> ChannelInfo:
+        """Return the channel of ``profile``; raises ``KeyError`` if it is not stored"""
+        profile = profile or config.channel_profile
+        if not profile:
+            return config.channel_info
+        loaded = profile_store.load(profile)
+        if loaded is None:
+            raise KeyError(f"Channel profile {profile!r} not found")
+        return loaded.channel_info
+
+    def get(self, profile: Optional[str] = None) -> ScriptPipeline:
+        """Return the pipeline of the latest version of ``profile``"""
+        channel_info = self.channel_info(profile)
+        tree = self.trees.get(channel_info)
+        key = channel_fingerprint(channel_info)
+        cached = self._pipelines.get(key)
+        if cached is None or cached[0] is not tree:
+            # Built anew after the tree was evicted and rebuilt
+            pipeline = ScriptPipeline(
+                tree, session_service=self.session_service, **self.pipeline_options
+            )
+            pipeline.speculation = self.speculation
+            cached = (tree, pipeline)
+            self._pipelines[key] = cached
+        self._pipelines.move_to_end(key)
+        while len(self._pipelines) > self.trees.max_trees:
+            self._pipelines.popitem(last=False)
+        return cached[1]
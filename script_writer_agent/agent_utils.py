@@ -1,7 +1,69 @@
+import asyncio
+from typing import AsyncGenerator, Callable, List, Optional, Sequence
+
+from google.adk.agents import BaseAgent
 from google.adk.agents.callback_context import CallbackContext
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event
 from google.genai.types import Content
 
 
 def suppress_output_callback(callback_context: CallbackContext) -> Content:
     """Suppresses the output of the agent by returning an empty Content object."""
     return Content()
+
+
+def callback_chain(*callbacks: Optional[Callable]) -> Optional[List[Callable]]:
+    """Combine the enabled callbacks, skipping the ones that are None."""
+    chain = [callback for callback in callbacks if callback is not None]
+    return chain or None
+
+
+def current_tool_turns(contents: Sequence[Content]) -> List[Content]:
+    """Return the trailing function call/response contents of the request"""
+    index = len(contents)
+    while index > 0 and any(
+        part.function_call or part.function_response
+        for part in contents[index - 1].parts or []
+    ):
+        index -= 1
+    return list(contents[index:])
+
+
+def branch_context(
+    parent: BaseAgent, sub_agent: BaseAgent, context: InvocationContext
+) -> InvocationContext:
+    """Create an isolated conversation branch for a concurrently running sub-agent."""
+    sub_context = context.model_copy()
+    suffix = f"{parent.name}.{sub_agent.name}"
+    sub_context.branch = f"{context.branch}.{suffix}" if context.branch else suffix
+    return sub_context
+
+
+async def merge_agent_runs(
+    agent_runs: List[AsyncGenerator[Event, None]],
+) -> AsyncGenerator[Event, None]:
+    """Interleaves the events of concurrently running agents as they arrive.
+
+    Each agent only advances once its previous event has been handed upstream,
+    so state deltas are applied by the runner before the agent continues.
+    """
+    tasks = [asyncio.ensure_future(run.__anext__()) for run in agent_runs]
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(
+                pending, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                try:
+                    event = task.result()
+                except StopAsyncIteration:
+                    continue
+                yield event
+                index = tasks.index(task)
+                tasks[index] = asyncio.ensure_future(agent_runs[index].__anext__())
+                pending.add(tasks[index])
+    finally:
+        for task in pending:
+            task.cancel()
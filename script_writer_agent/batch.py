@@ -0,0 +1,289 @@
+"""
+Batch Script Generation
+
+Generates scripts for many topics at once. Topics are read from a JSONL file
+(one {"topic": ..., "id": ..., "channel_profile": ...} object per line, "id"
+and "channel_profile" optional) or a CSV file with a "topic" column (and
+optional "id" and "channel_profile" columns). A topic with a channel profile
+is written for the latest version of that stored profile, the others for the
+configured channel. Repeated topics are generated once per channel. Ids must
+be unique and may only contain letters, digits, "_", "." and "-".
+
+Every topic gets its own directory in the output directory with one markdown
+file per pipeline stage. Topics whose outline the editor keeps rejecting are
+marked "needs_review" and are not written. A manifest records the finished stages, so a killed
+run can be restarted with the same arguments and only does the missing work.
+With --durable-sessions the sessions themselves are kept in SQLite as well.
+
+Usage:
+    python -m script_writer_agent.batch topics.jsonl --output-dir scripts --workers 4
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import re
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from .disk_cache import hash_key
+
+if TYPE_CHECKING:
+    from .agent_factory import ChannelPipelines
+    from .pipeline import ScriptPipeline
+
+MANIFEST_NAME = "manifest.json"
+USER_ID = "batch"
+
+
+def topic_id(topic: str, channel_profile: str = "") -> str:
+    """Build a stable, filesystem-friendly id for a topic and channel profile"""
+    slug = re.sub(r"[^a-z0-9]+", "-", topic.lower()).strip("-")[:48]
+    key = f"{channel_profile}\n{topic}" if channel_profile else topic
+    return f"{slug}-{hash_key(key)[:8]}"
+
+
+def validate_topic_id(item_id: str) -> str:
+    """Return ``item_id`` if it is safe to use as a directory name"""
+    if not re.fullmatch(r"[A-Za-z0-9_.-]+", item_id) or item_id.startswith("."):
+        raise ValueError(f"Invalid topic id: {item_id!r}")
+    return item_id
+
+
+def load_topics(path: str) -> List[Dict[str, str]]:
+    """Read topics from a JSONL or CSV file.
+
+    Repeated topics of one channel profile are dropped, since they would
+    share a session. Raises ``ValueError`` for an invalid id or an id given
+    to two different topics or profiles.
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        if path.lower().endswith(".csv"):
+            rows = list(csv.DictReader(file))
+        else:
+            rows = [json.loads(line) for line in file if line.strip()]
+
+    topics: Dict[str, Dict[str, str]] = {}
+    for row in rows:
+        topic = (row.get("topic") or "").strip()
+        if not topic:
+            continue
+        channel_profile = (row.get("channel_profile") or "").strip()
+        item_id = validate_topic_id(
+            str(row.get("id") or topic_id(topic, channel_profile))
+        )
+        item = {"id": item_id, "topic": topic}
+        if channel_profile:
+            item["channel_profile"] = channel_profile
+        if item_id in topics:
+            if topics[item_id] != item:
+                raise ValueError(f"Topic id {item_id!r} is used by two topics")
+            continue
+        topics[item_id] = item
+    return list(topics.values())
+
+
+class BatchManifest:
+    """Tracks per-topic progress in a JSON file that survives restarts"""
+
+    def __init__(self, output_dir: str):
+        self.path = os.path.join(output_dir, MANIFEST_NAME)
+        self.topics: Dict[str, Dict[str, Any]] = {}
+        self._lock = asyncio.Lock()
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as file:
+                self.topics = json.load(file).get("topics", {})
+
+    def entry(self, item: Dict[str, str]) -> Dict[str, Any]:
+        return self.topics.setdefault(
+            item["id"],
+            {
+                "topic": item["topic"],
+                "channel_profile": item.get("channel_profile"),
+                "status": "pending",
+                "completed_stages": [],
+            },
+        )
+
+    async def update(self, item_id: str, **fields: Any) -> None:
+        async with self._lock:
+            self.topics[item_id].update(fields)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump({"topics": self.topics}, file, indent=2)
+            os.replace(tmp_path, self.path)
+
+
+class BatchRunner:
+    """Runs the pipeline for many topics with a bounded number of workers.
+
+    With ``channel_pipelines`` every topic runs on the pipeline of its
+    channel profile, otherwise all topics run on ``pipeline``.
+    """
+
+    def __init__(
+        self,
+        pipeline: "ScriptPipeline",
+        output_dir: str,
+        workers: int,
+        channel_pipelines: Optional["ChannelPipelines"] = None,
+    ):
+        self.pipeline = pipeline
+        self.channel_pipelines = channel_pipelines
+        self.output_dir = output_dir
+        self.workers = workers
+        self.manifest = BatchManifest(output_dir)
+
+    def _topic_dir(self, item_id: str) -> str:
+        return os.path.join(self.output_dir, validate_topic_id(item_id))
+
+    def _load_outputs(self, item_id: str, completed: List[str]) -> Dict[str, str]:
+        """Load the outputs of finished stages back into session state"""
+        state = {}
+        for stage in self.pipeline.stages:
+            path = os.path.join(self._topic_dir(item_id), f"{stage.output_key}.md")
+            if stage.name in completed and os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as file:
+                    state[stage.output_key] = file.read()
+        return state
+
+    def _pipeline_for(self, item: Dict[str, str]) -> "ScriptPipeline":
+        if self.channel_pipelines is None:
+            if item.get("channel_profile"):
+                raise ValueError("Channel profiles need channel pipelines")
+            return self.pipeline
+        return self.channel_pipelines.get(item.get("channel_profile"))
+
+    async def run_topic(self, item: Dict[str, str]) -> None:
+        from .pipeline import OutlineRejectedError
+
+        entry = self.manifest.entry(item)
+        if entry["status"] == "done":
+            return
+
+        completed = list(entry["completed_stages"])
+        os.makedirs(self._topic_dir(item["id"]), exist_ok=True)
+        await self.manifest.update(item["id"], status="running", error=None)
+
+        async def save_stage(stage_name: str, state: Dict[str, Any]) -> None:
+            stage = next(s for s in self.pipeline.stages if s.name == stage_name)
+            path = os.path.join(self._topic_dir(item["id"]), f"{stage.output_key}.md")
+            with open(path, "w", encoding="utf-8") as file:
+                file.write(str(state.get(stage.output_key) or ""))
+            completed.append(stage_name)
+            await self.manifest.update(item["id"], completed_stages=list(completed))
+
+        started = time.perf_counter()
+        try:
+            pipeline = self._pipeline_for(item)
+            await pipeline.run(
+                topic=item["topic"],
+                user_id=USER_ID,
+                session_id=item["id"],
+                initial_state=self._load_outputs(item["id"], completed),
+                completed_stages=completed,
+                on_stage_complete=save_stage,
+            )
+        except OutlineRejectedError as error:
+            await self.manifest.update(
+                item["id"], status="needs_review", error=str(error)
+            )
+            print(f"⚠️  {item['topic']}: the outline needs review")
+            return
+        except Exception as error:  # pylint: disable=broad-except
+            await self.manifest.update(item["id"], status="failed", error=str(error))
+            print(f"❌ {item['topic']}: {error}")
+            return
+
+        await self.manifest.update(
+            item["id"],
+            status="done",
+            seconds=round(time.perf_counter() - started, 1),
+        )
+        print(f"✅ {item['topic']}")
+
+    async def run(self, topics: List[Dict[str, str]]) -> Dict[str, Any]:
+        ids = [item["id"] for item in topics]
+        if len(set(ids)) != len(ids):
+            raise ValueError("Topic ids must be unique, topics with one id share a session")
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in topics:
+            queue.put_nowait(item)
+
+        async def worker() -> None:
+            while True:
+                try:
+                    item = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                await self.run_topic(item)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(self.workers)))
+        elapsed = time.perf_counter() - started
+
+        statuses = [self.manifest.topics[item["id"]]["status"] for item in topics]
+        done = statuses.count("done")
+        summary = {
+            "topics": len(topics),
+            "done": done,
+            "failed": statuses.count("failed"),
+            "needs_review": statuses.count("needs_review"),
+            "elapsed_seconds": round(elapsed, 1),
+            "topics_per_hour": round(done / elapsed * 3600, 1) if elapsed else 0.0,
+        }
+        if self.pipeline.speculative_writing:
+            summary["speculation"] = self.pipeline.speculation.stats()
+        return summary
+
+
+async def run_batch(
+    topics_path: str, output_dir: str, workers: int, durable_sessions: bool = False
+) -> Dict[str, Any]:
+    """Generate scripts for every topic in ``topics_path``"""
+    from .agent_factory import ChannelPipelines
+    from .config import config
+    from .session_store import SqliteSessionService
+
+    os.makedirs(output_dir, exist_ok=True)
+    session_service = (
+        SqliteSessionService(config.session_db_path) if durable_sessions else None
+    )
+    channel_pipelines = ChannelPipelines(session_service=session_service)
+    runner = BatchRunner(
+        channel_pipelines.get(),
+        output_dir,
+        workers,
+        channel_pipelines=channel_pipelines,
+    )
+    return await runner.run(load_topics(topics_path))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate scripts for many topics.")
+    parser.add_argument("topics", help="JSONL or CSV file with a 'topic' field")
+    parser.add_argument("--output-dir", default="batch_output")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument(
+        "--durable-sessions",
+        action="store_true",
+        help="keep sessions and stage checkpoints in the SQLite session database",
+    )
+    args = parser.parse_args()
+
+    from .pipeline import filter_stage_runner_warnings
+
+    load_dotenv()
+    filter_stage_runner_warnings()
+    summary = asyncio.run(
+        run_batch(args.topics, args.output_dir, args.workers, args.durable_sessions)
+    )
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""Channel profiles stored as versioned files, with reload into a running process"""
+
+import asyncio
+import dataclasses
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from .channel_utils import channel_fingerprint
+from .config import ChannelInfo, config
+
+logger = logging.getLogger(__name__)
+
+_VERSION_FILE_PATTERN = re.compile(r"^v(\d+)\.json$")
+
+# Called with the old and the new channel after config.channel_info changes
+ChannelListener = Callable[[ChannelInfo, ChannelInfo], None]
+
+
+@dataclasses.dataclass
+class ChannelProfile:
+    name: str
+    version: int
+    saved_at: float
+    channel_info: ChannelInfo
+
+
+def channel_info_from_dict(data: Dict[str, Any]) -> ChannelInfo:
+    """Build a ChannelInfo, ignoring fields this version does not know"""
+    known = {field.name for field in dataclasses.fields(ChannelInfo)}
+    unknown = sorted(set(data) - known)
+    if unknown:
+        logger.warning("Unknown channel fields ignored: %s", ", ".join(unknown))
+    return ChannelInfo(**{key: value for key, value in data.items() if key in known})
+
+
+class ChannelProfileStore:
+    """Keeps every saved version of a channel profile as a JSON file.
+
+    Versions of the profile ``name`` are ``<directory>/<name>/v<version>.json``.
+    Loading the latest version lists one directory and reads one file, so it
+    is cheap enough for startup. Saving a profile that equals the latest
+    version does not create a new one, and versions beyond ``max_versions``
+    are deleted, oldest first.
+    """
+
+    def __init__(self, directory: str, max_versions: int):
+        self.directory = directory
+        self.max_versions = max_versions
+        self._lock = threading.Lock()
+
+    def _profile_dir(self, name: str) -> str:
+        if not re.fullmatch(r"[A-Za-z0-9_.-]+", name) or name.startswith("."):
+            raise ValueError(f"Invalid channel profile name: {name!r}")
+        return os.path.join(self.directory, name)
+
+    def _path(self, name: str, version: int) -> str:
+        return os.path.join(self._profile_dir(name), f"v{version:04d}.json")
+
+    def names(self) -> List[str]:
+        try:
+            return sorted(
+                name
+                for name in os.listdir(self.directory)
+                if os.path.isdir(os.path.join(self.directory, name))
+            )
+        except FileNotFoundError:
+            return []
+
+    def versions(self, name: str) -> List[int]:
+        try:
+            files = os.listdir(self._profile_dir(name))
+        except FileNotFoundError:
+            return []
+        return sorted(
+            int(match.group(1))
+            for match in map(_VERSION_FILE_PATTERN.match, files)
+            if match
+        )
+
+    def latest_version(self, name: str) -> Optional[int]:
+        versions = self.versions(name)
+        return versions[-1] if versions else None
+
+    def load(
+        self, name: str, version: Optional[int] = None
+    ) -> Optional[ChannelProfile]:
+        """Return a version of the profile, the latest by default, or None"""
+        version = version if version is not None else self.latest_version(name)
+        if version is None:
+            return None
+        try:
+            with open(self._path(name, version), "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return None
+        return ChannelProfile(
+            name=name,
+            version=version,
+            saved_at=data.get("saved_at", 0.0),
+            channel_info=channel_info_from_dict(data["channel_info"]),
+        )
+
+    def save(self, name: str, channel_info: ChannelInfo) -> ChannelProfile:
+        """Store ``channel_info`` as the next version of the profile"""
+        with self._lock:
+            latest = self.load(name)
+            if latest is not None and channel_fingerprint(
+                latest.channel_info
+            ) == channel_fingerprint(channel_info):
+                return latest
+
+            version = latest.version + 1 if latest is not None else 1
+            profile = ChannelProfile(name, version, time.time(), channel_info)
+            os.makedirs(self._profile_dir(name), exist_ok=True)
+            path = self._path(name, version)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(
+                    {
+                        "name": name,
+                        "version": version,
+                        "saved_at": profile.saved_at,
+                        "channel_info": dataclasses.asdict(channel_info),
+                    },
+                    file,
+                    indent=2,
+                    ensure_ascii=False,
+                )
+            # The watcher only sees complete files
+            os.replace(tmp_path, path)
+
+            for old_version in self.versions(name)[: -self.max_versions]:
+                os.remove(self._path(name, old_version))
+            return profile
+
+
+class ChannelProfileWatcher:
+    """Polls a stored profile and calls ``on_change`` for every new version.
+
+    ``check`` polls once and can be called from a request handler; ``start``
+    polls every ``interval_seconds`` on a daemon thread. With a ``loop`` the
+    files are still read on the thread, but ``on_change`` is scheduled on
+    the loop, so it never runs alongside the loop's requests.
+    """
+
+    def __init__(
+        self,
+        store: ChannelProfileStore,
+        name: str,
+        on_change: Callable[[ChannelProfile], Any],
+        interval_seconds: Optional[float] = None,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ):
+        self.store = store
+        self.name = name
+        self.on_change = on_change
+        self.loop = loop
+        self.interval_seconds = interval_seconds or config.channel_profile_poll_seconds
+        self.version = store.latest_version(name)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def check(self) -> bool:
+        """Apply the latest version if it is newer than the last one seen"""
+        version = self.store.latest_version(self.name)
+        if version is None or version == self.version:
+            return False
+        profile = self.store.load(self.name, version)
+        if profile is None:
+            # Pruned between listing and reading; the next poll sees the newer one
+            return False
+        self.version = version
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._apply, profile)
+        else:
+            self._apply(profile)
+        return True
+
+    def _apply(self, profile: ChannelProfile) -> None:
+        try:
+            self.on_change(profile)
+        except Exception:
+            logger.exception("Reloading channel profile %r failed", self.name)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.check()
+            except Exception:
+                logger.exception("Polling channel profile %r failed", self.name)
+
+    def start(self) -> "ChannelProfileWatcher":
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name=f"channel-profile-{self.name}", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+profile_store = ChannelProfileStore(
+    directory=config.channel_profile_dir,
+    max_versions=config.channel_profile_max_versions,
+)
+
+channel_listeners: List[ChannelListener] = []
+
+
+def set_channel_info(channel_info: ChannelInfo) -> bool:
+    """Make ``channel_info`` the configured channel and notify the listeners.
+
+    Returns False when it equals the current channel, so nothing changed.
+    """
+    old = config.channel_info
+    if channel_fingerprint(old) == channel_fingerprint(channel_info):
+        return False
+    config.channel_info = channel_info
+    for listener in list(channel_listeners):
+        listener(old, channel_info)
+    return True
+
+
+def load_configured_profile() -> Optional[ChannelProfile]:
+    """Load ``config.channel_profile`` into ``config.channel_info`` at startup"""
+    if not config.channel_profile:
+        return None
+    profile = profile_store.load(config.channel_profile)
+    if profile is None:
+        logger.warning("Channel profile %r not found", config.channel_profile)
+        return None
+    set_channel_info(profile.channel_info)
+    return profile
+
+
+def reload_channel_profile(
+    name: Optional[str] = None, version: Optional[int] = None
+) -> Optional[ChannelProfile]:
+    """Apply a stored profile, the configured one by default, to this process.
+
+    The agent tree of the configured channel regenerates the instructions
+    that depend on the channel at its next invocation that starts while no
+    other one runs. Jobs pick the channel up when they start.
+    """
+    name = name or config.channel_profile
+    if not name:
+        raise ValueError("No channel profile name given or configured")
+    profile = profile_store.load(name, version)
+    if profile is None:
+        raise KeyError(f"Channel profile {name!r} not found")
+    set_channel_info(profile.channel_info)
+    return profile
+
+
+def watch_channel_profile(
+    name: Optional[str] = None, loop: Optional[asyncio.AbstractEventLoop] = None
+) -> ChannelProfileWatcher:
+    """Start reloading the configured profile whenever a new version is saved.
+
+    New versions are applied on ``loop``, by default the running loop of the
+    caller, so the channel changes between the loop's requests.
+    """
+    name = name or config.channel_profile
+    if not name:
+        raise ValueError("No channel profile name given or configured")
+    if loop is None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+    return ChannelProfileWatcher(
+        profile_store,
+        name,
+        lambda profile: set_channel_info(profile.channel_info),
+        loop=loop,
+    ).start()
@@ -1,8 +1,18 @@
 """Utilities for integrating channel information into agent instructions"""
 
+import hashlib
+import json
+from dataclasses import asdict
+
 from .config import ChannelInfo
 
 
+def channel_fingerprint(channel_info: ChannelInfo) -> str:
+    """Return a stable hash of every channel field"""
+    payload = json.dumps(asdict(channel_info), sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
 def generate_channel_context(channel_info: ChannelInfo) -> str:
     """Generate a formatted channel context section for agent instructions"""
 
@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import List
+from typing import Dict, List
 
 
 @dataclass
@@ -48,12 +48,71 @@ class ScriptWriterAgentConfig:
     """Configuration for the script writer agent"""
 
     main_model: str = "gemini-2.5-flash"
+    agent_models: Dict[str, str] = field(default_factory=lambda: {"script_editor": "gemini-2.5-flash-lite"})  # Per-agent model, keyed by agent name or by group (platform_researcher, script_section_writer, script_section_director); others use main_model
+    model_fallback_enabled: bool = True  # Retry on the fallback model when the primary errors or is too slow
+    model_fallbacks: Dict[str, str] = field(default_factory=lambda: {"gemini-2.5-flash": "gemini-2.5-flash-lite", "gemini-2.5-flash-lite": "gemini-2.5-flash"})
+    model_latency_slo_seconds: float = 120.0  # A streaming primary model slower than this to its first chunk falls back
+    model_fallback_cooldown_seconds: float = 300.0  # How long a failing primary model is skipped
+    retry_max_attempts: int = 3  # Attempts per model call for rate limits, timeouts and 5xx errors (1 = no retries)
+    retry_initial_backoff_seconds: float = 1.0  # Backoff ceiling before the first retry, doubled for each further retry
+    retry_max_backoff_seconds: float = 30.0
+    circuit_breaker_failure_threshold: int = 5  # Consecutive transient failures before calls to a model fail fast
+    circuit_breaker_reset_seconds: float = 60.0  # Time before a failing model is tried again
     max_research_iterations: int = (
         1  # Number of retry attempts for researcher (1 = no retries, just one attempt)
     )
+    parallel_research: bool = False  # Research each platform concurrently and merge the reports
+    rule_based_pre_validation: bool = True  # Reject mechanically broken drafts before the LLM editor runs
+    incremental_validation: bool = True  # Only re-review sections changed since the last approval
+    structured_outputs: bool = True  # Planner and editor reply in JSON that is validated and rendered to markdown
+    stream_stage_outputs: bool = False  # Stage outputs are streamed to the user, so the root agent must not echo them
+    parallel_script_writing: bool = False  # Write the outline's roadmap sections concurrently
+    speculative_script_writing: bool = False  # Start writing from the candidate outline while the editor validates it (needs state_compaction)
+    max_parallel_script_sections: int = 3  # Section writers allowed to run at the same time
+    pipelined_directing: bool = False  # Direct the script section by section; overlaps with writing only with parallel_script_writing
+    agent_tree_cache_size: int = 8  # Agent trees of this many channel profiles are kept built, least recently used evicted
     max_search_queries: int = (
-        6  # Maximum number of search queries per research session (4-6 recommended)
+        6  # Maximum number of search queries per agent run (4-6 recommended, 0 = unlimited)
     )
+    agent_search_quotas: Dict[str, int] = field(default_factory=dict)  # Per-agent overrides of max_search_queries, keyed by agent name
+    max_session_search_queries: int = 40  # Searches allowed across the whole pipeline of a session (0 = unlimited)
+    min_search_interval_seconds: float = 1.0  # Minimum spacing between searches sent to the search backend
+    research_cache_enabled: bool = True  # Reuse research findings for repeated topics
+    research_cache_dir: str = ".script_writer_cache/research"
+    research_cache_ttl_seconds: int = 24 * 60 * 60  # Findings older than this are re-researched
+    research_cache_max_entries: int = 200  # Least recently used reports are evicted beyond this
+    stage_cache_enabled: bool = True  # Reuse a stage's output when its inputs match an earlier run
+    stage_cache_force_refresh: bool = False  # Regenerate every stage even when a stored output matches
+    stage_cache_dir: str = ".script_writer_cache/stages"
+    stage_cache_ttl_seconds: int = 7 * 24 * 60 * 60
+    stage_cache_max_entries: int = 5000
+    stage_cache_max_bytes: int = 256 * 1024 * 1024  # Least recently used outputs are evicted beyond this total size
+    search_model: str = "gemini-2.5-flash"  # Model that runs the grounded searches behind the web_search tool
+    search_cache_enabled: bool = True  # Share search results between agents and sessions
+    search_cache_dir: str = ".script_writer_cache/search"
+    search_cache_ttl_seconds: int = 6 * 60 * 60  # Results older than this are searched again
+    search_cache_max_entries: int = 2000
+    search_cache_memory_entries: int = 256  # Results also kept in memory, least recently used evicted
+    context_caching: bool = False  # Send the static agent instructions as provider-side cached content
+    context_cache_dir: str = ".script_writer_cache/context"
+    context_cache_ttl_seconds: int = 60 * 60  # Lifetime of each provider-side cache
+    context_cache_min_tokens: int = 1024  # Shorter instructions are sent as usual
+    instrumentation_enabled: bool = False  # Record latency, tokens and tool calls of every agent run
+    metrics_path: str = ".script_writer_cache/metrics.jsonl"
+    session_db_path: str = ".script_writer_cache/sessions.db"  # SQLite database for durable pipeline sessions and stage checkpoints
+    job_workers: int = 4  # Pipeline jobs the job service runs at the same time
+    job_queue_size: int = 100  # Jobs allowed to wait for a worker; further submits wait or are rejected
+    job_history_size: int = 1000  # Finished jobs kept for polling; older ones are dropped with their sessions
+    state_compaction: bool = True  # Send each agent only the session state it reads instead of the full history
+    compaction_max_input_chars: int = 24000  # Longer research and feedback inputs are shortened section by section; documents are sent whole
+    research_retrieval: bool = True  # Send the planner and writers the research snippets relevant to their work instead of all findings
+    research_top_k: int = 4  # Snippets retrieved for writing one section
+    research_outline_top_k: int = 12  # Snippets retrieved for work on the whole video, like the outline
+    research_snippet_max_chars: int = 800  # Research findings are indexed in snippets of about this size
+    channel_profile: str = ""  # Stored channel profile loaded when the agent is built ("" = use channel_info below)
+    channel_profile_dir: str = "channel_profiles"  # One directory of versioned JSON files per profile
+    channel_profile_max_versions: int = 20  # Older versions of a profile are deleted beyond this
+    channel_profile_poll_seconds: float = 2.0  # How often a watched profile is checked for a new version
     channel_info: ChannelInfo = field(default_factory=ChannelInfo)
 
 
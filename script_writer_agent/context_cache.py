@@ -0,0 +1,286 @@
+"""Provider-side caching of the static system instruction shared by agent calls"""
+
+import asyncio
+import hashlib
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+from .config import config
+from .disk_cache import DiskCache, hash_key
+
+logger = logging.getLogger(__name__)
+
+# Refresh handles a little before the provider expires them
+EXPIRY_MARGIN_SECONDS = 5 * 60
+
+MAX_STORED_HANDLES = 100
+
+# A prefix whose cache could not be created is tried again after this long
+FAILED_CREATE_RETRY_SECONDS = 60
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count, good enough to decide whether caching pays off"""
+    return len(text) // 4
+
+
+def _instruction_text(llm_request: LlmRequest) -> str:
+    instruction = llm_request.config.system_instruction
+    if instruction is None:
+        return ""
+    if isinstance(instruction, str):
+        return instruction
+    if isinstance(instruction, types.Content):
+        return "".join(part.text or "" for part in instruction.parts or [])
+    return str(instruction)
+
+
+def _tools_fingerprint(tools: Optional[List[Any]]) -> List[Any]:
+    return [
+        (
+            tool.model_dump(mode="json", exclude_none=True)
+            if hasattr(tool, "model_dump")
+            else repr(tool)
+        )
+        for tool in tools or []
+    ]
+
+
+class GeminiContextCacheBackend:
+    """Creates cached contents through the Gemini API"""
+
+    def __init__(self, client: Any = None):
+        self._client = client
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            from google.genai import Client
+
+            self._client = Client()
+        return self._client
+
+    async def create(
+        self,
+        model: str,
+        system_instruction: str,
+        tools: Optional[List[types.Tool]],
+        ttl_seconds: int,
+    ) -> str:
+        cached = await self.client.aio.caches.create(
+            model=model,
+            config=types.CreateCachedContentConfig(
+                display_name=f"script-writer-{hash_key(system_instruction)[:12]}",
+                system_instruction=system_instruction,
+                tools=tools or None,
+                ttl=f"{ttl_seconds}s",
+            ),
+        )
+        return cached.name
+
+
+class LocalContextCacheBackend:
+    """In-process stand-in for the provider cache, used for offline testing.
+
+    ``resolve`` returns what a cache handle stands for, so a stub model can
+    rebuild the full prompt from the trimmed request. Like the provider's,
+    a cached content expires ``ttl_seconds`` after it was created.
+    """
+
+    def __init__(self):
+        self.contents: Dict[str, Tuple[str, str, Optional[List[types.Tool]]]] = {}
+        self.expires_at: Dict[str, float] = {}
+        self.creates = 0
+
+    async def create(
+        self,
+        model: str,
+        system_instruction: str,
+        tools: Optional[List[types.Tool]],
+        ttl_seconds: int,
+    ) -> str:
+        self.creates += 1
+        digest = hashlib.sha256(system_instruction.encode("utf-8")).hexdigest()
+        name = f"cachedContents/local-{digest[:16]}-{self.creates}"
+        self.contents[name] = (model, system_instruction, tools)
+        self.expires_at[name] = time.time() + ttl_seconds
+        return name
+
+    def resolve(self, name: str) -> Optional[Tuple[str, str, Optional[List[Any]]]]:
+        if time.time() >= self.expires_at.get(name, 0.0):
+            self.contents.pop(name, None)
+            self.expires_at.pop(name, None)
+            return None
+        return self.contents.get(name)
+
+
+class ContextCache:
+    """Moves each agent's static system instruction into a provider-side cache.
+
+    The instruction starts with the channel context and is followed by the
+    agent's role instructions, so it is identical across sessions. The first
+    call for a given (model, instruction, tools) combination creates a cached
+    content, and every later call, from any agent or session, references it
+    by handle instead of sending the instruction again. Handles are keyed by
+    a hash of the instruction text, so editing ``ChannelInfo`` or an
+    instruction string simply produces a new handle.
+
+    Handles are kept in memory and, if ``store`` is given, on disk so other
+    processes can reuse them until they expire. Instructions shorter than
+    ``min_tokens`` are sent as usual, since the provider rejects small caches.
+    A prefix whose cache could not be created is sent as usual too, and
+    caching it is tried again after ``FAILED_CREATE_RETRY_SECONDS``.
+    """
+
+    def __init__(
+        self,
+        backend: Any,
+        ttl_seconds: int = 60 * 60,
+        min_tokens: int = 1024,
+        store: Optional[DiskCache] = None,
+    ):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.min_tokens = min_tokens
+        self.store = store
+        self._handles: Dict[str, Tuple[Optional[str], float]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        # What each handle replaced, so a request can be sent to another model
+        self._prefixes: Dict[str, Tuple[Any, Any, Any]] = {}
+        self.hits = 0
+        self.creates = 0
+        self.skipped = 0
+        self.failures = 0
+
+    def cache_key(
+        self, model: str, system_instruction: str, tools: Optional[List[Any]]
+    ) -> str:
+        return hash_key(model, system_instruction, _tools_fingerprint(tools))
+
+    def _cached_handle(self, key: str) -> Tuple[bool, Optional[str]]:
+        """Return (known, handle); a known None handle means caching failed"""
+        if key in self._handles:
+            handle, expires_at = self._handles[key]
+            if time.time() < expires_at:
+                return True, handle
+            del self._handles[key]
+
+        if self.store is not None:
+            stored = self.store.get(key)
+            if stored and time.time() < stored["expires_at"]:
+                self._handles[key] = (stored["name"], stored["expires_at"])
+                return True, stored["name"]
+        return False, None
+
+    async def handle_for(
+        self, model: str, system_instruction: str, tools: Optional[List[Any]]
+    ) -> Optional[str]:
+        """Return the cached-content handle for a prefix, creating it if needed"""
+        key = self.cache_key(model, system_instruction, tools)
+        known, handle = self._cached_handle(key)
+        if known:
+            if handle:
+                self.hits += 1
+            return handle
+
+        # Concurrent callers with the same prefix wait for a single create
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            known, handle = self._cached_handle(key)
+            if known:
+                if handle:
+                    self.hits += 1
+                return handle
+
+            expires_at = time.time() + self.ttl_seconds - EXPIRY_MARGIN_SECONDS
+            try:
+                handle = await self.backend.create(
+                    model, system_instruction, tools, self.ttl_seconds
+                )
+            except Exception as error:  # pylint: disable=broad-except
+                # Uncacheable prefixes (unsupported model, too small) are sent as usual
+                logger.warning("Context caching disabled for a prefix: %s", error)
+                self.failures += 1
+                self._handles[key] = (
+                    None,
+                    time.time() + min(FAILED_CREATE_RETRY_SECONDS, self.ttl_seconds),
+                )
+                return None
+
+            self.creates += 1
+            self._handles[key] = (handle, expires_at)
+            if self.store is not None:
+                self.store.set(key, {"name": handle, "expires_at": expires_at})
+            return handle
+
+    async def before_model_callback(
+        self, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[LlmResponse]:
+        if llm_request.config.cached_content:
+            return None
+
+        system_instruction = _instruction_text(llm_request)
+        if estimate_tokens(system_instruction) < self.min_tokens:
+            self.skipped += 1
+            return None
+
+        tools = llm_request.config.tools
+        handle = await self.handle_for(llm_request.model, system_instruction, tools)
+        if handle:
+            self._prefixes[handle] = (
+                llm_request.config.system_instruction,
+                tools,
+                llm_request.config.tool_config,
+            )
+            while len(self._prefixes) > MAX_STORED_HANDLES:
+                self._prefixes.pop(next(iter(self._prefixes)))
+            # The provider rejects requests that repeat what the cache holds
+            llm_request.config.cached_content = handle
+            llm_request.config.system_instruction = None
+            llm_request.config.tools = None
+            llm_request.config.tool_config = None
+        return None
+
+    def restore_prefix(self, llm_request: LlmRequest) -> bool:
+        """Undo the caching of a request, e.g. before sending it to another model.
+
+        Cached contents belong to one model, so a request rerouted to a
+        different model must carry its system instruction and tools again.
+        """
+        if llm_request.config is None or not llm_request.config.cached_content:
+            return False
+        prefix = self._prefixes.get(llm_request.config.cached_content)
+        if prefix is None:
+            return False
+        (
+            llm_request.config.system_instruction,
+            llm_request.config.tools,
+            llm_request.config.tool_config,
+        ) = prefix
+        llm_request.config.cached_content = None
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "creates": self.creates,
+            "skipped": self.skipped,
+            "failures": self.failures,
+            "handles": sum(1 for handle, _ in self._handles.values() if handle),
+        }
+
+
+context_cache = ContextCache(
+    backend=GeminiContextCacheBackend(),
+    ttl_seconds=config.context_cache_ttl_seconds,
+    min_tokens=config.context_cache_min_tokens,
+    store=DiskCache(
+        directory=config.context_cache_dir,
+        ttl_seconds=config.context_cache_ttl_seconds,
+        max_entries=MAX_STORED_HANDLES,
+    ),
+)
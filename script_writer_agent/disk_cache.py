@@ -0,0 +1,146 @@
+"""A small on-disk JSON cache with TTL expiry and LRU eviction"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+def hash_key(*parts: Any) -> str:
+    """Build a stable sha256 key from JSON-serializable parts"""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """Stores JSON entries as one file per key.
+
+    Entries older than ``ttl_seconds`` are treated as misses and removed.
+    Every read touches the entry file, so its modification time doubles as the
+    LRU clock: once more than ``max_entries`` files exist, or the files take
+    more than ``max_bytes`` in total, the least recently used ones are evicted.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        ttl_seconds: float,
+        max_entries: int,
+        max_bytes: Optional[int] = None,
+    ):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached value for ``key`` or None on a miss"""
+        path = self._path(key)
+        with self._lock:
+            try:
+                with open(path, "r", encoding="utf-8") as file:
+                    entry = json.load(file)
+            except (OSError, ValueError):
+                self.misses += 1
+                return None
+
+            if time.time() - entry.get("created_at", 0) > self.ttl_seconds:
+                self._remove(path)
+                self.misses += 1
+                return None
+
+            os.utime(path)
+            self.hits += 1
+            return entry["value"]
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        """Store ``value`` under ``key`` and evict entries over the size bound"""
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with self._lock:
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump({"created_at": time.time(), "value": value}, file)
+            os.replace(tmp_path, path)
+            self._evict()
+
+    def clear(self) -> None:
+        """Remove every entry and reset the counters"""
+        with self._lock:
+            for path in self._entry_paths():
+                self._remove(path)
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for the cache"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._entry_paths()),
+            "bytes": self.size_bytes(),
+        }
+
+    def size_bytes(self) -> int:
+        """Return the total size of the entry files"""
+        total = 0
+        for path in self._entry_paths():
+            try:
+                total += os.path.getsize(path)
+            except OSError:
+                pass
+        return total
+
+    def _entry_paths(self):
+        if not os.path.isdir(self.directory):
+            return []
+        return [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.endswith(".json")
+        ]
+
+    def _evict(self) -> None:
+        paths = self._entry_paths()
+        overflow = len(paths) - self.max_entries
+        if overflow > 0:
+            paths.sort(key=os.path.getmtime)
+            for path in paths[:overflow]:
+                self._remove(path)
+                self.evictions += 1
+            paths = paths[overflow:]
+
+        if self.max_bytes is None:
+            return
+        entries = []
+        for path in paths:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            self.evictions += 1
+            total -= size
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,161 @@
+"""Section-diff-aware validation so unchanged, approved sections are not re-reviewed"""
+
+import hashlib
+from typing import Any, Dict, List, Mapping, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+from google.genai.types import Content
+
+from .agent_utils import current_tool_turns
+from .markdown_utils import MarkdownSection, split_sections
+from .schemas import validation_result as structured_validation_result
+from .sub_agents.validation_checkers import artifact_under_review
+
+ARTIFACT_LABELS = {
+    "script_outline": "script outline",
+    "script": "script",
+    "production_script": "production script",
+}
+
+FULL_REVIEW_REQUEST = """Validate the {label} against the guidelines.
+
+{markdown}
+"""
+
+SCOPED_REVIEW_REQUEST = """Validate the {label} against the guidelines.
+
+The sections marked as approved have not changed since the last approved review and must not be reviewed again.
+Review the changed sections in full and check that they still fit the overall structure.
+
+## Document Structure
+{structure}
+
+## Changed Sections
+{changed}
+"""
+
+
+def section_hash(section: MarkdownSection) -> str:
+    """Hash a section's heading and body, ignoring surrounding whitespace"""
+    return hashlib.sha256(section.text.strip().encode("utf-8")).hexdigest()
+
+
+def section_hashes(markdown: str) -> List[str]:
+    """Return the hash of every markdown section in document order"""
+    return [section_hash(section) for section in split_sections(markdown or "")]
+
+
+def is_approved(validation_result: Optional[str]) -> bool:
+    """Return True if an editor result reports the APPROVED status"""
+    if not validation_result:
+        return False
+    lines = validation_result.strip().upper().splitlines()
+    status_line = next((line for line in lines if "STATUS" in line), lines[0])
+    return "APPROVED" in status_line and "REQUIRES CHANGES" not in status_line
+
+
+def latest_result_approved(state: Mapping[str, Any]) -> bool:
+    """Return True if the latest editor result in ``state`` is APPROVED"""
+    result = structured_validation_result(state)
+    if result is not None:
+        return result.approved
+    return is_approved(state.get("validation_result"))
+
+
+def build_review_request(artifact_key: str, markdown: str, approved: List[str]) -> str:
+    """Ask for a review of the changed sections, or of everything if none was approved"""
+    if not approved:
+        return FULL_REVIEW_REQUEST.format(
+            label=ARTIFACT_LABELS[artifact_key], markdown=markdown
+        )
+
+    structure = []
+    changed = []
+    for section in split_sections(markdown):
+        name = section.heading or "(introduction)"
+        if section_hash(section) in approved:
+            structure.append(f"- {name} (approved, unchanged)")
+        else:
+            structure.append(f"- {name} (changed)")
+            changed.append(section.text)
+    return SCOPED_REVIEW_REQUEST.format(
+        label=ARTIFACT_LABELS[artifact_key],
+        structure="\n".join(structure),
+        changed="\n\n".join(changed),
+    )
+
+
+class IncrementalValidation:
+    """Editor callbacks that reuse approvals for sections that did not change.
+
+    The editor model receives the artifact under review from session state
+    instead of the full conversation. Every APPROVED review records the
+    section hashes of the reviewed artifact in ``approved_section_hashes``.
+    On the next review of that artifact:
+
+    - if no section changed, the previous approval is reused and the editor
+      model is not called;
+    - otherwise the model only receives the changed sections and an outline
+      of the document structure.
+    """
+
+    def before_agent_callback(
+        self, callback_context: CallbackContext
+    ) -> Optional[Content]:
+        state = callback_context.state
+        state["validation_scope"] = None
+        state["validation_artifact"] = None
+
+        artifact_key = artifact_under_review(
+            callback_context._invocation_context.session
+        )
+        if artifact_key is None:
+            return None
+        state["validation_artifact"] = artifact_key
+
+        markdown = state.get(artifact_key) or ""
+        approved: Dict[str, List[str]] = state.get("approved_section_hashes") or {}
+        previous = approved.get(artifact_key) or []
+        if previous and section_hashes(markdown) == previous:
+            results = state.get("approved_validation_results") or {}
+            if results.get(artifact_key):
+                state["validation_result"] = results[artifact_key]
+                return Content(parts=[types.Part(text=results[artifact_key])])
+            return None
+
+        state["validation_scope"] = build_review_request(
+            artifact_key, markdown, previous
+        )
+        return None
+
+    def before_model_callback(
+        self, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[LlmResponse]:
+        scope = callback_context.state.get("validation_scope")
+        if scope:
+            # Keep the editor's own tool calls and results of this model turn
+            tool_turns = current_tool_turns(llm_request.contents)
+            llm_request.contents = [
+                types.Content(role="user", parts=[types.Part(text=scope)])
+            ] + tool_turns
+        return None
+
+    def after_agent_callback(self, callback_context: CallbackContext) -> None:
+        state = callback_context.state
+        artifact_key = state.get("validation_artifact")
+        if not artifact_key or not latest_result_approved(state):
+            return None
+
+        approved = dict(state.get("approved_section_hashes") or {})
+        approved[artifact_key] = section_hashes(state.get(artifact_key) or "")
+        state["approved_section_hashes"] = approved
+
+        results = dict(state.get("approved_validation_results") or {})
+        results[artifact_key] = state.get("validation_result")
+        state["approved_validation_results"] = results
+        return None
+
+
+incremental_validation = IncrementalValidation()
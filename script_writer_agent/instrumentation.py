@@ -0,0 +1,378 @@
+"""
+Per-agent latency, token and tool-call instrumentation
+
+Every agent run in the tree produces one record with its wall time, model
+calls and the models that served them, prompt/completion tokens, grounding
+searches, tool calls and retries.
+Records are written to a JSON lines file as they complete and can be turned
+into Prometheus text format, with p50/p99 wall time per agent and stage.
+
+Usage:
+    python -m script_writer_agent.instrumentation metrics.jsonl > metrics.prom
+"""
+
+import argparse
+import collections
+import inspect
+import json
+import math
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Tuple
+
+from google.adk.agents import BaseAgent, LlmAgent, LoopAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.adk.tools import BaseTool, ToolContext
+from google.genai.types import Content
+
+from .config import config
+from .models import served_by
+from .retry import RETRIES_KEY
+
+# Agents that define a pipeline stage; nested agents inherit their stage
+STAGE_AGENTS: Dict[str, str] = {
+    "script_writer_agent": "root",
+    "robust_researcher": "research",
+    "robust_script_panner": "plan",
+    "robust_script_editor": "validate",
+    "robust_script_writer": "write",
+    "robust_script_director": "direct",
+}
+
+# Function tools that perform a web search on the model's behalf
+SEARCH_TOOL_NAMES = {"google_search", "web_search"}
+
+QUANTILES = (0.5, 0.99)
+
+
+def stage_of(agent: BaseAgent) -> str:
+    """Return the stage of the nearest stage-defining ancestor"""
+    current: Optional[BaseAgent] = agent
+    while current is not None:
+        if current.name in STAGE_AGENTS:
+            return STAGE_AGENTS[current.name]
+        current = current.parent_agent
+    return "other"
+
+
+@dataclass
+class AgentRunRecord:
+    """Measurements for a single run of one agent"""
+
+    agent: str
+    stage: str
+    invocation_id: str
+    session_id: str
+    started_at: float
+    wall_seconds: float = 0.0
+    model_calls: int = 0
+    models: Dict[str, int] = field(default_factory=dict)  # model calls per model
+    model_seconds: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    searches: int = 0
+    tool_calls: Dict[str, int] = field(default_factory=dict)
+    retries: int = 0
+    model_retries: int = 0  # transient model errors retried within a call
+    skipped: bool = False  # a before-agent callback answered instead of the agent
+    # Runs of each direct sub-agent of a LoopAgent, used to count retries
+    sub_agent_runs: Dict[str, int] = field(default_factory=dict, repr=False)
+
+
+class JsonLinesExporter:
+    """Appends each finished record to a JSON lines file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, record: AgentRunRecord) -> None:
+        line = asdict(record)
+        del line["sub_agent_runs"]
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock, open(self.path, "a", encoding="utf-8") as file:
+            file.write(json.dumps(line) + "\n")
+
+
+def _quantile(values: List[float], quantile: float) -> float:
+    """Nearest-rank quantile of a non-empty list"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(quantile * len(ordered)) - 1))
+    return ordered[index]
+
+
+def _labels(**labels: str) -> str:
+    return ",".join(f'{name}="{value}"' for name, value in labels.items())
+
+
+def prometheus_text(records: Iterable[Dict[str, Any]]) -> str:
+    """Render records (as dicts) in the Prometheus text exposition format"""
+    wall_times: Dict[Tuple[str, str], List[float]] = collections.defaultdict(list)
+    counters: Dict[str, Dict[Tuple[str, str], float]] = collections.defaultdict(
+        lambda: collections.defaultdict(float)
+    )
+    tool_calls: Dict[Tuple[str, str, str], int] = collections.defaultdict(int)
+    model_calls: Dict[Tuple[str, str, str], int] = collections.defaultdict(int)
+
+    for record in records:
+        key = (record["stage"], record["agent"])
+        wall_times[key].append(record["wall_seconds"])
+        for name in (
+            "model_calls",
+            "model_seconds",
+            "prompt_tokens",
+            "completion_tokens",
+            "cached_tokens",
+            "searches",
+            "retries",
+            "model_retries",
+        ):
+            counters[name][key] += record.get(name, 0)
+        counters["skipped_runs"][key] += int(record.get("skipped", False))
+        for tool, count in (record.get("tool_calls") or {}).items():
+            tool_calls[key + (tool,)] += count
+        for model, count in (record.get("models") or {}).items():
+            model_calls[key + (model,)] += count
+
+    lines = [
+        "# HELP script_writer_agent_run_seconds Wall time of an agent run.",
+        "# TYPE script_writer_agent_run_seconds summary",
+    ]
+    for (stage, agent), values in sorted(wall_times.items()):
+        for quantile in QUANTILES:
+            labels = _labels(stage=stage, agent=agent, quantile=str(quantile))
+            lines.append(
+                f"script_writer_agent_run_seconds{{{labels}}} "
+                f"{_quantile(values, quantile):.6f}"
+            )
+        labels = _labels(stage=stage, agent=agent)
+        lines.append(
+            f"script_writer_agent_run_seconds_sum{{{labels}}} {sum(values):.6f}"
+        )
+        lines.append(f"script_writer_agent_run_seconds_count{{{labels}}} {len(values)}")
+
+    for name, values in counters.items():
+        metric = f"script_writer_{name}_total"
+        lines.append(f"# TYPE {metric} counter")
+        for (stage, agent), value in sorted(values.items()):
+            lines.append(f"{metric}{{{_labels(stage=stage, agent=agent)}}} {value:g}")
+
+    lines.append("# TYPE script_writer_tool_calls_total counter")
+    for (stage, agent, tool), count in sorted(tool_calls.items()):
+        labels = _labels(stage=stage, agent=agent, tool=tool)
+        lines.append(f"script_writer_tool_calls_total{{{labels}}} {count}")
+
+    lines.append("# TYPE script_writer_model_calls_by_model_total counter")
+    for (stage, agent, model), count in sorted(model_calls.items()):
+        labels = _labels(stage=stage, agent=agent, model=model)
+        lines.append(f"script_writer_model_calls_by_model_total{{{labels}}} {count}")
+    return "\n".join(lines) + "\n"
+
+
+class Instrumentation:
+    """Agent, model and tool callbacks that measure every agent run.
+
+    Install them on a whole agent tree with ``instrument_agent_tree``. Finished
+    records are kept in memory (the most recent ``max_records``) and passed to
+    every exporter.
+    """
+
+    def __init__(self, exporters: Iterable[Any] = (), max_records: int = 10000):
+        self.exporters = list(exporters)
+        self.records: Deque[AgentRunRecord] = collections.deque(maxlen=max_records)
+        self._pending: Dict[Tuple[str, str], AgentRunRecord] = {}
+        self._model_started: Dict[Tuple[str, str], float] = {}
+
+    @staticmethod
+    def _key(callback_context: CallbackContext) -> Tuple[str, str]:
+        return callback_context.invocation_id, callback_context.agent_name
+
+    def _start(self, callback_context: CallbackContext) -> None:
+        context = callback_context._invocation_context
+        agent = context.agent
+        parent = agent.parent_agent
+        if isinstance(parent, LoopAgent):
+            parent_record = self._pending.get((context.invocation_id, parent.name))
+            if parent_record is not None:
+                runs = parent_record.sub_agent_runs
+                runs[agent.name] = runs.get(agent.name, 0) + 1
+
+        self._pending[self._key(callback_context)] = AgentRunRecord(
+            agent=agent.name,
+            stage=stage_of(agent),
+            invocation_id=context.invocation_id,
+            session_id=context.session.id,
+            started_at=time.time(),
+        )
+
+    def _finish(self, callback_context: CallbackContext, skipped: bool) -> None:
+        record = self._pending.pop(self._key(callback_context), None)
+        if record is None:
+            return
+
+        # Descendants whose after-agent callbacks never ran end with their parent
+        agent = callback_context._invocation_context.agent
+        for key in [key for key in self._pending if key[0] == record.invocation_id]:
+            if agent.find_sub_agent(key[1]) is not None:
+                self._close(self._pending.pop(key), skipped=True)
+        self._close(record, skipped)
+
+    def _close(self, record: AgentRunRecord, skipped: bool) -> None:
+        record.wall_seconds = round(time.time() - record.started_at, 6)
+        record.model_seconds = round(record.model_seconds, 6)
+        record.skipped = skipped
+        if record.sub_agent_runs:
+            record.retries = max(record.sub_agent_runs.values()) - 1
+        self.records.append(record)
+        for exporter in self.exporters:
+            exporter.export(record)
+
+    def wrap_before_agent_callbacks(self, callbacks: List[Callable]) -> Callable:
+        """Start a record, then run ``callbacks`` like ADK would"""
+
+        async def before_agent_callback(
+            callback_context: CallbackContext,
+        ) -> Optional[Content]:
+            self._start(callback_context)
+            for callback in callbacks:
+                content = callback(callback_context=callback_context)
+                if inspect.isawaitable(content):
+                    content = await content
+                if content:
+                    # ADK skips the agent and its after-agent callbacks
+                    self._finish(callback_context, skipped=True)
+                    return content
+            return None
+
+        return before_agent_callback
+
+    def after_agent_callback(self, callback_context: CallbackContext) -> None:
+        self._finish(callback_context, skipped=False)
+        return None
+
+    def before_model_callback(
+        self, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[LlmResponse]:
+        self._model_started[self._key(callback_context)] = time.perf_counter()
+        return None
+
+    def after_model_callback(
+        self, callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> Optional[LlmResponse]:
+        if llm_response.partial:
+            return None
+        key = self._key(callback_context)
+        record = self._pending.get(key)
+        started = self._model_started.pop(key, None)
+        if record is None:
+            return None
+
+        record.model_calls += 1
+        model = (
+            served_by(llm_response)
+            or callback_context._invocation_context.agent.canonical_model.model
+        )
+        record.models[model] = record.models.get(model, 0) + 1
+        record.model_retries += (llm_response.custom_metadata or {}).get(RETRIES_KEY, 0)
+        if started is not None:
+            record.model_seconds += time.perf_counter() - started
+        usage = llm_response.usage_metadata
+        if usage is not None:
+            record.prompt_tokens += usage.prompt_token_count or 0
+            record.completion_tokens += usage.candidates_token_count or 0
+            record.cached_tokens += usage.cached_content_token_count or 0
+        grounding = llm_response.grounding_metadata
+        if grounding is not None and grounding.web_search_queries:
+            record.searches += len(grounding.web_search_queries)
+        return None
+
+    def before_tool_callback(
+        self, tool: BaseTool, args: Dict[str, Any], tool_context: ToolContext
+    ) -> Optional[Dict]:
+        record = self._pending.get(self._key(tool_context))
+        if record is not None:
+            record.tool_calls[tool.name] = record.tool_calls.get(tool.name, 0) + 1
+            if tool.name in SEARCH_TOOL_NAMES:
+                record.searches += 1
+        return None
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Return p50/p99 wall time and token totals per stage agent"""
+        by_agent: Dict[str, List[AgentRunRecord]] = collections.defaultdict(list)
+        for record in self.records:
+            if record.agent in STAGE_AGENTS:
+                by_agent[record.agent].append(record)
+
+        summary = {}
+        for agent, records in by_agent.items():
+            wall_times = [record.wall_seconds for record in records]
+            summary[STAGE_AGENTS[agent]] = {
+                "runs": len(records),
+                "p50_seconds": _quantile(wall_times, 0.5),
+                "p99_seconds": _quantile(wall_times, 0.99),
+                "retries": sum(record.retries for record in records),
+                # Model calls are made by the LLM agents inside the stage
+                "model_retries": sum(
+                    record.model_retries
+                    for record in self.records
+                    if record.stage == STAGE_AGENTS[agent]
+                ),
+            }
+        return summary
+
+
+def _agent_tree(agent: BaseAgent) -> List[BaseAgent]:
+    agents = [agent]
+    for sub_agent in agent.sub_agents:
+        agents.extend(_agent_tree(sub_agent))
+    return agents
+
+
+def instrument_agent_tree(agent: BaseAgent, instrumentation: Instrumentation) -> None:
+    """Install the instrumentation callbacks on ``agent`` and all its descendants.
+
+    The instrumentation callbacks run before the existing ones, so a callback
+    that short-circuits (e.g. ``suppress_output_callback``) cannot hide a run.
+    """
+    for node in _agent_tree(agent):
+        node.before_agent_callback = instrumentation.wrap_before_agent_callbacks(
+            node.canonical_before_agent_callbacks
+        )
+        node.after_agent_callback = [
+            instrumentation.after_agent_callback
+        ] + node.canonical_after_agent_callbacks
+        if isinstance(node, LlmAgent):
+            node.before_model_callback = [
+                instrumentation.before_model_callback
+            ] + node.canonical_before_model_callbacks
+            node.after_model_callback = [
+                instrumentation.after_model_callback
+            ] + node.canonical_after_model_callbacks
+            node.before_tool_callback = [
+                instrumentation.before_tool_callback
+            ] + node.canonical_before_tool_callbacks
+
+
+instrumentation = Instrumentation(exporters=[JsonLinesExporter(config.metrics_path)])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Convert instrumentation JSON lines to Prometheus text format."
+    )
+    parser.add_argument("metrics", help="JSON lines file written by the exporter")
+    args = parser.parse_args()
+
+    with open(args.metrics, "r", encoding="utf-8") as file:
+        records = [json.loads(line) for line in file if line.strip()]
+    print(prometheus_text(records), end="")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,413 @@
+"""
+Script Generation Job Service
+
+Runs pipeline jobs submitted by other services, many at a time in one
+process. Jobs wait in a bounded queue and a fixed pool of workers runs them.
+A job can be polled for its status, its results are read from the session
+state of its pipeline run, and cancelling a running job cancels the stage
+that is in flight. A job may name a stored channel profile; its latest
+version is loaded when the job starts, and jobs without one use the
+configured channel.
+
+The service listens for JSON lines on a TCP socket. Every request is one
+object with an "op" field and gets one JSON object back:
+
+    {"op": "submit", "topic": "...", "id": "optional job id",
+     "channel_profile": "optional profile name"}
+    {"op": "status", "id": "..."}
+    {"op": "result", "id": "..."}
+    {"op": "cancel", "id": "..."}
+    {"op": "stats"}
+
+Usage:
+    python -m script_writer_agent.jobs --port 8765 --workers 4 --queue-size 100
+"""
+
+import argparse
+import asyncio
+import collections
+import json
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from .config import config
+
+if TYPE_CHECKING:
+    from .agent_factory import ChannelPipelines
+    from .pipeline import ScriptPipeline
+
+logger = logging.getLogger(__name__)
+
+USER_ID = "jobs"
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED_STATUSES = (DONE, FAILED, CANCELLED)
+
+
+class JobQueueFullError(Exception):
+    """Raised by a non-waiting submit when the queue is at capacity"""
+
+
+@dataclass
+class Job:
+    id: str
+    topic: str
+    channel_profile: Optional[str] = None
+    status: str = QUEUED
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    completed_stages: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+    task: Optional["asyncio.Task[Dict[str, Any]]"] = None
+    finished: asyncio.Event = field(default_factory=asyncio.Event)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "topic": self.topic,
+            "channel_profile": self.channel_profile,
+            "status": self.status,
+            "completed_stages": list(self.completed_stages),
+            "error": self.error,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobService:
+    """Runs pipeline jobs from a bounded queue with ``workers`` at a time.
+
+    ``submit`` waits for room in the queue, or with ``wait=False`` raises
+    ``JobQueueFullError``, so producers slow down instead of piling up
+    work. Finished jobs beyond ``history_size`` are forgotten, oldest first,
+    together with their sessions.
+
+    With ``channel_pipelines`` every job runs on the pipeline of its channel
+    profile. They must share ``pipeline``'s session service, where results
+    are read from.
+    """
+
+    def __init__(
+        self,
+        pipeline: "ScriptPipeline",
+        workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        history_size: Optional[int] = None,
+        user_id: str = USER_ID,
+        channel_pipelines: Optional["ChannelPipelines"] = None,
+    ):
+        self.pipeline = pipeline
+        self.channel_pipelines = channel_pipelines
+        self.workers = workers or config.job_workers
+        self.history_size = history_size or config.job_history_size
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(
+            maxsize=queue_size or config.job_queue_size
+        )
+        self.jobs: "collections.OrderedDict[str, Job]" = collections.OrderedDict()
+        self.counters = collections.Counter()
+        self._workers: List[asyncio.Task] = []
+
+    def start(self) -> "JobService":
+        if not self._workers:
+            self._workers = [
+                asyncio.ensure_future(self._worker()) for _ in range(self.workers)
+            ]
+        return self
+
+    async def close(self, cancel_running: bool = True) -> None:
+        """Stop the workers, cancelling running jobs unless told to finish them"""
+        if not cancel_running:
+            await self.queue.join()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(
+        self,
+        topic: str,
+        job_id: Optional[str] = None,
+        wait: bool = True,
+        channel_profile: Optional[str] = None,
+    ) -> Job:
+        """Queue a pipeline run for ``topic`` and return its job"""
+        job_id = job_id or uuid.uuid4().hex
+        if job_id in self.jobs:
+            raise ValueError(f"Job '{job_id}' already exists")
+        if channel_profile:
+            if self.channel_pipelines is None:
+                raise ValueError("This service does not serve channel profiles")
+            # Fails early for a profile that is not stored
+            self.channel_pipelines.channel_info(channel_profile)
+        job = Job(id=job_id, topic=topic, channel_profile=channel_profile or None)
+        # Registered before waiting for room, so a second submit of the id fails
+        self.jobs[job_id] = job
+        try:
+            if wait:
+                await self.queue.put(job)
+            else:
+                try:
+                    self.queue.put_nowait(job)
+                except asyncio.QueueFull:
+                    self.counters["rejected"] += 1
+                    raise JobQueueFullError(
+                        f"{self.queue.qsize()} jobs are already queued"
+                    ) from None
+        except BaseException:
+            del self.jobs[job_id]
+            raise
+        self.counters["submitted"] += 1
+        return job
+
+    def get(self, job_id: str) -> Job:
+        job = self.jobs.get(job_id)
+        if job is None:
+            raise KeyError(f"Job '{job_id}' not found")
+        return job
+
+    def status(self, job_id: str) -> Dict[str, Any]:
+        return self.get(job_id).to_dict()
+
+    async def result(self, job_id: str) -> Dict[str, Any]:
+        """Return the stage outputs of the job's session, finished or not"""
+        job = self.get(job_id)
+        session = await self.pipeline.session_service.get_session(
+            app_name=self.pipeline.app_name, user_id=self.user_id, session_id=job.id
+        )
+        state = session.state if session is not None else {}
+        return {
+            stage.output_key: state.get(stage.output_key)
+            for stage in self.pipeline.stages
+        }
+
+    async def wait(self, job_id: str, timeout: Optional[float] = None) -> Job:
+        job = self.get(job_id)
+        await asyncio.wait_for(job.finished.wait(), timeout)
+        return job
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued job, or the in-flight stage of a running one.
+
+        Returns False if the job had already finished.
+        """
+        job = self.get(job_id)
+        if job.status in FINISHED_STATUSES:
+            return False
+        if job.status == QUEUED:
+            # The worker that dequeues it skips it
+            self._finish(job, CANCELLED)
+        elif job.task is not None:
+            job.task.cancel()
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the queue depth and in-flight gauges and the job counters"""
+        statuses = collections.Counter(job.status for job in self.jobs.values())
+        return {
+            "queue_depth": statuses[QUEUED],
+            "queue_capacity": self.queue.maxsize,
+            "in_flight": statuses[RUNNING],
+            "workers": self.workers,
+            "submitted": self.counters["submitted"],
+            "rejected": self.counters["rejected"],
+            "done": self.counters[DONE],
+            "failed": self.counters[FAILED],
+            "cancelled": self.counters[CANCELLED],
+        }
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self.queue.get()
+            try:
+                if job.status == QUEUED:
+                    await self._run(job)
+            finally:
+                self.queue.task_done()
+
+    def _pipeline_for(self, job: Job) -> "ScriptPipeline":
+        if self.channel_pipelines is None:
+            return self.pipeline
+        return self.channel_pipelines.get(job.channel_profile)
+
+    async def _run(self, job: Job) -> None:
+        job.status = RUNNING
+        job.started_at = time.time()
+        try:
+            pipeline = self._pipeline_for(job)
+        except (KeyError, ValueError) as error:
+            # The profile was deleted after the job was submitted
+            logger.warning("Job %s failed: %s", job.id, error)
+            self._finish(job, FAILED, str(error).strip("'\""))
+            await self._forget_old_jobs()
+            return
+
+        async def record_stage(stage_name: str, state: Dict[str, Any]) -> None:
+            job.completed_stages.append(stage_name)
+
+        job.task = asyncio.ensure_future(
+            pipeline.run(
+                topic=job.topic,
+                user_id=self.user_id,
+                session_id=job.id,
+                on_stage_complete=record_stage,
+            )
+        )
+        try:
+            # Waiting without awaiting the task keeps a job cancellation
+            # from cancelling the worker
+            await asyncio.wait({job.task})
+        except asyncio.CancelledError:
+            job.task.cancel()
+            await asyncio.gather(job.task, return_exceptions=True)
+            self._finish(job, CANCELLED)
+            raise
+
+        if job.task.cancelled():
+            self._finish(job, CANCELLED)
+        elif job.task.exception() is not None:
+            error = job.task.exception()
+            logger.warning("Job %s failed: %s", job.id, error)
+            self._finish(job, FAILED, str(error))
+        else:
+            self._finish(job, DONE)
+        job.task = None
+        await self._forget_old_jobs()
+
+    def _finish(self, job: Job, status: str, error: Optional[str] = None) -> None:
+        job.status = status
+        job.error = error
+        job.finished_at = time.time()
+        self.counters[status] += 1
+        job.finished.set()
+
+    async def _forget_old_jobs(self) -> None:
+        finished = [
+            job for job in self.jobs.values() if job.status in FINISHED_STATUSES
+        ]
+        for job in finished[: max(len(finished) - self.history_size, 0)]:
+            del self.jobs[job.id]
+            await self.pipeline.session_service.delete_session(
+                app_name=self.pipeline.app_name,
+                user_id=self.user_id,
+                session_id=job.id,
+            )
+
+
+async def handle_request(
+    service: JobService, request: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Answer one JSON request of the line protocol"""
+    op = request.get("op")
+    try:
+        if op == "submit":
+            job = await service.submit(
+                request["topic"],
+                request.get("id"),
+                wait=request.get("wait", False),
+                channel_profile=request.get("channel_profile"),
+            )
+            return job.to_dict()
+        if op == "status":
+            return service.status(request["id"])
+        if op == "result":
+            return {
+                **service.status(request["id"]),
+                "result": await service.result(request["id"]),
+            }
+        if op == "cancel":
+            return {"id": request["id"], "cancelled": service.cancel(request["id"])}
+        if op == "stats":
+            return service.stats()
+    except (JobQueueFullError, KeyError, ValueError) as error:
+        return {"error": str(error).strip("'\"")}
+    return {"error": f"Unknown op: {op!r}"}
+
+
+async def serve(service: JobService, host: str, port: int) -> None:
+    async def handle_connection(
+        reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    response = {"error": "Invalid JSON"}
+                else:
+                    response = await handle_request(service, request)
+                writer.write(json.dumps(response).encode("utf-8") + b"\n")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle_connection, host, port)
+    service.start()
+    print(f"🛠️  Job service listening on {host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+
+async def run_service(
+    host: str,
+    port: int,
+    workers: int,
+    queue_size: int,
+    durable_sessions: bool = False,
+) -> None:
+    from .agent_factory import ChannelPipelines
+    from .session_store import SqliteSessionService
+
+    session_service = (
+        SqliteSessionService(config.session_db_path) if durable_sessions else None
+    )
+    channel_pipelines = ChannelPipelines(session_service=session_service)
+    service = JobService(
+        channel_pipelines.get(),
+        workers=workers,
+        queue_size=queue_size,
+        channel_pipelines=channel_pipelines,
+    )
+    await serve(service, host, port)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve script generation jobs.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=config.job_workers)
+    parser.add_argument("--queue-size", type=int, default=config.job_queue_size)
+    parser.add_argument(
+        "--durable-sessions",
+        action="store_true",
+        help="keep sessions and stage checkpoints in the SQLite session database",
+    )
+    args = parser.parse_args()
+
+    from .pipeline import filter_stage_runner_warnings
+
+    load_dotenv()
+    filter_stage_runner_warnings()
+    asyncio.run(
+        run_service(
+            args.host, args.port, args.workers, args.queue_size, args.durable_sessions
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
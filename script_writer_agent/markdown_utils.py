@@ -0,0 +1,108 @@
+"""Helpers for slicing the markdown produced by the agents into sections"""
+
+import re
+from dataclasses import dataclass
+from typing import List, Optional
+
+_HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+
+
+@dataclass
+class MarkdownSection:
+    """A heading and the text up to the next heading"""
+
+    level: int  # 0 for text before the first heading
+    heading: str
+    body: str
+
+    @property
+    def text(self) -> str:
+        """The section rendered back to markdown"""
+        if not self.level:
+            return self.body
+        heading = f"{'#' * self.level} {self.heading}"
+        return f"{heading}\n{self.body}" if self.body else heading
+
+
+def clean_heading(heading: str) -> str:
+    """Strip emphasis markers and trailing colons from a heading"""
+    return heading.replace("**", "").replace("__", "").strip().rstrip(":").strip()
+
+
+def split_sections(markdown: str) -> List[MarkdownSection]:
+    """Split markdown into sections at every heading, ignoring fenced code"""
+    sections = [MarkdownSection(level=0, heading="", body="")]
+    lines: List[str] = []
+    in_code_block = False
+
+    for line in markdown.splitlines():
+        if line.lstrip().startswith("```"):
+            in_code_block = not in_code_block
+        match = None if in_code_block else _HEADING_PATTERN.match(line)
+        if match:
+            sections[-1].body = "\n".join(lines).strip("\n")
+            sections.append(
+                MarkdownSection(
+                    level=len(match.group(1)),
+                    heading=clean_heading(match.group(2)),
+                    body="",
+                )
+            )
+            lines = []
+        else:
+            lines.append(line)
+    sections[-1].body = "\n".join(lines).strip("\n")
+
+    if not sections[0].body:
+        sections.pop(0)
+    return sections
+
+
+def _index_of(
+    sections: List[MarkdownSection], section: MarkdownSection
+) -> Optional[int]:
+    for index, candidate in enumerate(sections):
+        if candidate is section:
+            return index
+    return None
+
+
+def subsections(
+    sections: List[MarkdownSection], parent: MarkdownSection
+) -> List[MarkdownSection]:
+    """Return the direct child headings of ``parent``"""
+    index = _index_of(sections, parent)
+    children: List[MarkdownSection] = []
+    child_level: Optional[int] = None
+    for section in sections[index + 1 :]:
+        if section.level <= parent.level:
+            break
+        if child_level is None:
+            child_level = section.level
+        if section.level == child_level:
+            children.append(section)
+    return children
+
+
+def find_section(
+    sections: List[MarkdownSection], *keywords: str
+) -> Optional[MarkdownSection]:
+    """Return the first section whose heading mentions any of ``keywords``"""
+    for section in sections:
+        heading = section.heading.lower()
+        if section.level and any(keyword in heading for keyword in keywords):
+            return section
+    return None
+
+
+def section_tree_text(sections: List[MarkdownSection], section: MarkdownSection) -> str:
+    """Render ``section`` together with all of its nested sub-sections"""
+    index = _index_of(sections, section)
+    if index is None:
+        return section.text
+    parts = [section.text]
+    for child in sections[index + 1 :]:
+        if child.level <= section.level:
+            break
+        parts.append(child.text)
+    return "\n\n".join(parts)
@@ -0,0 +1,148 @@
+"""Per-agent model assignment and a router that falls back to an alternate model"""
+
+import asyncio
+import logging
+import time
+from typing import Any, AsyncGenerator, Dict, Optional, Tuple, Union
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.models.registry import LLMRegistry
+
+from .config import config
+from .context_cache import context_cache
+from .retry import with_retries
+
+logger = logging.getLogger(__name__)
+
+# Key under LlmResponse.custom_metadata naming the model that answered
+SERVED_BY_KEY = "served_by"
+
+
+class ModelTimeoutError(Exception):
+    """The primary model did not start streaming within the latency SLO"""
+
+
+class FallbackLlm(BaseLlm):
+    """Sends requests to ``primary`` and falls back to ``fallback`` when it fails.
+
+    A request falls back when the primary raises, including after its
+    retries are used up or while its circuit is open, or when a streamed
+    request gets no first chunk within ``latency_slo_seconds``. Without
+    streaming the first response is the whole generation, whose length
+    depends on the agent's output rather than the model's health, so it is
+    not timed. After a failure the primary is skipped for
+    ``cooldown_seconds``, so a slow or failing model does not delay every
+    call in a validation loop. Once the primary has streamed a partial
+    response there is no fallback, since the caller has already seen its
+    output.
+
+    Every response names the model that produced it under
+    ``custom_metadata["served_by"]``.
+    """
+
+    primary: BaseLlm
+    fallback: BaseLlm
+    latency_slo_seconds: float = 120.0
+    cooldown_seconds: float = 300.0
+    primary_calls: int = 0
+    fallback_calls: int = 0
+    unavailable_until: float = 0.0
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        if time.monotonic() >= self.unavailable_until:
+            self.primary_calls += 1
+            responses = self.primary.generate_content_async(llm_request, stream)
+            try:
+                first = await asyncio.wait_for(
+                    responses.__anext__(),
+                    timeout=self.latency_slo_seconds if stream else None,
+                )
+            except StopAsyncIteration:
+                return
+            except Exception as error:  # pylint: disable=broad-except
+                await responses.aclose()
+                if isinstance(error, asyncio.TimeoutError):
+                    error = ModelTimeoutError(
+                        f"no first chunk within {self.latency_slo_seconds}s"
+                    )
+                self.unavailable_until = time.monotonic() + self.cooldown_seconds
+                logger.warning(
+                    "%s failed (%s), falling back to %s",
+                    self.primary.model,
+                    error,
+                    self.fallback.model,
+                )
+            else:
+                yield self._served_by(first, self.primary)
+                async for response in responses:
+                    yield self._served_by(response, self.primary)
+                return
+
+        self.fallback_calls += 1
+        # Cached contents belong to the primary model
+        context_cache.restore_prefix(llm_request)
+        llm_request.model = self.fallback.model
+        async for response in self.fallback.generate_content_async(llm_request, stream):
+            yield self._served_by(response, self.fallback)
+
+    @staticmethod
+    def _served_by(response: LlmResponse, llm: BaseLlm) -> LlmResponse:
+        response.custom_metadata = {
+            **(response.custom_metadata or {}),
+            SERVED_BY_KEY: llm.model,
+        }
+        return response
+
+
+# Models are shared, so every agent on a model sees the same cooldown
+_models: Dict[Tuple[str, Optional[str]], BaseLlm] = {}
+
+
+def model_for(agent_name: str, group: Optional[str] = None) -> Union[str, BaseLlm]:
+    """Return the model for an agent, with retries and fallback if configured.
+
+    Agents built in numbered or per-platform sets also name their ``group``,
+    e.g. "platform_researcher", whose entry applies to every agent of the set
+    that has no entry of its own.
+    """
+    model = config.agent_models.get(
+        agent_name, config.agent_models.get(group or "", config.main_model)
+    )
+    fallback = config.model_fallbacks.get(model)
+    if not config.model_fallback_enabled or fallback == model:
+        fallback = None
+
+    key = (model, fallback)
+    if key not in _models:
+        primary = with_retries(LLMRegistry.new_llm(model))
+        if fallback is None:
+            _models[key] = primary
+        else:
+            _models[key] = FallbackLlm(
+                model=model,
+                primary=primary,
+                fallback=with_retries(LLMRegistry.new_llm(fallback)),
+                latency_slo_seconds=config.model_latency_slo_seconds,
+                cooldown_seconds=config.model_fallback_cooldown_seconds,
+            )
+    return _models[key]
+
+
+def served_by(llm_response: LlmResponse) -> Optional[str]:
+    """Return the model that produced a response, if a router recorded it"""
+    return (llm_response.custom_metadata or {}).get(SERVED_BY_KEY)
+
+
+def router_stats() -> Dict[str, Dict[str, Any]]:
+    """Return primary/fallback call counts for every router in use"""
+    return {
+        f"{primary}->{fallback}": {
+            "primary_calls": router.primary_calls,
+            "fallback_calls": router.fallback_calls,
+            "primary_available": time.monotonic() >= router.unavailable_until,
+        }
+        for (primary, fallback), router in _models.items()
+        if isinstance(router, FallbackLlm)
+    }
@@ -0,0 +1,470 @@
+"""Run the research → plan → validate → write → direct pipeline without the root agent"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+from google.adk.agents import BaseAgent
+from google.adk.events import Event, EventActions
+from google.adk.runners import Runner
+from google.adk.sessions import (
+    BaseSessionService,
+    InMemorySessionService,
+    Session,
+    State,
+)
+from google.genai import types
+
+from .config import config
+from .incremental_validation import latest_result_approved
+from .schemas import VALIDATION_DATA_KEY, validation_result
+from .session_store import CHECKPOINT_KEYS, SqliteSessionService
+
+logger = logging.getLogger(__name__)
+
+APP_NAME = "script_writer_pipeline"
+
+
+class StageRunnerLogFilter(logging.Filter):
+    """Drops the runner warning about events of another stage's agent.
+
+    Stage runners share a session, so every stage would warn about the
+    events the other stages left in it. Other runner warnings pass.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return not str(record.msg).startswith("Event from an unknown agent")
+
+
+_stage_runner_log_filter = StageRunnerLogFilter()
+
+
+def filter_stage_runner_warnings() -> None:
+    """Silence the unknown-agent warnings of stage runners sharing a session"""
+    logging.getLogger("google_adk.google.adk.runners").addFilter(
+        _stage_runner_log_filter
+    )
+
+
+@dataclass(frozen=True)
+class PipelineStage:
+    """One step of the pipeline and the agent that runs it"""
+
+    name: str
+    agent_name: str
+    output_key: str
+    message: Optional[str]  # None lets the agent work from session history alone
+
+
+PIPELINE_STAGES: List[PipelineStage] = [
+    PipelineStage(
+        "research",
+        "robust_researcher",
+        "research_findings",
+        "Research the topic: {topic}",
+    ),
+    PipelineStage(
+        "plan",
+        "robust_script_panner",
+        "script_outline",
+        "Create a script outline for a video about: {topic}",
+    ),
+    # The editor validates the most recent artifact from session state
+    PipelineStage("validate", "robust_script_editor", "validation_result", None),
+    PipelineStage(
+        "write",
+        "robust_script_writer",
+        "script",
+        "Write the script for the video based on the approved outline.",
+    ),
+    PipelineStage(
+        "direct",
+        "robust_script_director",
+        "production_script",
+        "Create the production script with integrated directorial guidance.",
+    ),
+]
+
+REVISE_OUTLINE_MESSAGE = """Revise the script outline for a video about: {topic}
+
+The editor requested these changes:
+{feedback}"""
+
+
+def revision_feedback(state: Dict[str, Any]) -> str:
+    """Return the editor's required changes, or its whole result as text"""
+    result = validation_result(state)
+    if result is not None and result.required_changes:
+        return "\n".join(f"- {change}" for change in result.required_changes)
+    return state.get("validation_result") or ""
+
+
+class OutlineRejectedError(Exception):
+    """The editor still rejects the outline after every allowed revision"""
+
+
+StageCallback = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+
+@dataclass
+class Speculation:
+    """A stage started from an outline that is still being validated"""
+
+    stage: PipelineStage
+    outline: Any
+    task: "asyncio.Task[Dict[str, Any]]"
+    started_at: float
+    finished_at: Optional[float] = None
+
+
+class SpeculationStats:
+    """Counts speculative stages that were committed or discarded"""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self.discarded_seconds = 0.0
+
+    def record(self, hit: bool, seconds: float) -> None:
+        if hit:
+            self.hits += 1
+            self.saved_seconds += seconds
+        else:
+            self.misses += 1
+            self.discarded_seconds += seconds
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the hit rate, the latency saved by hits and the work discarded"""
+        attempts = self.hits + self.misses
+        return {
+            "attempts": attempts,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / attempts, 3) if attempts else 0.0,
+            "saved_seconds": round(self.saved_seconds, 3),
+            "discarded_seconds": round(self.discarded_seconds, 3),
+        }
+
+
+class ScriptPipeline:
+    """Runs the pipeline stages for a topic in a single session.
+
+    Each stage runs its ``robust_*`` agent directly, so no root-agent turns
+    are spent on routing. Stages listed in ``completed_stages`` are skipped,
+    which lets an interrupted run resume from its last finished stage.
+
+    With a ``SqliteSessionService`` every finished stage is checkpointed, and
+    a run of an existing session resumes from its last checkpoint on its own.
+
+    With ``speculative_writing`` the write stage starts from the candidate
+    outline in a scratch session while the editor validates it. Its state
+    changes are committed if the outline is approved unchanged, and the run
+    is cancelled and discarded otherwise. The scratch session has the state
+    but not the conversation, so speculation needs ``config.state_compaction``,
+    which builds the writer's prompt from state alone.
+    """
+
+    def __init__(
+        self,
+        root_agent: BaseAgent,
+        session_service: Optional[BaseSessionService] = None,
+        stages: Iterable[PipelineStage] = PIPELINE_STAGES,
+        max_outline_revisions: int = 2,
+        app_name: str = APP_NAME,
+        speculative_writing: Optional[bool] = None,
+    ):
+        self.session_service = session_service or InMemorySessionService()
+        self.stages = list(stages)
+        self.max_outline_revisions = max_outline_revisions
+        self.app_name = app_name
+        self.speculative_writing = (
+            config.speculative_script_writing
+            if speculative_writing is None
+            else speculative_writing
+        )
+        if self.speculative_writing and not config.state_compaction:
+            logger.warning(
+                "Speculative writing needs state compaction and is turned off"
+            )
+            self.speculative_writing = False
+        self.speculation = SpeculationStats()
+        self.runners: Dict[str, Runner] = {}
+        self.speculative_runners: Dict[str, Runner] = {}
+        # Speculative runs happen here, so the real session only sees commits
+        self.scratch_sessions = InMemorySessionService()
+        for stage in self.stages:
+            agent = root_agent.find_agent(stage.agent_name)
+            if agent is None:
+                raise ValueError(f"Agent '{stage.agent_name}' not found in the tree")
+            self.runners[stage.name] = Runner(
+                agent=agent,
+                app_name=app_name,
+                session_service=self.session_service,
+            )
+            if stage.name == "write":
+                self.speculative_runners[stage.name] = Runner(
+                    agent=agent,
+                    app_name=app_name,
+                    session_service=self.scratch_sessions,
+                )
+
+    async def run_stage(
+        self,
+        stage: PipelineStage,
+        user_id: str,
+        session_id: str,
+        message: Optional[str],
+    ) -> Dict[str, Any]:
+        """Run a single stage and return the session state afterwards"""
+        await _run_agent(self.runners[stage.name], user_id, session_id, message)
+        session = await self.session_service.get_session(
+            app_name=self.app_name, user_id=user_id, session_id=session_id
+        )
+        return session.state
+
+    async def run(
+        self,
+        topic: str,
+        user_id: str,
+        session_id: str,
+        initial_state: Optional[Dict[str, Any]] = None,
+        completed_stages: Optional[Iterable[str]] = None,
+        on_stage_complete: Optional[StageCallback] = None,
+    ) -> Dict[str, Any]:
+        """Run every stage that has not completed yet and return the final state"""
+        session = await self.session_service.get_session(
+            app_name=self.app_name, user_id=user_id, session_id=session_id
+        )
+        if session is None:
+            session = await self.session_service.create_session(
+                app_name=self.app_name,
+                user_id=user_id,
+                session_id=session_id,
+                state={"research_topic": topic},
+            )
+            if initial_state:
+                # Restored outputs go through an event so they count as generated
+                await self.session_service.append_event(
+                    session,
+                    Event(
+                        author="pipeline",
+                        actions=EventActions(state_delta=dict(initial_state)),
+                    ),
+                )
+
+        elif completed_stages is None and self.durable:
+            completed_stages = await self._restore_checkpoint(session)
+
+        state = session.state
+        completed = set(completed_stages or ())
+        speculated: Set[str] = set()
+        for stage in self.stages:
+            if stage.name in completed:
+                continue
+
+            message = stage.message.format(topic=topic) if stage.message else None
+            if stage.name in speculated:
+                # Its state changes were committed when the outline was approved
+                pass
+            elif stage.name == "validate":
+                speculation = self._speculate(topic, user_id, session_id, state)
+                try:
+                    state = await self.run_stage(stage, user_id, session_id, message)
+                    if speculation is not None and not latest_result_approved(state):
+                        # A revised outline needs a new script anyway
+                        speculation.task.cancel()
+                    state = await self._revise_outline(
+                        topic, user_id, session_id, state
+                    )
+                except BaseException:
+                    if speculation is not None:
+                        speculation.task.cancel()
+                    raise
+                if speculation is not None:
+                    committed = await self._commit_speculation(
+                        speculation, user_id, session_id, state
+                    )
+                    if committed is not None:
+                        state = committed
+                        speculated.add(speculation.stage.name)
+            else:
+                state = await self.run_stage(stage, user_id, session_id, message)
+
+            if self.durable:
+                await self.session_service.save_checkpoint(
+                    self.app_name, user_id, session_id, stage.name, state
+                )
+            if on_stage_complete is not None:
+                await on_stage_complete(stage.name, state)
+        return state
+
+    @property
+    def durable(self) -> bool:
+        return isinstance(self.session_service, SqliteSessionService)
+
+    async def _restore_checkpoint(self, session: Session) -> List[str]:
+        """Reset the stage outputs to the last checkpoint and return its stages.
+
+        A stage interrupted mid-run may already have overwritten some outputs,
+        so they are put back before the stage runs again.
+        """
+        checkpoint = await self.session_service.load_checkpoint(
+            self.app_name, session.user_id, session.id
+        )
+        if checkpoint is None:
+            return []
+        state_delta = {
+            key: checkpoint.state.get(key)
+            for key in CHECKPOINT_KEYS
+            if session.state.get(key) != checkpoint.state.get(key)
+        }
+        if state_delta:
+            await self.session_service.append_event(
+                session,
+                Event(author="pipeline", actions=EventActions(state_delta=state_delta)),
+            )
+        return checkpoint.stages
+
+    def _speculate(
+        self, topic: str, user_id: str, session_id: str, state: Dict[str, Any]
+    ) -> Optional[Speculation]:
+        """Start the write stage on the candidate outline, if speculation is on"""
+        stage = next((s for s in self.stages if s.name == "write"), None)
+        if (
+            not self.speculative_writing
+            or stage is None
+            or not state.get("script_outline")
+        ):
+            return None
+
+        # The writer leaves out approved feedback, so clearing the previous
+        # result gives it the same inputs it will have once the outline passes
+        scratch_state = {
+            key: value
+            for key, value in state.items()
+            if not key.startswith(
+                (State.APP_PREFIX, State.USER_PREFIX, State.TEMP_PREFIX)
+            )
+        }
+        scratch_state.update({"validation_result": None, VALIDATION_DATA_KEY: None})
+        message = stage.message.format(topic=topic) if stage.message else None
+        task = asyncio.ensure_future(
+            self._run_scratch(stage, user_id, scratch_state, message)
+        )
+        speculation = Speculation(
+            stage=stage,
+            outline=state.get("script_outline"),
+            task=task,
+            started_at=time.perf_counter(),
+        )
+        task.add_done_callback(
+            lambda _: setattr(speculation, "finished_at", time.perf_counter())
+        )
+        return speculation
+
+    async def _run_scratch(
+        self,
+        stage: PipelineStage,
+        user_id: str,
+        state: Dict[str, Any],
+        message: Optional[str],
+    ) -> Dict[str, Any]:
+        """Run ``stage`` in a scratch session and return its state changes"""
+        session = await self.scratch_sessions.create_session(
+            app_name=self.app_name, user_id=user_id, state=state
+        )
+        try:
+            await _run_agent(
+                self.speculative_runners[stage.name], user_id, session.id, message
+            )
+            session = await self.scratch_sessions.get_session(
+                app_name=self.app_name, user_id=user_id, session_id=session.id
+            )
+            state_delta: Dict[str, Any] = {}
+            for event in session.events:
+                state_delta.update(event.actions.state_delta)
+            return state_delta
+        finally:
+            await self.scratch_sessions.delete_session(
+                app_name=self.app_name, user_id=user_id, session_id=session.id
+            )
+
+    async def _commit_speculation(
+        self,
+        speculation: Speculation,
+        user_id: str,
+        session_id: str,
+        state: Dict[str, Any],
+    ) -> Optional[Dict[str, Any]]:
+        """Commit the speculative stage if its outline was approved unchanged.
+
+        Returns the session state after the commit, or None if the
+        speculative run was discarded.
+        """
+        validated_at = time.perf_counter()
+        hit = latest_result_approved(state) and (
+            state.get("script_outline") == speculation.outline
+        )
+        if not hit:
+            speculation.task.cancel()
+        (result,) = await asyncio.gather(speculation.task, return_exceptions=True)
+        if isinstance(result, Exception):
+            logger.warning("Speculative %s failed: %s", speculation.stage.name, result)
+        if not hit or isinstance(result, BaseException):
+            self.speculation.record(
+                False, speculation.finished_at - speculation.started_at
+            )
+            return None
+
+        session = await self.session_service.get_session(
+            app_name=self.app_name, user_id=user_id, session_id=session_id
+        )
+        await self.session_service.append_event(
+            session,
+            Event(author="pipeline", actions=EventActions(state_delta=result)),
+        )
+        # Sequentially the stage would have started once validation finished
+        overlap_end = min(validated_at, speculation.finished_at or validated_at)
+        self.speculation.record(True, overlap_end - speculation.started_at)
+        return session.state
+
+    async def _revise_outline(
+        self, topic: str, user_id: str, session_id: str, state: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Re-plan and re-validate until the outline is approved.
+
+        Raises ``OutlineRejectedError`` if it is still rejected once the
+        revisions run out, so a rejected outline is never written and directed.
+        """
+        stages = {stage.name: stage for stage in self.stages}
+        for _ in range(self.max_outline_revisions):
+            if latest_result_approved(state) or "plan" not in stages:
+                break
+            message = REVISE_OUTLINE_MESSAGE.format(
+                topic=topic, feedback=revision_feedback(state)
+            )
+            await self.run_stage(stages["plan"], user_id, session_id, message)
+            state = await self.run_stage(stages["validate"], user_id, session_id, None)
+        if not latest_result_approved(state):
+            raise OutlineRejectedError(
+                f"The outline was rejected after {self.max_outline_revisions} revisions:\n"
+                f"{revision_feedback(state)}"
+            )
+        return state
+
+
+async def _run_agent(
+    runner: Runner, user_id: str, session_id: str, message: Optional[str]
+) -> None:
+    new_message = (
+        types.Content(role="user", parts=[types.Part(text=message)])
+        if message
+        else None
+    )
+    async for _ in runner.run_async(
+        user_id=user_id, session_id=session_id, new_message=new_message
+    ):
+        pass
@@ -0,0 +1,118 @@
+"""Persistent cache for research findings keyed by topic and channel profile"""
+
+import re
+import time
+from typing import Any, Dict, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.genai.types import Content
+
+from .channel_utils import channel_fingerprint
+from .config import ChannelInfo
+from .disk_cache import DiskCache, hash_key
+
+# Words that do not change what a research request is about
+_TOPIC_FILLER_WORDS = {
+    "a",
+    "about",
+    "an",
+    "and",
+    "for",
+    "in",
+    "of",
+    "on",
+    "please",
+    "research",
+    "the",
+    "to",
+    "topic",
+}
+
+
+def normalize_topic(topic: str) -> str:
+    """Reduce a topic to a canonical form so trivial re-wordings share a key.
+
+    Case, punctuation and filler words are dropped, but the word order is
+    kept: "migrate postgres to mysql" and "migrate mysql to postgres" are
+    different topics.
+    """
+    words = re.findall(r"[a-z0-9+#]+", topic.lower())
+    return " ".join(word for word in words if word not in _TOPIC_FILLER_WORDS)
+
+
+def get_research_topic(callback_context: CallbackContext) -> str:
+    """Return the research topic from state, or "" when none was set.
+
+    The user's latest message is not a topic: in the chat flow it is often a
+    reply like "ok, go ahead", which would make unrelated sessions share
+    research. Without ``research_topic`` the cache is skipped.
+    """
+    return str(callback_context.state.get("research_topic") or "")
+
+
+class ResearchCache:
+    """Caches ``research_findings`` so repeated topics skip the researcher.
+
+    The key combines the normalized topic, a fingerprint of the channel's
+    ``ChannelInfo`` and a hash of the researcher instruction, so changing the
+    channel profile or the prompt invalidates old reports automatically.
+    """
+
+    def __init__(self, instruction: str, store: DiskCache, channel_info: ChannelInfo):
+        self.instruction = instruction
+        self.store = store
+        self.channel_info = channel_info
+        self.saved_seconds = 0.0
+        self._pending: Dict[str, Dict[str, Any]] = {}
+
+    def cache_key(self, topic: str) -> str:
+        return hash_key(
+            normalize_topic(topic),
+            channel_fingerprint(self.channel_info),
+            hash_key(self.instruction),
+        )
+
+    def lookup(self, topic: str) -> Optional[Dict[str, Any]]:
+        if not normalize_topic(topic):
+            return None
+        return self.store.get(self.cache_key(topic))
+
+    def before_agent_callback(
+        self, callback_context: CallbackContext
+    ) -> Optional[Content]:
+        """Serves cached findings and skips the researcher on a hit"""
+        topic = get_research_topic(callback_context)
+        entry = self.lookup(topic)
+        if entry is not None:
+            callback_context.state["research_findings"] = entry["research_findings"]
+            self.saved_seconds += entry.get("elapsed_seconds", 0.0)
+            return Content()
+
+        self._pending[callback_context.invocation_id] = {
+            "topic": topic,
+            "started_at": time.monotonic(),
+        }
+        return None
+
+    def after_agent_callback(self, callback_context: CallbackContext) -> None:
+        """Stores freshly generated findings for the topic"""
+        pending = self._pending.pop(callback_context.invocation_id, None)
+        findings = callback_context.state.get("research_findings")
+        if pending is None or not findings or not normalize_topic(pending["topic"]):
+            return None
+
+        self.store.set(
+            self.cache_key(pending["topic"]),
+            {
+                "topic": pending["topic"],
+                "research_findings": findings,
+                "elapsed_seconds": time.monotonic() - pending["started_at"],
+            },
+        )
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the researcher time saved by hits"""
+        stats = self.store.stats()
+        stats["saved_seconds"] = round(self.saved_seconds, 3)
+        return stats
@@ -0,0 +1,213 @@
+"""BM25 retrieval over the research findings, so agents get only relevant snippets"""
+
+import functools
+import math
+import re
+from collections import Counter
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from .config import config
+from .markdown_utils import split_sections
+
+RESEARCH_KEY = "research_findings"
+TOPIC_KEY = "research_topic"
+
+# Words too common in research reports to tell snippets apart
+_STOP_WORDS = {
+    "a",
+    "about",
+    "an",
+    "and",
+    "are",
+    "as",
+    "at",
+    "be",
+    "by",
+    "can",
+    "for",
+    "from",
+    "how",
+    "in",
+    "is",
+    "it",
+    "of",
+    "on",
+    "or",
+    "that",
+    "the",
+    "this",
+    "to",
+    "was",
+    "what",
+    "when",
+    "which",
+    "who",
+    "why",
+    "with",
+    "you",
+    "your",
+}
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#]*")
+_LIST_ITEM_PATTERN = re.compile(r"^\s*(?:[-*+]|\d+[.)])\s+")
+
+
+def tokenize(text: str) -> List[str]:
+    return [
+        token
+        for token in _TOKEN_PATTERN.findall(text.lower())
+        if token not in _STOP_WORDS
+    ]
+
+
+class ResearchSnippet(NamedTuple):
+    """A passage of the findings with the headings it sits under"""
+
+    position: int
+    headings: Tuple[str, ...]
+    text: str
+
+    def to_markdown(self) -> str:
+        if not self.headings:
+            return self.text
+        return f"### {' › '.join(self.headings)}\n{self.text}"
+
+
+def _blocks(body: str) -> List[str]:
+    """Split a section body into paragraphs and single list items"""
+    blocks: List[str] = []
+    lines: List[str] = []
+    for line in body.splitlines():
+        starts_item = bool(_LIST_ITEM_PATTERN.match(line)) and not line[:1].isspace()
+        if not line.strip() or starts_item:
+            if lines:
+                blocks.append("\n".join(lines))
+            lines = [line] if line.strip() else []
+        else:
+            lines.append(line)
+    if lines:
+        blocks.append("\n".join(lines))
+    return blocks
+
+
+def chunk_research(
+    findings: str, max_chars: Optional[int] = None
+) -> List[ResearchSnippet]:
+    """Split the findings into snippets of about ``max_chars``.
+
+    Snippets never cross a heading, so every source list and every platform
+    section is chunked on its own. Consecutive paragraphs and list items of a
+    section are packed into one snippet while they fit.
+    """
+    max_chars = max_chars or config.research_snippet_max_chars
+    snippets: List[ResearchSnippet] = []
+    path: List[Tuple[int, str]] = []
+    for section in split_sections(findings or ""):
+        if section.level:
+            while path and path[-1][0] >= section.level:
+                path.pop()
+            path.append((section.level, section.heading))
+        headings = tuple(heading for _, heading in path)
+
+        packed: List[str] = []
+        for block in _blocks(section.body):
+            if packed and len("\n".join(packed)) + len(block) > max_chars:
+                snippets.append(
+                    ResearchSnippet(len(snippets), headings, "\n".join(packed))
+                )
+                packed = []
+            packed.append(block)
+        if packed:
+            snippets.append(ResearchSnippet(len(snippets), headings, "\n".join(packed)))
+    return snippets
+
+
+class ResearchIndex:
+    """An Okapi BM25 index over the snippets of one research report"""
+
+    def __init__(
+        self, snippets: List[ResearchSnippet], k1: float = 1.5, b: float = 0.75
+    ):
+        self.snippets = snippets
+        self.k1 = k1
+        self.b = b
+        # Headings are indexed too, so "Reddit" finds the Reddit section
+        self.term_counts = [
+            Counter(tokenize(" ".join(snippet.headings) + "\n" + snippet.text))
+            for snippet in snippets
+        ]
+        self.lengths = [sum(counts.values()) for counts in self.term_counts]
+        self.average_length = sum(self.lengths) / len(snippets) if snippets else 0.0
+        document_frequency = Counter(
+            term for counts in self.term_counts for term in counts
+        )
+        self.idf = {
+            term: math.log(1 + (len(snippets) - frequency + 0.5) / (frequency + 0.5))
+            for term, frequency in document_frequency.items()
+        }
+
+    def search(self, query: str, top_k: int) -> List[ResearchSnippet]:
+        """Return the ``top_k`` best matching snippets in report order"""
+        terms = [term for term in set(tokenize(query)) if term in self.idf]
+        if not terms:
+            return []
+        scored = []
+        for snippet, counts, length in zip(
+            self.snippets, self.term_counts, self.lengths
+        ):
+            norm = self.k1 * (1 - self.b + self.b * length / self.average_length)
+            score = sum(
+                self.idf[term] * counts[term] * (self.k1 + 1) / (counts[term] + norm)
+                for term in terms
+                if term in counts
+            )
+            if score > 0:
+                scored.append((score, snippet))
+        scored.sort(key=lambda item: (-item[0], item[1].position))
+        return sorted(
+            (snippet for _, snippet in scored[:top_k]), key=lambda s: s.position
+        )
+
+
+@functools.lru_cache(maxsize=32)
+def research_index(findings: str) -> ResearchIndex:
+    """Index a report once; every agent of the session retrieves from it"""
+    return ResearchIndex(chunk_research(findings))
+
+
+def retrieve_research(findings: str, query: str, top_k: int) -> str:
+    """Return the snippets of ``findings`` most relevant to ``query`` as markdown"""
+    snippets = research_index(findings).search(query, top_k)
+    return "\n\n".join(snippet.to_markdown() for snippet in snippets)
+
+
+def state_query(*keys: str) -> Callable[[Any], str]:
+    """Build a research query from the topic and the values of ``keys`` in state.
+
+    The saved research topic describes the whole video, while the latest
+    chat message may only say "go ahead", so the message is only used when
+    no topic is saved.
+    """
+
+    def query(context: Any) -> str:
+        topic = str(context.state.get(TOPIC_KEY) or "")
+        parts = [topic] + [str(context.state.get(key) or "") for key in keys]
+        user_content = context.user_content
+        if not topic and user_content and user_content.parts:
+            parts.extend(part.text or "" for part in user_content.parts)
+        return "\n".join(parts)
+
+    return query
+
+
+def section_plan_query(index: int) -> Callable[[Any], str]:
+    """Build a research query from the plan of the section writer at ``index``"""
+
+    def query(context: Any) -> str:
+        plans: List[Dict[str, Any]] = context.state.get("script_section_plans") or []
+        if index >= len(plans):
+            return ""
+        plan = plans[index]
+        return f"{plan['title']}\n{plan['heading']}\n{plan['outline']}"
+
+    return query
@@ -0,0 +1,242 @@
+"""Retries with exponential backoff and per-endpoint circuit breakers for model calls"""
+
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import AsyncGenerator, Awaitable, Callable, Dict, Optional, TypeVar
+
+import httpx
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.genai import errors
+
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Rate limiting, request timeouts and server-side failures
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+# Key under LlmResponse.custom_metadata with the retries a response needed
+RETRIES_KEY = "retries"
+
+
+class CircuitOpenError(Exception):
+    """Calls to an endpoint are refused because it keeps failing"""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Return True for errors that may succeed on a later attempt.
+
+    Rate limits, timeouts, dropped connections and 5xx responses are
+    transient. Invalid requests, authentication errors and anything raised by
+    our own code are not, and retrying them would only delay the failure.
+    """
+    if isinstance(error, errors.APIError):
+        return error.code in RETRYABLE_STATUS_CODES
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code in RETRYABLE_STATUS_CODES
+    return isinstance(
+        error, (asyncio.TimeoutError, ConnectionError, httpx.TransportError)
+    )
+
+
+@dataclass
+class RetryPolicy:
+    """How often and how patiently a call is retried"""
+
+    max_attempts: int = 3
+    initial_backoff_seconds: float = 1.0
+    max_backoff_seconds: float = 30.0
+    multiplier: float = 2.0
+
+    @classmethod
+    def from_config(cls) -> "RetryPolicy":
+        return cls(
+            max_attempts=config.retry_max_attempts,
+            initial_backoff_seconds=config.retry_initial_backoff_seconds,
+            max_backoff_seconds=config.retry_max_backoff_seconds,
+        )
+
+    def backoff_seconds(self, attempt: int) -> float:
+        """Delay before retry number ``attempt`` (1-based), with full jitter.
+
+        Jitter spreads out the retries of concurrent agents that failed
+        together, e.g. the parallel section writers hitting the same 429.
+        """
+        ceiling = min(
+            self.max_backoff_seconds,
+            self.initial_backoff_seconds * self.multiplier ** (attempt - 1),
+        )
+        return random.uniform(0, ceiling)
+
+
+class CircuitBreaker:
+    """Stops calling an endpoint after repeated failures.
+
+    After ``failure_threshold`` consecutive retryable failures the circuit
+    opens and calls fail immediately with ``CircuitOpenError``. Once
+    ``reset_seconds`` have passed, one trial call is let through; its success
+    closes the circuit again and its failure keeps it open. A trial that ends
+    any other way, e.g. cancelled or with a non-retryable error, only frees
+    the slot for the next trial.
+    """
+
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> bool:
+        """Raise if calls are refused, and return True for a trial call"""
+        state = self.state
+        if state == "open" or (state == "half_open" and self._trial_running):
+            raise CircuitOpenError(f"circuit for {self.name} is open")
+        if state == "half_open":
+            self._trial_running = True
+            return True
+        return False
+
+    def release_trial(self) -> None:
+        """End a trial call that said nothing about the endpoint's health"""
+        self._trial_running = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._trial_running or self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                logger.warning("Opening circuit for %s", self.name)
+            self.opened_at = time.monotonic()
+        self._trial_running = False
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def breaker_for(endpoint: str) -> CircuitBreaker:
+    """Return the circuit breaker shared by every caller of ``endpoint``"""
+    if endpoint not in _breakers:
+        _breakers[endpoint] = CircuitBreaker(
+            endpoint,
+            failure_threshold=config.circuit_breaker_failure_threshold,
+            reset_seconds=config.circuit_breaker_reset_seconds,
+        )
+    return _breakers[endpoint]
+
+
+async def call_with_retry(
+    call: Callable[[], Awaitable[T]],
+    breaker: CircuitBreaker,
+    policy: Optional[RetryPolicy] = None,
+    on_retry: Optional[Callable[[int, BaseException], None]] = None,
+) -> T:
+    """Await ``call()``, retrying retryable errors with backoff.
+
+    Non-retryable errors are raised at once and neither count against the
+    circuit nor close it, since they say nothing about the endpoint's health.
+    The same goes for a cancelled call.
+    """
+    policy = policy or RetryPolicy.from_config()
+    attempt = 1
+    while True:
+        trial = breaker.before_call()
+        try:
+            result = await call()
+        except Exception as error:  # pylint: disable=broad-except
+            if not is_retryable(error):
+                if trial:
+                    breaker.release_trial()
+                raise
+            breaker.record_failure()
+            if attempt >= policy.max_attempts:
+                raise
+            delay = policy.backoff_seconds(attempt)
+            logger.info(
+                "%s failed (%s), retry %d in %.1fs", breaker.name, error, attempt, delay
+            )
+            if on_retry is not None:
+                on_retry(attempt, error)
+            await asyncio.sleep(delay)
+            attempt += 1
+        except BaseException:
+            # Cancelled, e.g. by a fallback timeout or a cancelled job
+            if trial:
+                breaker.release_trial()
+            raise
+        else:
+            breaker.record_success()
+            return result
+
+
+class RetryingLlm(BaseLlm):
+    """Retries transient failures of ``llm`` before its first response.
+
+    Retrying inside the model call means a 429 or a dropped connection costs
+    one backoff instead of the whole stage, and does not use up an iteration
+    of the robust_* loop, which is meant for output that failed validation.
+    A response that already started streaming is never retried.
+    """
+
+    llm: BaseLlm
+    policy: RetryPolicy
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        responses: Optional[AsyncGenerator[LlmResponse, None]] = None
+        retries = 0
+
+        async def first_response() -> Optional[LlmResponse]:
+            nonlocal responses
+            if responses is not None:
+                await responses.aclose()
+            responses = self.llm.generate_content_async(llm_request, stream)
+            try:
+                return await responses.__anext__()
+            except StopAsyncIteration:
+                return None
+
+        def count_retry(attempt: int, error: BaseException) -> None:
+            nonlocal retries
+            retries = attempt
+
+        first = await call_with_retry(
+            first_response, breaker_for(self.llm.model), self.policy, count_retry
+        )
+        if first is None:
+            return
+        if retries:
+            first.custom_metadata = {
+                **(first.custom_metadata or {}),
+                RETRIES_KEY: retries,
+            }
+        yield first
+        async for response in responses:
+            yield response
+
+
+def with_retries(llm: BaseLlm) -> BaseLlm:
+    """Wrap ``llm`` in a ``RetryingLlm`` unless retries are disabled"""
+    policy = RetryPolicy.from_config()
+    if policy.max_attempts <= 1:
+        return llm
+    return RetryingLlm(model=llm.model, llm=llm, policy=policy)
@@ -0,0 +1,164 @@
+"""Typed outputs of the planner and editor and their markdown rendering"""
+
+import logging
+import re
+from abc import ABC, abstractmethod
+from typing import Any, List, Literal, Mapping, Optional, Type, TypeVar
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmResponse
+from google.genai import types
+from pydantic import BaseModel, ValidationError
+
+logger = logging.getLogger(__name__)
+
+OUTLINE_DATA_KEY = "script_outline_data"
+VALIDATION_DATA_KEY = "validation_data"
+
+APPROVED = "APPROVED"
+REQUIRES_CHANGES = "REQUIRES CHANGES"
+
+_JSON_FENCE_PATTERN = re.compile(r"^```(?:json)?\s*|\s*```$", re.IGNORECASE)
+
+S = TypeVar("S", bound="StructuredOutput")
+
+
+class StructuredOutput(BaseModel, ABC):
+    """An agent output that is stored as data and displayed as markdown"""
+
+    @abstractmethod
+    def to_markdown(self) -> str:
+        """Render the output as the markdown users and other agents read"""
+
+
+class RoadmapItem(BaseModel):
+    heading: str
+    points: List[str] = []
+
+
+class SolutionStep(BaseModel):
+    name: str  # "Quick win", "Systematic solution" or "Overkill solution ..."
+    description: str
+
+
+class ScriptOutline(StructuredOutput):
+    title: str
+    main_message: str
+    roadmap: List[RoadmapItem]
+    solution_steps: List[SolutionStep]
+    constraints: List[str]
+
+    def to_markdown(self) -> str:
+        lines = [f"# {self.title}", "", "## Main Message", self.main_message, ""]
+        lines.append("## Roadmap")
+        for number, item in enumerate(self.roadmap, start=1):
+            lines.extend(["", f"### {number}. {item.heading}"])
+            lines.extend(f"- {point}" for point in item.points)
+        lines.extend(["", "## Solution"])
+        for number, step in enumerate(self.solution_steps, start=1):
+            lines.extend(["", f"### Step {number}: {step.name}", step.description])
+        lines.extend(["", "## Weaknesses and Constraints"])
+        lines.extend(f"- {constraint}" for constraint in self.constraints)
+        return "\n".join(lines) + "\n"
+
+
+class ValidationResult(StructuredOutput):
+    status: Literal["APPROVED", "REQUIRES CHANGES"]
+    summary: str = ""
+    issues: List[str] = []
+    required_changes: List[str] = []
+    recommendations: List[str] = []
+
+    @property
+    def approved(self) -> bool:
+        return self.status == APPROVED
+
+    def to_markdown(self) -> str:
+        parts = [f"**COMPLIANCE STATUS: {self.status}**"]
+        if self.summary:
+            parts.append(self.summary)
+        for label, items in (
+            ("Issues Found", self.issues),
+            ("Required Changes", self.required_changes),
+        ):
+            if items:
+                numbered = "\n".join(
+                    f"  {number}. {item}" for number, item in enumerate(items, start=1)
+                )
+                parts.append(f"- **{label}:**\n{numbered}")
+        if self.recommendations:
+            bullets = "\n".join(f"  - {item}" for item in self.recommendations)
+            parts.append(f"- **Recommendations:**\n{bullets}")
+        return "\n\n".join(parts) + "\n"
+
+
+def parse_structured_output(text: str, schema: Type[S]) -> Optional[S]:
+    """Parse a JSON reply, optionally in a code fence, or return None"""
+    text = _JSON_FENCE_PATTERN.sub("", text.strip())
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end < start:
+        return None
+    try:
+        return schema.model_validate_json(text[start : end + 1])
+    except ValidationError as error:
+        logger.warning("Invalid %s reply: %s", schema.__name__, error)
+        return None
+
+
+def load_structured_output(
+    state: Mapping[str, Any], output_key: str, data_key: str, schema: Type[S]
+) -> Optional[S]:
+    """Return the stored data of ``output_key`` if it still matches the markdown.
+
+    The markdown can change without the data, e.g. after a manual edit or a
+    restored checkpoint, so data whose rendering differs is ignored.
+    """
+    data = state.get(data_key)
+    if not data:
+        return None
+    output = schema.model_validate(data)
+    if output.to_markdown() != state.get(output_key):
+        return None
+    return output
+
+
+def validation_result(state: Mapping[str, Any]) -> Optional[ValidationResult]:
+    """Return the latest editor result as data, if it has any"""
+    return load_structured_output(
+        state, "validation_result", VALIDATION_DATA_KEY, ValidationResult
+    )
+
+
+class StructuredOutputCallback:
+    """Turns an agent's JSON reply into data and a rendered markdown reply.
+
+    Runs as an after-model callback: the data is stored under ``data_key``
+    and the model response is rewritten to the rendered markdown. The event
+    the user and the root agent see and the agent's ``output_key`` therefore
+    both hold markdown, so everything reading the markdown keeps working.
+    Replies that do not match the schema are kept as they are.
+    """
+
+    def __init__(self, data_key: str, schema: Type[StructuredOutput]):
+        self.data_key = data_key
+        self.schema = schema
+
+    def __call__(
+        self, callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> Optional[LlmResponse]:
+        content = llm_response.content
+        if llm_response.partial or content is None or not content.parts:
+            return None
+        reply = "".join(part.text or "" for part in content.parts if not part.thought)
+        if not reply.strip():
+            # A tool call, not the final reply
+            return None
+
+        output = parse_structured_output(reply, self.schema)
+        if output is None:
+            callback_context.state[self.data_key] = None
+            return None
+        callback_context.state[self.data_key] = output.model_dump()
+        # Rewritten in place, so later after-model callbacks see the markdown too
+        content.parts = [types.Part(text=output.to_markdown())]
+        return None
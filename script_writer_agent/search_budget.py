@@ -0,0 +1,133 @@
+"""Search quotas per session and per agent run, and spacing between searches"""
+
+import asyncio
+import collections
+import logging
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from google.adk.tools import ToolContext
+
+from .config import config
+
+logger = logging.getLogger(__name__)
+
+# Usage is kept for this many of the latest sessions
+MAX_TRACKED_SESSIONS = 1000
+
+BUDGET_EXHAUSTED_MESSAGE = (
+    "The search budget {scope} is used up ({limit} searches). Do not search "
+    "again; continue with the information you already have."
+)
+
+
+class SearchBudget:
+    """Counts the searches of each session and agent run against a quota.
+
+    An agent run is everything one agent does within an invocation, i.e. one
+    user turn or pipeline stage. Iterations of a robust_* loop share the
+    invocation and therefore the agent quota; a later user turn or stage
+    starts with a fresh one, while the session quota caps the whole
+    pipeline. Quotas of 0 are unlimited. Only searches that reach the
+    backend are charged; ``web_search`` serves cached and in-flight queries
+    without touching the budget.
+    """
+
+    def __init__(
+        self,
+        max_per_session: int,
+        max_per_agent: int,
+        agent_quotas: Optional[Dict[str, int]] = None,
+    ):
+        self.max_per_session = max_per_session
+        self.max_per_agent = max_per_agent
+        self.agent_quotas = agent_quotas or {}
+        self.exhausted = 0
+        self._sessions: "collections.OrderedDict[str, Dict[Any, int]]" = (
+            collections.OrderedDict()
+        )
+
+    def _usage(self, session_id: str) -> Dict[Any, int]:
+        if session_id not in self._sessions:
+            self._sessions[session_id] = collections.defaultdict(int)
+            while len(self._sessions) > MAX_TRACKED_SESSIONS:
+                self._sessions.popitem(last=False)
+        return self._sessions[session_id]
+
+    def agent_quota(self, agent_name: str) -> int:
+        return self.agent_quotas.get(agent_name, self.max_per_agent)
+
+    def charge(
+        self, session_id: str, invocation_id: str, agent_name: str
+    ) -> Optional[Dict[str, Any]]:
+        """Count one search, or return the tool response refusing it"""
+        usage = self._usage(session_id)
+        agent_key: Tuple[str, str] = (invocation_id, agent_name)
+        agent_quota = self.agent_quota(agent_name)
+
+        if self.max_per_session and usage["session"] >= self.max_per_session:
+            scope, limit = "for this session", self.max_per_session
+        elif agent_quota and usage[agent_key] >= agent_quota:
+            scope, limit = f"of {agent_name}", agent_quota
+        else:
+            usage["session"] += 1
+            usage[agent_key] += 1
+            return None
+
+        self.exhausted += 1
+        logger.info("Search budget %s exhausted in session %s", scope, session_id)
+        return {
+            "status": "budget_exhausted",
+            "message": BUDGET_EXHAUSTED_MESSAGE.format(scope=scope, limit=limit),
+        }
+
+    def charge_tool_call(self, tool_context: ToolContext) -> Optional[Dict[str, Any]]:
+        return self.charge(
+            tool_context._invocation_context.session.id,
+            tool_context.invocation_id,
+            tool_context.agent_name,
+        )
+
+    def session_usage(self, session_id: str) -> Dict[str, Any]:
+        """Return the searches a session made in total and per agent run"""
+        usage = self._sessions.get(session_id, {})
+        return {
+            "searches": usage.get("session", 0),
+            "limit": self.max_per_session,
+            "agents": {
+                f"{key[1]}@{key[0]}": count
+                for key, count in usage.items()
+                if key != "session"
+            },
+        }
+
+
+class CallSpacer:
+    """Keeps at least ``min_interval_seconds`` between the starts of calls.
+
+    Callers reserve the next free slot before sleeping, so concurrent callers
+    are queued in order without a lock that would tie the spacer to one
+    event loop.
+    """
+
+    def __init__(self, min_interval_seconds: float):
+        self.min_interval_seconds = min_interval_seconds
+        self._next_slot = 0.0
+
+    async def wait(self) -> None:
+        if self.min_interval_seconds <= 0:
+            return
+        now = time.monotonic()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.min_interval_seconds
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+search_budget = SearchBudget(
+    max_per_session=config.max_session_search_queries,
+    max_per_agent=config.max_search_queries,
+    agent_quotas=config.agent_search_quotas,
+)
+
+search_spacer = CallSpacer(config.min_search_interval_seconds)
@@ -0,0 +1,286 @@
+"""A web search tool shared by all agents that deduplicates and caches queries"""
+
+import asyncio
+import collections
+import logging
+import re
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from google.adk.tools import ToolContext
+from google.genai import types
+
+from .config import config
+from .disk_cache import DiskCache, hash_key
+from .retry import breaker_for, call_with_retry
+from .search_budget import CallSpacer, search_budget, search_spacer
+
+logger = logging.getLogger(__name__)
+
+# Words that do not change what a search query finds
+_QUERY_FILLER_WORDS = {"a", "an", "and", "for", "in", "of", "on", "the", "to"}
+
+# A quoted phrase, optionally excluded with "-", or any other word
+_QUERY_TOKEN_PATTERN = re.compile(r'-?"[^"]*"|\S+')
+
+# Per-session statistics are kept for this many of the latest sessions
+MAX_TRACKED_SESSIONS = 1000
+
+SEARCH_FAILED_MESSAGE = (
+    "The search failed ({error}). Do not repeat it right away; try a "
+    "different query or continue with the information you already have."
+)
+
+SEARCH_PROMPT = """Search the web for: {query}
+
+Summarize what the top results say, with concrete facts, numbers, opinions \
+and examples. Mention which source each point comes from."""
+
+
+def normalize_query(query: str) -> str:
+    """Reduce a query to a canonical form so trivial re-wordings share a key.
+
+    Case, spacing, trailing punctuation and filler words are dropped. Word
+    order, quoted phrases and operators like ``-`` and ``site:`` are kept,
+    since they change what the search finds.
+    """
+    tokens = []
+    for token in _QUERY_TOKEN_PATTERN.findall(query.lower()):
+        if not token.startswith(('"', '-"')):
+            token = token.rstrip("?!,;")
+            if token in _QUERY_FILLER_WORDS:
+                continue
+        if token:
+            tokens.append(token)
+    return " ".join(tokens)
+
+
+class GeminiSearchBackend:
+    """Answers a query with a Gemini call grounded in Google Search"""
+
+    def __init__(self, model: Optional[str] = None, client: Any = None):
+        self.model = model or config.search_model
+        self._client = client
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            from google.genai import Client
+
+            self._client = Client()
+        return self._client
+
+    async def search(self, query: str) -> Dict[str, Any]:
+        response = await call_with_retry(
+            lambda: self.client.aio.models.generate_content(
+                model=self.model,
+                contents=SEARCH_PROMPT.format(query=query),
+                config=types.GenerateContentConfig(
+                    tools=[types.Tool(google_search=types.GoogleSearch())]
+                ),
+            ),
+            breaker_for(f"search:{self.model}"),
+        )
+        sources = []
+        queries = []
+        candidate = response.candidates[0] if response.candidates else None
+        grounding = candidate.grounding_metadata if candidate else None
+        if grounding is not None:
+            queries = list(grounding.web_search_queries or [])
+            for chunk in grounding.grounding_chunks or []:
+                if chunk.web is not None:
+                    sources.append({"title": chunk.web.title, "url": chunk.web.uri})
+        return {
+            "query": query,
+            "summary": response.text or "",
+            "sources": sources,
+            "search_queries": queries,
+        }
+
+
+class SearchCache:
+    """Serves repeated search queries from memory, disk or an in-flight call.
+
+    Queries are normalized before lookup, so "MLflow model registry" and
+    "the MLflow model registry?" share one result. Concurrent calls for the
+    same query, e.g. from the parallel platform researchers or section
+    writers, wait for a single backend call, and backend calls are spaced
+    by ``spacer``. The backend call runs in its own task, so a caller that
+    is cancelled does not cancel it for the others. Results are kept in a
+    small in-memory LRU and in a ``DiskCache`` shared across processes, both
+    expiring after ``ttl_seconds``.
+    """
+
+    def __init__(
+        self,
+        backend: Any,
+        store: Optional[DiskCache],
+        ttl_seconds: float,
+        memory_entries: int = 256,
+        spacer: Optional[CallSpacer] = None,
+    ):
+        self.backend = backend
+        self.spacer = spacer
+        self.store = store
+        self.ttl_seconds = ttl_seconds
+        self.memory_entries = memory_entries
+        self._memory: "collections.OrderedDict[str, Tuple[float, Dict[str, Any]]]" = (
+            collections.OrderedDict()
+        )
+        self._in_flight: Dict[str, "asyncio.Task[Dict[str, Any]]"] = {}
+        self._sessions: "collections.OrderedDict[str, Dict[str, int]]" = (
+            collections.OrderedDict()
+        )
+
+    def _from_memory(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        created_at, result = entry
+        if time.time() - created_at > self.ttl_seconds:
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return result
+
+    def _remember(self, key: str, result: Dict[str, Any]) -> None:
+        self._memory[key] = (time.time(), result)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _session(self, session_id: str) -> Dict[str, int]:
+        if session_id not in self._sessions:
+            self._sessions[session_id] = collections.defaultdict(int)
+            while len(self._sessions) > MAX_TRACKED_SESSIONS:
+                self._sessions.popitem(last=False)
+        return self._sessions[session_id]
+
+    @staticmethod
+    def _key(query: str) -> str:
+        return hash_key(normalize_query(query) or query.strip())
+
+    def cached(self, query: str) -> bool:
+        """Return whether ``query`` would be served without a new backend call"""
+        key = self._key(query)
+        if key in self._in_flight or self._from_memory(key) is not None:
+            return True
+        return self.store is not None and self.store.get(key) is not None
+
+    async def search(self, query: str, session_id: str = "") -> Dict[str, Any]:
+        """Return the result for ``query``, calling the backend only on a miss"""
+        stats = self._session(session_id)
+        stats["calls"] += 1
+        key = self._key(query)
+
+        result = self._from_memory(key)
+        if result is not None:
+            stats["memory_hits"] += 1
+            return result
+        if self.store is not None:
+            result = self.store.get(key)
+            if result is not None:
+                stats["disk_hits"] += 1
+                self._remember(key, result)
+                return result
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            stats["deduplicated"] += 1
+        else:
+            stats["backend_calls"] += 1
+            task = asyncio.ensure_future(self._search_backend(key, query))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._search_done(key, done))
+        return await asyncio.shield(task)
+
+    async def _search_backend(self, key: str, query: str) -> Dict[str, Any]:
+        if self.spacer is not None:
+            await self.spacer.wait()
+        result = await self.backend.search(query)
+        self._remember(key, result)
+        if self.store is not None:
+            self.store.set(key, result)
+        return result
+
+    def _search_done(self, key: str, task: "asyncio.Task[Dict[str, Any]]") -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Every waiter may be gone; keep the error from being reported as unretrieved
+            task.exception()
+
+    def session_stats(self, session_id: str) -> Dict[str, Any]:
+        """Return the calls made in a session and how many were served without search"""
+        stats = dict(self._sessions.get(session_id, {}))
+        calls = stats.get("calls", 0)
+        avoided = calls - stats.get("backend_calls", 0)
+        stats["avoided"] = avoided
+        stats["avoided_rate"] = avoided / calls if calls else 0.0
+        return stats
+
+    def stats(self) -> Dict[str, Any]:
+        """Return totals over all sessions"""
+        totals: Dict[str, int] = collections.defaultdict(int)
+        for session in self._sessions.values():
+            for name, count in session.items():
+                totals[name] += count
+        calls = totals.get("calls", 0)
+        avoided = calls - totals.get("backend_calls", 0)
+        return {
+            **totals,
+            "avoided": avoided,
+            "avoided_rate": avoided / calls if calls else 0.0,
+            "sessions": len(self._sessions),
+            "memory_entries": len(self._memory),
+        }
+
+
+search_cache = SearchCache(
+    backend=GeminiSearchBackend(),
+    store=(
+        DiskCache(
+            directory=config.search_cache_dir,
+            ttl_seconds=config.search_cache_ttl_seconds,
+            max_entries=config.search_cache_max_entries,
+        )
+        if config.search_cache_enabled
+        else None
+    ),
+    ttl_seconds=config.search_cache_ttl_seconds,
+    spacer=search_spacer,
+    memory_entries=(
+        config.search_cache_memory_entries if config.search_cache_enabled else 0
+    ),
+)
+
+
+async def web_search(query: str, tool_context: ToolContext) -> dict:
+    """Searches the web (Google, YouTube, StackOverflow, Reddit, ...) for a query.
+
+    Results are shared between agents, so repeating a query another agent
+    already ran is cheap and does not count against the search budget.
+    New searches are limited per agent and per session; once the budget is
+    used up the status is "budget_exhausted". If the
+    search itself fails the status is "error".
+
+    Args:
+        query: A specific, targeted search query.
+
+    Returns:
+        A summary of the top results, their sources and the searches run.
+    """
+    if not search_cache.cached(query):
+        exhausted = search_budget.charge_tool_call(tool_context)
+        if exhausted is not None:
+            return exhausted
+    session_id = tool_context._invocation_context.session.id
+    try:
+        return await search_cache.search(query, session_id=session_id)
+    except Exception as error:  # pylint: disable=broad-except
+        # Retries are used up or the backend's circuit is open
+        logger.warning("Search for %r failed: %s", query, error)
+        return {
+            "status": "error",
+            "message": SEARCH_FAILED_MESSAGE.format(error=error),
+        }
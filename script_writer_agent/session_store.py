@@ -0,0 +1,414 @@
+"""Durable session storage on SQLite with a checkpoint after every pipeline stage"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, Session, State
+from google.adk.sessions.base_session_service import (
+    GetSessionConfig,
+    ListSessionsResponse,
+)
+
+T = TypeVar("T")
+
+# Stage outputs saved with every checkpoint
+CHECKPOINT_KEYS = (
+    "research_findings",
+    "script_outline",
+    "script",
+    "production_script",
+    "validation_result",
+    "script_outline_data",
+    "validation_data",
+)
+
+# App state uses user_id = session_id = "", user state uses session_id = ""
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    id TEXT NOT NULL,
+    update_time REAL NOT NULL,
+    PRIMARY KEY (app_name, user_id, id)
+);
+CREATE TABLE IF NOT EXISTS states (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (app_name, user_id, session_id, key)
+);
+CREATE TABLE IF NOT EXISTS events (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    timestamp REAL NOT NULL,
+    event TEXT NOT NULL,
+    PRIMARY KEY (app_name, user_id, session_id, position)
+);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    app_name TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    state TEXT NOT NULL,
+    PRIMARY KEY (app_name, user_id, session_id, stage)
+);
+"""
+
+
+@dataclass
+class Checkpoint:
+    """The stages a session has completed and the outputs saved after the last one"""
+
+    stages: List[str]
+    state: Dict[str, Any]
+    created_at: float
+
+
+def _split_state(state: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Split a state dict into app, user and session scopes, dropping temp keys"""
+    scopes: Dict[str, Dict[str, Any]] = {"app": {}, "user": {}, "session": {}}
+    for key, value in state.items():
+        if key.startswith(State.TEMP_PREFIX):
+            continue
+        if key.startswith(State.APP_PREFIX):
+            scopes["app"][key[len(State.APP_PREFIX) :]] = value
+        elif key.startswith(State.USER_PREFIX):
+            scopes["user"][key[len(State.USER_PREFIX) :]] = value
+        else:
+            scopes["session"][key] = value
+    return scopes
+
+
+class SqliteSessionService(BaseSessionService):
+    """An ADK session service that keeps sessions in a local SQLite database.
+
+    The database runs in WAL mode, so readers never wait for the writer. All
+    writes go through a single writer thread, which serializes them without
+    any lock contention between concurrent sessions; reads use a small pool
+    of threads with their own connections. No call blocks the event loop.
+
+    Every event is committed as it is appended, and state is stored one row
+    per key, so appending an event writes only the keys it changes. With
+    ``synchronous=NORMAL`` a commit survives a crash of the process; only a
+    power loss can drop the last transactions.
+    """
+
+    def __init__(self, path: str, read_threads: int = 4):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._local = threading.local()
+        self._writer = ThreadPoolExecutor(1, thread_name_prefix="session-writer")
+        self._readers = ThreadPoolExecutor(
+            read_threads, thread_name_prefix="session-reader"
+        )
+        connection = self._connect()
+        connection.executescript(SCHEMA)
+        connection.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, isolation_level=None, timeout=30)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = self._connect()
+        return connection
+
+    async def _write(self, operation: Callable[[sqlite3.Connection], T]) -> T:
+        def run() -> T:
+            connection = self._connection()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                result = operation(connection)
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+            return result
+
+        return await asyncio.get_running_loop().run_in_executor(self._writer, run)
+
+    async def _read(self, operation: Callable[[sqlite3.Connection], T]) -> T:
+        def run() -> T:
+            connection = self._connection()
+            # One snapshot for all reads of the operation
+            connection.execute("BEGIN")
+            try:
+                return operation(connection)
+            finally:
+                connection.execute("COMMIT")
+
+        return await asyncio.get_running_loop().run_in_executor(self._readers, run)
+
+    @staticmethod
+    def _upsert_state(
+        connection: sqlite3.Connection,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        state: Dict[str, Any],
+    ) -> None:
+        scopes = _split_state(state)
+        rows = [
+            (app_name, scope_user, scope_session, key, json.dumps(value))
+            for scope, scope_user, scope_session in (
+                ("app", "", ""),
+                ("user", user_id, ""),
+                ("session", user_id, session_id),
+            )
+            for key, value in scopes[scope].items()
+        ]
+        connection.executemany(
+            "INSERT INTO states VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (app_name, user_id, session_id, key) "
+            "DO UPDATE SET value = excluded.value",
+            rows,
+        )
+
+    @staticmethod
+    def _load_state(
+        connection: sqlite3.Connection, app_name: str, user_id: str, session_id: str
+    ) -> Dict[str, Any]:
+        state = {}
+        rows = connection.execute(
+            "SELECT user_id, session_id, key, value FROM states "
+            "WHERE app_name = ? AND ("
+            "(user_id = '' AND session_id = '') "
+            "OR (user_id = ? AND session_id = '') "
+            "OR (user_id = ? AND session_id = ?))",
+            (app_name, user_id, user_id, session_id),
+        )
+        for row_user, row_session, key, value in rows:
+            if row_session:
+                state[key] = json.loads(value)
+            elif row_user:
+                state[State.USER_PREFIX + key] = json.loads(value)
+            else:
+                state[State.APP_PREFIX + key] = json.loads(value)
+        return state
+
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        session_id = (
+            session_id.strip()
+            if session_id and session_id.strip()
+            else str(uuid.uuid4())
+        )
+        now = time.time()
+
+        def create(connection: sqlite3.Connection) -> Dict[str, Any]:
+            try:
+                connection.execute(
+                    "INSERT INTO sessions VALUES (?, ?, ?, ?)",
+                    (app_name, user_id, session_id, now),
+                )
+            except sqlite3.IntegrityError as error:
+                raise ValueError(f"Session '{session_id}' already exists") from error
+            self._upsert_state(connection, app_name, user_id, session_id, state or {})
+            return self._load_state(connection, app_name, user_id, session_id)
+
+        return Session(
+            app_name=app_name,
+            user_id=user_id,
+            id=session_id,
+            state=await self._write(create),
+            last_update_time=now,
+        )
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        def get(connection: sqlite3.Connection) -> Optional[Session]:
+            row = connection.execute(
+                "SELECT update_time FROM sessions "
+                "WHERE app_name = ? AND user_id = ? AND id = ?",
+                (app_name, user_id, session_id),
+            ).fetchone()
+            if row is None:
+                return None
+
+            query = (
+                "SELECT event FROM events "
+                "WHERE app_name = ? AND user_id = ? AND session_id = ?"
+            )
+            params: List[Any] = [app_name, user_id, session_id]
+            if config and config.after_timestamp:
+                query += " AND timestamp >= ?"
+                params.append(config.after_timestamp)
+            query += " ORDER BY position DESC"
+            if config and config.num_recent_events:
+                query += " LIMIT ?"
+                params.append(config.num_recent_events)
+            events = [
+                Event.model_validate_json(event)
+                for (event,) in connection.execute(query, params)
+            ]
+            events.reverse()
+
+            return Session(
+                app_name=app_name,
+                user_id=user_id,
+                id=session_id,
+                state=self._load_state(connection, app_name, user_id, session_id),
+                events=events,
+                last_update_time=row[0],
+            )
+
+        return await self._read(get)
+
+    async def list_sessions(
+        self, *, app_name: str, user_id: str
+    ) -> ListSessionsResponse:
+        def list_all(connection: sqlite3.Connection) -> List[Session]:
+            rows = connection.execute(
+                "SELECT id, update_time FROM sessions "
+                "WHERE app_name = ? AND user_id = ? ORDER BY update_time",
+                (app_name, user_id),
+            )
+            return [
+                Session(
+                    app_name=app_name,
+                    user_id=user_id,
+                    id=session_id,
+                    state={},
+                    last_update_time=update_time,
+                )
+                for session_id, update_time in rows
+            ]
+
+        return ListSessionsResponse(sessions=await self._read(list_all))
+
+    async def delete_session(
+        self, *, app_name: str, user_id: str, session_id: str
+    ) -> None:
+        def delete(connection: sqlite3.Connection) -> None:
+            connection.execute(
+                "DELETE FROM sessions WHERE app_name = ? AND user_id = ? AND id = ?",
+                (app_name, user_id, session_id),
+            )
+            for table in ("states", "events", "checkpoints"):
+                connection.execute(
+                    f"DELETE FROM {table} "
+                    "WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                    (app_name, user_id, session_id),
+                )
+
+        await self._write(delete)
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        await super().append_event(session=session, event=event)
+        session.last_update_time = event.timestamp
+        state_delta = event.actions.state_delta if event.actions else None
+        payload = event.model_dump_json(exclude_none=True)
+
+        def append(connection: sqlite3.Connection) -> None:
+            connection.execute(
+                "INSERT INTO events "
+                "SELECT ?, ?, ?, COALESCE(MAX(position), -1) + 1, ?, ? FROM events "
+                "WHERE app_name = ? AND user_id = ? AND session_id = ?",
+                (
+                    session.app_name,
+                    session.user_id,
+                    session.id,
+                    event.timestamp,
+                    payload,
+                    session.app_name,
+                    session.user_id,
+                    session.id,
+                ),
+            )
+            if state_delta:
+                self._upsert_state(
+                    connection,
+                    session.app_name,
+                    session.user_id,
+                    session.id,
+                    state_delta,
+                )
+            connection.execute(
+                "UPDATE sessions SET update_time = ? "
+                "WHERE app_name = ? AND user_id = ? AND id = ?",
+                (event.timestamp, session.app_name, session.user_id, session.id),
+            )
+
+        await self._write(append)
+        return event
+
+    async def save_checkpoint(
+        self,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        stage: str,
+        state: Dict[str, Any],
+    ) -> None:
+        """Record that ``stage`` completed, with the stage outputs in ``state``"""
+        snapshot = json.dumps({key: state.get(key) for key in CHECKPOINT_KEYS})
+
+        def save(connection: sqlite3.Connection) -> None:
+            connection.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?)",
+                (app_name, user_id, session_id, stage, time.time(), snapshot),
+            )
+
+        await self._write(save)
+
+    async def load_checkpoint(
+        self, app_name: str, user_id: str, session_id: str
+    ) -> Optional[Checkpoint]:
+        """Return the completed stages and the outputs saved after the last one"""
+
+        def load(connection: sqlite3.Connection) -> Optional[Checkpoint]:
+            rows = connection.execute(
+                "SELECT stage, created_at, state FROM checkpoints "
+                "WHERE app_name = ? AND user_id = ? AND session_id = ? "
+                "ORDER BY created_at",
+                (app_name, user_id, session_id),
+            ).fetchall()
+            if not rows:
+                return None
+            _, created_at, state = rows[-1]
+            return Checkpoint(
+                stages=[stage for stage, _, _ in rows],
+                state=json.loads(state),
+                created_at=created_at,
+            )
+
+        return await self._read(load)
+
+    def close(self) -> None:
+        """Stop the worker threads; their connections close with them"""
+        self._writer.shutdown(wait=True)
+        self._readers.shutdown(wait=True)
@@ -5,11 +5,27 @@ This module provides utilities to configure your channel information for persona
 Run this script to set up your channel preferences, or import and use the functions programmatically.
 """
 
+import dataclasses
+
+from .channel_profiles import profile_store, set_channel_info
 from .config import config, ChannelInfo
 
 
-def setup_channel_interactive():
-    """Interactive setup for channel information"""
+def _apply(channel_info: ChannelInfo, profile_name: str = None):
+    """Make ``channel_info`` current in running agents and store it if named"""
+    set_channel_info(channel_info)
+    profile_name = profile_name or config.channel_profile
+    if profile_name:
+        profile = profile_store.save(profile_name, channel_info)
+        print(f"💾 Saved as channel profile '{profile.name}' v{profile.version}")
+
+
+def setup_channel_interactive(profile_name: str = None):
+    """Interactive setup for channel information
+
+    The result is saved as the channel profile ``profile_name``, or
+    ``config.channel_profile``, if either is set.
+    """
     print("🎬 Script Writer Agent - Channel Setup")
     print("=" * 50)
     print(
@@ -91,8 +107,8 @@ def setup_channel_interactive():
         production_constraints=production_constraints,
     )
 
-    # Update config
-    config.channel_info = channel_info
+    # Update config and the running agents
+    _apply(channel_info, profile_name)
 
     print("\n✅ Channel information configured successfully!")
     print("\nYour channel setup:")
@@ -101,11 +117,13 @@ def setup_channel_interactive():
     return channel_info
 
 
-def setup_channel_programmatic(**kwargs):
+def setup_channel_programmatic(profile_name: str = None, **kwargs):
     """
     Programmatically set up channel information
 
     Args:
+        profile_name: Channel profile to save the result as (defaults to
+            ``config.channel_profile``; not saved if neither is set)
         **kwargs: Any ChannelInfo field (channel_name, creator_name, etc.)
 
     Example:
@@ -120,14 +138,16 @@ def setup_channel_programmatic(**kwargs):
     # Get current channel info or create new one
     current_info = config.channel_info or ChannelInfo()
 
-    # Update fields
+    # Update fields on a copy, so running agents can tell what changed
+    updates = {}
     for field, value in kwargs.items():
         if hasattr(current_info, field):
-            setattr(current_info, field, value)
+            updates[field] = value
         else:
             print(f"Warning: Unknown field '{field}' ignored")
+    current_info = dataclasses.replace(current_info, **updates)
 
-    config.channel_info = current_info
+    _apply(current_info, profile_name)
     print("✅ Channel information updated programmatically!")
     return current_info
 
@@ -158,7 +178,7 @@ def print_channel_summary(channel_info: ChannelInfo = None):
 
 def reset_channel_config():
     """Reset channel configuration to defaults"""
-    config.channel_info = ChannelInfo()
+    set_channel_info(ChannelInfo())
     print("🔄 Channel configuration reset to defaults")
 
 
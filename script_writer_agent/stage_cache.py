@@ -0,0 +1,175 @@
+"""Reuse a stage's stored output when its inputs are identical to an earlier run"""
+
+import collections
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from google.adk.agents import BaseAgent, LlmAgent
+from google.adk.agents.callback_context import CallbackContext
+from google.genai.types import Content
+
+from .channel_utils import channel_fingerprint
+from .config import ChannelInfo, config
+from .disk_cache import DiskCache, hash_key
+from .state_compaction import conversation_texts, turn_request
+from .sub_agents.validation_checkers import artifact_under_review
+
+# Session state key that makes every stage regenerate its output
+FORCE_REFRESH_KEY = "force_refresh"
+
+# Bump to invalidate every stored output, e.g. after changing how stages run
+STAGE_CACHE_VERSION = 2
+
+# Runs that raised never reach after_agent_callback; only this many are tracked
+MAX_PENDING_RUNS = 1000
+
+
+def agent_fingerprint(agent: BaseAgent) -> list:
+    """Return the name, instruction and model of every LLM agent under ``agent``"""
+    fingerprint = []
+    if isinstance(agent, LlmAgent):
+        instruction = agent.instruction
+        if callable(instruction):
+            # Instruction providers fill a template from state at run time
+            instruction = getattr(
+                instruction,
+                "instruction_template",
+                f"{instruction.__module__}.{instruction.__qualname__}",
+            )
+        fingerprint.append([agent.name, instruction, agent.canonical_model.model])
+    for sub_agent in agent.sub_agents:
+        fingerprint.extend(agent_fingerprint(sub_agent))
+    return fingerprint
+
+
+def prompt_request(callback_context: CallbackContext) -> List[str]:
+    """Return the conversation text the stage's agents are prompted with"""
+    if config.state_compaction:
+        return turn_request(callback_context)
+    # Without compaction the agents read the whole conversation
+    return conversation_texts(callback_context)
+
+
+def editor_inputs(callback_context: CallbackContext) -> Optional[Dict[str, Any]]:
+    """The editor's only input is the artifact it reviews"""
+    artifact_key = artifact_under_review(callback_context._invocation_context.session)
+    if artifact_key is None:
+        # The draft under review only exists in the conversation
+        return None
+    return {
+        "artifact_key": artifact_key,
+        "artifact": callback_context.state.get(artifact_key),
+    }
+
+
+class StageCache:
+    """Stores a stage's output under a hash of everything it depends on.
+
+    The key covers the conversation text the stage is prompted with (the
+    user request and the root agent's instructions before transferring, or
+    the whole conversation without state compaction), the declared state
+    inputs, the instruction and model of every LLM agent in the stage and
+    the ``ChannelInfo`` of the agent tree the stage belongs to. When a later
+    run of the stage, in any session, has the same key, the stored output is
+    written to ``output_key`` and the stage's agents are not run. Setting ``force_refresh`` in session state, or
+    ``config.stage_cache_force_refresh``, regenerates and re-stores outputs.
+    """
+
+    def __init__(
+        self,
+        output_key: str,
+        store: DiskCache,
+        channel_info: ChannelInfo,
+        input_keys: Sequence[str] = (),
+        select_inputs: Optional[
+            Callable[[CallbackContext], Optional[Dict[str, Any]]]
+        ] = None,
+    ):
+        self.output_key = output_key
+        self.input_keys = tuple(input_keys)
+        self.store = store
+        self.channel_info = channel_info
+        self.select_inputs = select_inputs
+        self.saved_seconds = 0.0
+        self._pending: "collections.OrderedDict[str, Dict[str, Any]]" = (
+            collections.OrderedDict()
+        )
+
+    def inputs(self, callback_context: CallbackContext) -> Optional[Dict[str, Any]]:
+        if self.select_inputs is not None:
+            return self.select_inputs(callback_context)
+        return {key: callback_context.state.get(key) for key in self.input_keys}
+
+    def cache_key(self, callback_context: CallbackContext) -> Optional[str]:
+        inputs = self.inputs(callback_context)
+        if inputs is None:
+            return None
+        return hash_key(
+            STAGE_CACHE_VERSION,
+            callback_context.agent_name,
+            self.output_key,
+            prompt_request(callback_context),
+            inputs,
+            agent_fingerprint(callback_context._invocation_context.agent),
+            channel_fingerprint(self.channel_info),
+        )
+
+    def before_agent_callback(
+        self, callback_context: CallbackContext
+    ) -> Optional[Content]:
+        """Serves the stored output and skips the stage on a hit"""
+        key = self.cache_key(callback_context)
+        if key is None:
+            return None
+
+        refresh = config.stage_cache_force_refresh or callback_context.state.get(
+            FORCE_REFRESH_KEY
+        )
+        entry = None if refresh else self.store.get(key)
+        if entry is not None:
+            callback_context.state[self.output_key] = entry["output"]
+            self.saved_seconds += entry.get("elapsed_seconds", 0.0)
+            return Content()
+
+        self._pending[callback_context.invocation_id] = {
+            "key": key,
+            "channel": channel_fingerprint(self.channel_info),
+            "started_at": time.monotonic(),
+        }
+        while len(self._pending) > MAX_PENDING_RUNS:
+            self._pending.popitem(last=False)
+        return None
+
+    def after_agent_callback(self, callback_context: CallbackContext) -> None:
+        """Stores the freshly generated output under the key of its inputs"""
+        pending = self._pending.pop(callback_context.invocation_id, None)
+        output = callback_context.state.get(self.output_key)
+        if pending is None or not output:
+            return None
+        if pending["channel"] != channel_fingerprint(self.channel_info):
+            # The channel changed during the run, so the output matches neither key
+            return None
+
+        self.store.set(
+            pending["key"],
+            {
+                "output": output,
+                "elapsed_seconds": time.monotonic() - pending["started_at"],
+            },
+        )
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters of the shared store and the time saved by hits"""
+        stats = self.store.stats()
+        stats["saved_seconds"] = round(self.saved_seconds, 3)
+        return stats
+
+
+# Shared by the stages of every channel, so the size bound covers every stored output
+stage_store = DiskCache(
+    directory=config.stage_cache_dir,
+    ttl_seconds=config.stage_cache_ttl_seconds,
+    max_entries=config.stage_cache_max_entries,
+    max_bytes=config.stage_cache_max_bytes,
+)
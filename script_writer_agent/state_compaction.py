@@ -0,0 +1,217 @@
+"""Bound prompt size by sending each agent only the state it declares as input"""
+
+from typing import Any, Callable, List, Optional
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+from .agent_utils import current_tool_turns
+from .config import config
+from .incremental_validation import is_approved
+from .markdown_utils import split_sections
+from .research_index import RESEARCH_KEY, retrieve_research
+from .sub_agents.validation_checkers import ARTIFACT_KEYS
+
+STATE_INPUT_LABELS = {
+    "research_topic": "Research Topic",
+    "research_findings": "Research Findings",
+    "research_snippets": "Relevant Research Findings",
+    "script_outline": "Script Outline",
+    "script": "Script",
+    "production_script": "Production Script",
+    "validation_result": "Latest Editor Feedback",
+}
+
+COMPACTED_PROMPT = """## Request
+{request}
+{inputs}"""
+
+# Placeholder for another agent's long output in the root agent's history
+COMPACTED_OUTPUT = (
+    "[{author}] produced {chars} characters of output, stored in session state."
+)
+COMPACTED_OUTPUT_MIN_CHARS = 1000
+
+
+def compact_markdown(markdown: str, max_chars: int) -> str:
+    """Shorten markdown to about ``max_chars`` while keeping every heading.
+
+    Each section keeps its heading and an equal share of the budget for the
+    beginning of its body, so the structure of the document survives.
+    """
+    if len(markdown) <= max_chars:
+        return markdown
+
+    sections = split_sections(markdown)
+    headings = sum(len(section.text) - len(section.body) for section in sections)
+    share = max(0, (max_chars - headings) // max(1, len(sections)))
+    parts = []
+    for section in sections:
+        body = section.body.strip()
+        if len(body) > share:
+            body = body[:share].rsplit(" ", 1)[0] + " [...]"
+        heading = section.text[: len(section.text) - len(section.body)].strip()
+        parts.append("\n".join(part for part in (heading, body) if part))
+    return "\n\n".join(parts)
+
+
+def _text(content: Optional[types.Content]) -> str:
+    if content is None or not content.parts:
+        return ""
+    return "".join(part.text or "" for part in content.parts if not part.thought)
+
+
+def turn_request(callback_context: CallbackContext) -> List[str]:
+    """Return the texts that started the agent's current turn.
+
+    These are the user message and any instructions the agent's ancestors,
+    e.g. the root agent, wrote before transferring to it. In the chat flow
+    the latter often carry the topic, while the user only says "go ahead".
+    """
+    context = callback_context._invocation_context
+    ancestors = set()
+    parent = context.agent.parent_agent
+    while parent is not None:
+        ancestors.add(parent.name)
+        parent = parent.parent_agent
+
+    request = [_text(callback_context.user_content)]
+    for event in context.session.events:
+        if (
+            event.invocation_id == context.invocation_id
+            and event.author in ancestors
+            and not event.partial
+        ):
+            text = _text(event.content).strip()
+            if text:
+                request.append(text)
+    return [part for part in request if part.strip()]
+
+
+def conversation_texts(callback_context: CallbackContext) -> List[str]:
+    """Return the text of every finished event in the session"""
+    events = callback_context._invocation_context.session.events
+    return [_text(event.content) for event in events if not event.partial]
+
+
+class StateInputs:
+    """Declares the session state an agent reads and compacts its prompt to it.
+
+    The conversation history is replaced by a single user message with the
+    request that started the current turn, any instructions the root agent
+    wrote before transferring, and the declared state keys. Long reference
+    inputs like research and editor feedback are shortened with
+    ``compact_markdown``, so the prompt stays bounded no matter how many edit
+    loops came before. The outline, script and production script are always
+    sent whole, since the agents that read them rewrite them in full.
+
+    With a ``research_query`` and ``config.research_retrieval``, the research
+    findings are replaced by the ``research_top_k`` snippets that best match
+    the query built from the callback context, e.g. the section being written.
+    If no snippet matches, the compacted findings are sent instead, so the
+    agent never loses its research.
+    """
+
+    def __init__(
+        self,
+        *keys: str,
+        max_input_chars: Optional[int] = None,
+        research_query: Optional[Callable[[Any], str]] = None,
+        research_top_k: Optional[int] = None,
+    ):
+        self.keys = keys
+        self.max_input_chars = max_input_chars or config.compaction_max_input_chars
+        self.research_query = research_query if config.research_retrieval else None
+        self.research_top_k = research_top_k or config.research_top_k
+
+    def build_prompt(self, callback_context: CallbackContext) -> str:
+        inputs = []
+        for key in self.keys:
+            value = callback_context.state.get(key)
+            if not value or (key == RESEARCH_KEY and self.research_query):
+                continue
+            if key == "validation_result" and is_approved(value):
+                # Only feedback that asks for changes is worth sending
+                continue
+            label = STATE_INPUT_LABELS.get(key, key)
+            text = (
+                str(value)
+                if key in ARTIFACT_KEYS
+                else compact_markdown(str(value), self.max_input_chars)
+            )
+            inputs.append(f"\n## {label} (state key: {key})\n{text}")
+
+        findings = callback_context.state.get(RESEARCH_KEY)
+        if self.research_query and findings:
+            snippets = retrieve_research(
+                str(findings),
+                self.research_query(callback_context),
+                self.research_top_k,
+            )
+            if snippets:
+                label = STATE_INPUT_LABELS["research_snippets"]
+                inputs.append(
+                    f"\n## {label} (from state key: {RESEARCH_KEY})\n{snippets}"
+                )
+            else:
+                label = STATE_INPUT_LABELS[RESEARCH_KEY]
+                text = compact_markdown(str(findings), self.max_input_chars)
+                inputs.append(f"\n## {label} (state key: {RESEARCH_KEY})\n{text}")
+        return COMPACTED_PROMPT.format(
+            request="\n\n".join(turn_request(callback_context)),
+            inputs="".join(inputs),
+        )
+
+    def before_model_callback(
+        self, callback_context: CallbackContext, llm_request: LlmRequest
+    ) -> Optional[LlmResponse]:
+        # Keep tool calls and results made during this model turn
+        tool_turns = current_tool_turns(llm_request.contents)
+        llm_request.contents = [
+            types.Content(
+                role="user",
+                parts=[types.Part(text=self.build_prompt(callback_context))],
+            )
+        ] + tool_turns
+        return None
+
+
+def state_inputs_callback(
+    *keys: str,
+    research_query: Optional[Callable[[Any], str]] = None,
+    research_top_k: Optional[int] = None,
+) -> Optional[Callable]:
+    """Return the compaction callback for an agent reading ``keys``, if enabled"""
+    if not config.state_compaction:
+        return None
+    return StateInputs(
+        *keys, research_query=research_query, research_top_k=research_top_k
+    ).before_model_callback
+
+
+def compact_history_callback(
+    callback_context: CallbackContext, llm_request: LlmRequest
+) -> Optional[LlmResponse]:
+    """Replace superseded outputs of other agents in the root agent's history.
+
+    Only the latest long output of each agent is kept; earlier drafts from
+    edit loops become a one-line placeholder, since the current documents are
+    in session state anyway.
+    """
+    seen_authors = set()
+    for content in reversed(llm_request.contents):
+        for part in reversed(content.parts or []):
+            # ADK presents other agents' replies as "[author] said: ..."
+            if (
+                not part.text
+                or len(part.text) < COMPACTED_OUTPUT_MIN_CHARS
+                or not part.text.startswith("[")
+                or "] said: " not in part.text
+            ):
+                continue
+            author = part.text[1 : part.text.index("] said: ")]
+            if author in seen_authors:
+                part.text = COMPACTED_OUTPUT.format(author=author, chars=len(part.text))
+            seen_authors.add(author)
+    return None
@@ -0,0 +1,115 @@
+"""Stream stage outputs to the caller token by token as they are generated"""
+
+import argparse
+import asyncio
+import sys
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, Optional
+
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.runners import Runner
+from google.genai import types
+
+# Agent name prefixes whose model output is forwarded, mapped to the stage name
+STREAMED_STAGES: Dict[str, str] = {
+    "researcher": "research",
+    "google_researcher": "research",
+    "youtube_researcher": "research",
+    "stackoverflow_researcher": "research",
+    "reddit_researcher": "research",
+    "research_merger": "research",
+    "script_writer": "write",
+    "script_section_writer_": "write",
+    "script_director": "direct",
+    "script_section_director_": "direct",
+    "written_section_director_": "direct",
+}
+
+
+@dataclass
+class StageChunk:
+    """A piece of text produced by a pipeline stage"""
+
+    stage: str
+    agent: str
+    text: str
+    final: bool = False  # True once the agent's output is complete
+
+
+def stage_for_agent(agent_name: str) -> Optional[str]:
+    """Return the stage an agent belongs to, or None if it is not streamed"""
+    if agent_name in STREAMED_STAGES:
+        return STREAMED_STAGES[agent_name]
+    for prefix, stage in STREAMED_STAGES.items():
+        if prefix.endswith("_") and agent_name.startswith(prefix):
+            return stage
+    return None
+
+
+async def stream_stage_outputs(
+    runner: Runner, user_id: str, session_id: str, message: str
+) -> AsyncIterator[StageChunk]:
+    """Run one turn and yield stage output chunks while they are generated.
+
+    Partial model responses from the researcher, writer and director agents
+    are yielded as they arrive. Each agent's output ends with a ``final``
+    chunk; it carries the full text only if the model did not stream.
+    """
+    streamed_agents = set()
+    async for event in runner.run_async(
+        user_id=user_id,
+        session_id=session_id,
+        new_message=types.Content(role="user", parts=[types.Part(text=message)]),
+        run_config=RunConfig(streaming_mode=StreamingMode.SSE),
+    ):
+        stage = stage_for_agent(event.author)
+        if stage is None or not event.content or not event.content.parts:
+            continue
+        text = "".join(part.text or "" for part in event.content.parts)
+        if not text:
+            continue
+
+        if event.partial:
+            streamed_agents.add(event.author)
+            yield StageChunk(stage=stage, agent=event.author, text=text)
+        elif event.author in streamed_agents:
+            streamed_agents.discard(event.author)
+            yield StageChunk(stage=stage, agent=event.author, text="", final=True)
+        else:
+            yield StageChunk(stage=stage, agent=event.author, text=text, final=True)
+
+
+async def _stream_to_stdout(message: str) -> None:
+    from google.adk.sessions import InMemorySessionService
+
+    from .agent import build_root_agent
+    from .config import config
+
+    # The documents are streamed here, so the root agent must not echo them.
+    # The tree reads this when it is built, so set it first
+    config.stream_stage_outputs = True
+    root_agent = build_root_agent()
+
+    session_service = InMemorySessionService()
+    session = await session_service.create_session(
+        app_name="script_writer_agent", user_id="cli"
+    )
+    runner = Runner(
+        agent=root_agent,
+        app_name="script_writer_agent",
+        session_service=session_service,
+    )
+    current_agent = None
+    async for chunk in stream_stage_outputs(runner, "cli", session.id, message):
+        if chunk.agent != current_agent:
+            current_agent = chunk.agent
+            sys.stdout.write(f"\n\n===== {chunk.stage}: {chunk.agent} =====\n")
+        sys.stdout.write(chunk.text)
+        sys.stdout.flush()
+    sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stream stage outputs to stdout.")
+    parser.add_argument("message", help="the request for the script writer agent")
+    asyncio.run(_stream_to_stdout(parser.parse_args().message))
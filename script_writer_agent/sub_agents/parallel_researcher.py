@@ -0,0 +1,184 @@
+from google.adk.agents import Agent, ParallelAgent, SequentialAgent
+
+from ..config import ChannelInfo, config
+from ..agent_utils import callback_chain, suppress_output_callback
+from ..channel_utils import get_channel_aware_instruction
+from ..context_cache import context_cache
+from ..models import model_for
+from ..search_cache import web_search
+from ..state_compaction import state_inputs_callback
+
+PLATFORM_RESEARCH_FOCUS = {
+    "google": """### General Web Search (Google)
+- Start with broad searches to understand the topic landscape
+- Look for authoritative sources, recent articles, and trending information
+- Identify key concepts, statistics, and expert opinions
+- Search queries like: "[topic] latest trends", "[topic] best practices", "[topic] 2025"
+""",
+    "youtube": """### YouTube Content Analysis
+- Search for videos on the topic to see what content already exists
+- Identify popular video formats, titles, and approaches
+- Note what resonates with audiences (view counts, engagement)
+- Search queries like: "site:youtube.com [topic]", "[topic] tutorial", "[topic] explained"
+- Extract insights about: successful hooks, popular angles, audience questions
+""",
+    "stackoverflow": """### Technical Deep-Dive (StackOverflow)
+- Find common technical questions and challenges
+- Identify pain points and frequent misconceptions
+- Gather practical code examples and solutions
+- Search queries like: "site:stackoverflow.com [topic]", "[topic] common errors", "[topic] best practices"
+""",
+    "reddit": """### Community Insights (Reddit)
+- Discover what real users are discussing and asking about
+- Find authentic questions, concerns, and experiences
+- Identify trending topics and controversies
+- Search queries like: "site:reddit.com [topic]", "[topic] reddit discussion", "[topic] r/programming"
+- Focus on subreddits relevant to the topic
+""",
+}
+
+PLATFORM_RESEARCHER_INSTRUCTION = """
+You are a research specialist gathering information about a single platform to support content creation.
+Other researchers cover the remaining platforms at the same time, so stay within your scope.
+
+The research topic is available in the research_topic key from the context.
+
+## Your Scope:
+{focus}
+## Guidelines:
+- Conduct 1-2 focused, high-quality searches for your platform only
+- Prioritize recent information (2024-2025) and credible sources
+- Extract actionable insights, not just summaries
+- Note conflicting information or controversies to address
+- Look for statistics, quotes, and specific examples to use
+- If a search fails or times out, report what you found rather than retrying immediately
+
+## Output Format:
+A concise markdown report with your key findings, followed by a "Sources" list with the URLs you used.
+"""
+
+RESEARCH_MERGER_INSTRUCTION = """
+You are a research editor. Several researchers have investigated the same topic in parallel, one platform each.
+Combine their reports into a single research report without running new searches.
+
+## Google findings
+{research_google?}
+
+## YouTube findings
+{research_youtube?}
+
+## StackOverflow findings
+{research_stackoverflow?}
+
+## Reddit findings
+{research_reddit?}
+
+## Output Format:
+
+Organize the combined findings into clear sections:
+
+### Executive Summary
+- Brief overview of the topic landscape
+- Key findings and insights
+- Current trends and hot topics
+
+### YouTube Content Analysis
+- Popular video approaches and formats
+- Successful titles and hooks
+- Engagement patterns and audience preferences
+- Content gaps and opportunities
+
+### Technical Information (from StackOverflow & General Search)
+- Common technical challenges and questions
+- Best practices and recommendations
+- Code examples and practical solutions
+- Misconceptions to address
+
+### Community Insights (from Reddit & Forums)
+- Popular discussions and debates
+- Real user questions and pain points
+- Emerging trends and concerns
+- Interesting angles or perspectives
+
+### Content Recommendations
+- Unique angles to explore
+- Questions to answer in the video
+- Topics that need clarification
+- Hooks and engagement strategies
+
+### Sources
+- List key URLs and references from all reports
+- Note particularly valuable resources
+
+## Guidelines:
+- Remove duplicates and resolve overlaps between the reports
+- Keep every useful source URL
+- If a report is empty, leave its insights out instead of inventing them
+"""
+
+
+def platform_instruction(platform: str) -> str:
+    """Render the platform-scoped researcher instruction"""
+    return PLATFORM_RESEARCHER_INSTRUCTION.replace(
+        "{focus}", PLATFORM_RESEARCH_FOCUS[platform]
+    )
+
+
+PLATFORM_RESEARCHER_STATE_INPUTS = ("research_topic",)
+
+# The platform reports are injected into the merger instruction
+RESEARCH_MERGER_STATE_INPUTS = ()
+
+
+def create_parallel_researcher(channel_info: ChannelInfo) -> SequentialAgent:
+    """Build the per-platform researchers and the report merger for a channel"""
+    platform_researchers = [
+        Agent(
+            model=model_for(f"{platform}_researcher", group="platform_researcher"),
+            name=f"{platform}_researcher",
+            description=f"Agent specialized in gathering information from {platform} using web search.",
+            instruction=get_channel_aware_instruction(
+                platform_instruction(platform), channel_info
+            ),
+            tools=[web_search],
+            output_key=f"research_{platform}",
+            disallow_transfer_to_parent=True,
+            disallow_transfer_to_peers=True,
+            before_model_callback=callback_chain(
+                state_inputs_callback(*PLATFORM_RESEARCHER_STATE_INPUTS),
+                context_cache.before_model_callback if config.context_caching else None,
+            ),
+            after_agent_callback=suppress_output_callback,
+        )
+        for platform in PLATFORM_RESEARCH_FOCUS
+    ]
+
+    research_merger = Agent(
+        model=model_for("research_merger"),
+        name="research_merger",
+        description="Agent to merge the per-platform research reports into one report.",
+        instruction=get_channel_aware_instruction(
+            RESEARCH_MERGER_INSTRUCTION, channel_info
+        ),
+        output_key="research_findings",
+        disallow_transfer_to_parent=True,
+        disallow_transfer_to_peers=True,
+        before_model_callback=callback_chain(
+            state_inputs_callback(*RESEARCH_MERGER_STATE_INPUTS),
+            context_cache.before_model_callback if config.context_caching else None,
+        ),
+        after_agent_callback=suppress_output_callback,
+    )
+
+    return SequentialAgent(
+        name="parallel_researcher",
+        description="Researches every platform concurrently and merges the findings.",
+        sub_agents=[
+            ParallelAgent(
+                name="platform_research",
+                description="Runs the per-platform researchers at the same time.",
+                sub_agents=platform_researchers,
+            ),
+            research_merger,
+        ],
+    )
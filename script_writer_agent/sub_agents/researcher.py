@@ -1,9 +1,20 @@
 from google.adk.agents import Agent, LoopAgent
-from google.adk.tools import google_search
 
-from ..config import config
-from ..agent_utils import suppress_output_callback
+from ..config import ChannelInfo, config
+from ..agent_utils import callback_chain, suppress_output_callback
 from ..channel_utils import get_channel_aware_instruction
+from ..context_cache import context_cache
+from ..models import model_for
+from ..search_cache import web_search
+from ..state_compaction import state_inputs_callback
+from ..disk_cache import DiskCache
+from ..research_cache import ResearchCache
+from .parallel_researcher import (
+    PLATFORM_RESEARCH_FOCUS,
+    RESEARCH_MERGER_INSTRUCTION,
+    create_parallel_researcher,
+    platform_instruction,
+)
 
 RESEARCHER_INSTRUCTION = """
 You are a research specialist focused on gathering comprehensive, relevant information from multiple online sources. Your job is to collect high-quality information from YouTube, Google, StackOverflow, and Reddit to support content creation.
@@ -114,22 +125,62 @@ IMPORTANT: Focus on getting valuable insights from fewer, well-crafted searches
 Remember: Your research should provide the foundation for creating unique, valuable content that stands out from what already exists.
 """
 
-researcher = Agent(
-    model=config.main_model,
-    name="researcher",
-    description="Agent specialized in gathering information from YouTube, Google, StackOverflow, and Reddit using web search.",
-    instruction=get_channel_aware_instruction(
-        RESEARCHER_INSTRUCTION, config.channel_info
-    ),
-    tools=[google_search],
-    output_key="research_findings",
-    after_agent_callback=suppress_output_callback,
-)
+RESEARCHER_STATE_INPUTS = ("research_topic",)
 
-robust_researcher = LoopAgent(
-    name="robust_researcher",
-    description="A robust researcher agent that can retry if it fails and iterate on research quality.",
-    sub_agents=[researcher],
-    max_iterations=config.max_research_iterations,
-    after_agent_callback=suppress_output_callback,
+# Shared by the researchers of every channel; keys include the channel
+research_store = DiskCache(
+    directory=config.research_cache_dir,
+    ttl_seconds=config.research_cache_ttl_seconds,
+    max_entries=config.research_cache_max_entries,
 )
+
+
+def create_researcher(channel_info: ChannelInfo) -> Agent:
+    return Agent(
+        model=model_for("researcher"),
+        name="researcher",
+        description="Agent specialized in gathering information from YouTube, Google, StackOverflow, and Reddit using web search.",
+        instruction=get_channel_aware_instruction(RESEARCHER_INSTRUCTION, channel_info),
+        tools=[web_search],
+        output_key="research_findings",
+        before_model_callback=callback_chain(
+            state_inputs_callback(*RESEARCHER_STATE_INPUTS),
+            context_cache.before_model_callback if config.context_caching else None,
+        ),
+        after_agent_callback=suppress_output_callback,
+    )
+
+
+def create_robust_researcher(channel_info: ChannelInfo) -> LoopAgent:
+    """Build the research stage for a channel, with its research cache"""
+    if config.parallel_research:
+        research_instruction = "\n".join(
+            [platform_instruction(platform) for platform in PLATFORM_RESEARCH_FOCUS]
+            + [RESEARCH_MERGER_INSTRUCTION]
+        )
+        researcher = create_parallel_researcher(channel_info)
+    else:
+        research_instruction = RESEARCHER_INSTRUCTION
+        researcher = create_researcher(channel_info)
+
+    research_cache = ResearchCache(
+        instruction=research_instruction,
+        store=research_store,
+        channel_info=channel_info,
+    )
+    return LoopAgent(
+        name="robust_researcher",
+        description="A robust researcher agent that can retry if it fails and iterate on research quality.",
+        sub_agents=[researcher],
+        max_iterations=config.max_research_iterations,
+        before_agent_callback=(
+            research_cache.before_agent_callback
+            if config.research_cache_enabled
+            else None
+        ),
+        after_agent_callback=(
+            [research_cache.after_agent_callback, suppress_output_callback]
+            if config.research_cache_enabled
+            else suppress_output_callback
+        ),
+    )
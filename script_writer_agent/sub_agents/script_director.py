@@ -1,9 +1,14 @@
 from google.adk.agents import Agent, LoopAgent
-from google.adk.tools import google_search
 
-from ..config import config
-from ..agent_utils import suppress_output_callback
+from ..config import ChannelInfo, config
+from ..agent_utils import callback_chain, suppress_output_callback
 from ..channel_utils import get_channel_aware_instruction
+from ..context_cache import context_cache
+from ..models import model_for
+from ..search_cache import web_search
+from ..stage_cache import StageCache, stage_store
+from ..state_compaction import state_inputs_callback
+from .section_director import create_section_pipelined_director
 
 SCRIPT_DIRECTOR_INSTRUCTION = """
 You are a video director and visual storytelling expert. Your job is to take a script and integrate comprehensive directorial guidance directly into it, creating a unified production-ready script with embedded visual direction.
@@ -69,22 +74,53 @@ The final output should be a complete, production-ready script that any video te
 Use Google Search to find current trends in video direction, visual storytelling techniques, and audience engagement strategies relevant to the content topic.
 """
 
-script_director = Agent(
-    model=config.main_model,
-    name="script_director",
-    description="Agent to integrate directorial guidance into the script for video production.",
-    instruction=get_channel_aware_instruction(
-        SCRIPT_DIRECTOR_INSTRUCTION, config.channel_info
-    ),
-    tools=[google_search],
-    output_key="production_script",
-    after_agent_callback=suppress_output_callback,
-)
-
-robust_script_director = LoopAgent(
-    name="robust_script_director",
-    description="A robust script director that retries if it fails.",
-    sub_agents=[script_director],
-    max_iterations=1,
-    after_agent_callback=suppress_output_callback,
-)
+SCRIPT_DIRECTOR_STATE_INPUTS = ("script", "validation_result")
+
+
+def create_script_director(channel_info: ChannelInfo) -> Agent:
+    return Agent(
+        model=model_for("script_director"),
+        name="script_director",
+        description="Agent to integrate directorial guidance into the script for video production.",
+        instruction=get_channel_aware_instruction(
+            SCRIPT_DIRECTOR_INSTRUCTION, channel_info
+        ),
+        tools=[web_search],
+        output_key="production_script",
+        before_model_callback=callback_chain(
+            state_inputs_callback(*SCRIPT_DIRECTOR_STATE_INPUTS),
+            context_cache.before_model_callback if config.context_caching else None,
+        ),
+        after_agent_callback=suppress_output_callback,
+    )
+
+
+def create_robust_script_director(channel_info: ChannelInfo) -> LoopAgent:
+    """Build the directing stage for a channel, with its stage cache"""
+    director_stage_cache = StageCache(
+        "production_script", stage_store, channel_info, SCRIPT_DIRECTOR_STATE_INPUTS
+    )
+    return LoopAgent(
+        name="robust_script_director",
+        description="A robust script director that retries if it fails.",
+        sub_agents=[
+            (
+                create_section_pipelined_director(
+                    create_script_director(channel_info), channel_info=channel_info
+                )
+                if config.pipelined_directing
+                else create_script_director(channel_info)
+            )
+        ],
+        max_iterations=1,
+        before_agent_callback=(
+            director_stage_cache.before_agent_callback
+            if config.stage_cache_enabled
+            else None
+        ),
+        after_agent_callback=(
+            [director_stage_cache.after_agent_callback, suppress_output_callback]
+            if config.stage_cache_enabled
+            else suppress_output_callback
+        ),
+    )
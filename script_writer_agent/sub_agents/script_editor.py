@@ -1,9 +1,15 @@
 from google.adk.agents import Agent, LoopAgent
-from google.adk.tools import google_search
 
-from ..config import config
+from ..config import ChannelInfo, config
 from ..agent_utils import suppress_output_callback
 from ..channel_utils import get_channel_aware_instruction
+from ..context_cache import context_cache
+from ..models import model_for
+from ..schemas import VALIDATION_DATA_KEY, StructuredOutputCallback, ValidationResult
+from ..search_cache import web_search
+from ..stage_cache import StageCache, editor_inputs, stage_store
+from ..incremental_validation import incremental_validation
+from .validation_checkers import RuleBasedPreValidator
 
 SCRIPT_EDITOR_INSTRUCTION = """
 You are a script editor and compliance validator. Your primary responsibility is to ensure that all outputs from the script planning,
@@ -54,25 +60,7 @@ For each output you receive, you must:
    - Specific examples or suggestions for improvement
 
 ### 3. Output Format
-Your response should be structured as follows:
-
-**COMPLIANCE STATUS: [APPROVED/REQUIRES CHANGES]**
-
-If APPROVED:
-- Brief confirmation that all guidelines are met
-- Any optional suggestions for enhancement
-
-If REQUIRES CHANGES:
-- **Issues Found:**
-  1. [Specific issue with guideline reference]
-  2. [Specific issue with guideline reference]
-  
-- **Required Changes:**
-  1. [Detailed correction needed]
-  2. [Detailed correction needed]
-
-- **Recommendations:**
-  - [Specific suggestions for improvement]
+{output_format}
 
 ### 4. Key Validation Points
 Always check:
@@ -95,22 +83,108 @@ If changes are required:
 Remember: Your role is crucial in maintaining the quality and consistency of the final output. Be thorough but constructive in your feedback.
 """
 
-script_editor = Agent(
-    model=config.main_model,
-    name="script_editor",
-    description="Agent to validate compliance with initial guidelines and provide feedback for improvements.",
-    instruction=get_channel_aware_instruction(
-        SCRIPT_EDITOR_INSTRUCTION, config.channel_info
-    ),
-    tools=[google_search],
-    output_key="validation_result",
-    after_agent_callback=suppress_output_callback,
-)
-
-robust_script_editor = LoopAgent(
-    name="robust_script_editor",
-    description="A robust script editor that retries if it fails.",
-    sub_agents=[script_editor],
-    max_iterations=1,
-    after_agent_callback=suppress_output_callback,
-)
+MARKDOWN_OUTPUT_FORMAT = """Your response should be structured as follows:
+
+**COMPLIANCE STATUS: [APPROVED/REQUIRES CHANGES]**
+
+If APPROVED:
+- Brief confirmation that all guidelines are met
+- Any optional suggestions for enhancement
+
+If REQUIRES CHANGES:
+- **Issues Found:**
+  1. [Specific issue with guideline reference]
+  2. [Specific issue with guideline reference]
+  
+- **Required Changes:**
+  1. [Detailed correction needed]
+  2. [Detailed correction needed]
+
+- **Recommendations:**
+  - [Specific suggestions for improvement]"""
+
+STRUCTURED_OUTPUT_FORMAT = """Reply with a single JSON object and nothing else, in this shape:
+{
+  "status": "APPROVED" or "REQUIRES CHANGES",
+  "summary": "brief confirmation that all guidelines are met, empty if changes are required",
+  "issues": ["specific issue with guideline reference"],
+  "required_changes": ["detailed correction needed, in the same order as the issues"],
+  "recommendations": ["specific suggestion for improvement"]
+}"""
+
+editor_after_callbacks = []
+if config.incremental_validation:
+    editor_after_callbacks.append(incremental_validation.after_agent_callback)
+editor_after_callbacks.append(suppress_output_callback)
+
+editor_model_callbacks = []
+if config.incremental_validation:
+    editor_model_callbacks.append(incremental_validation.before_model_callback)
+if config.context_caching:
+    editor_model_callbacks.append(context_cache.before_model_callback)
+
+
+def create_script_editor(channel_info: ChannelInfo) -> Agent:
+    return Agent(
+        model=model_for("script_editor"),
+        name="script_editor",
+        description="Agent to validate compliance with initial guidelines and provide feedback for improvements.",
+        instruction=get_channel_aware_instruction(
+            SCRIPT_EDITOR_INSTRUCTION.format(
+                output_format=(
+                    STRUCTURED_OUTPUT_FORMAT
+                    if config.structured_outputs
+                    else MARKDOWN_OUTPUT_FORMAT
+                )
+            ),
+            channel_info,
+        ),
+        tools=[web_search],
+        output_key="validation_result",
+        before_agent_callback=(
+            incremental_validation.before_agent_callback
+            if config.incremental_validation
+            else None
+        ),
+        before_model_callback=editor_model_callbacks or None,
+        after_model_callback=(
+            StructuredOutputCallback(VALIDATION_DATA_KEY, ValidationResult)
+            if config.structured_outputs
+            else None
+        ),
+        after_agent_callback=editor_after_callbacks,
+    )
+
+
+def create_script_pre_validator() -> RuleBasedPreValidator:
+    return RuleBasedPreValidator(
+        name="script_pre_validator",
+        description="Rejects drafts that fail mechanical guideline checks before the LLM review.",
+    )
+
+
+def create_robust_script_editor(channel_info: ChannelInfo) -> LoopAgent:
+    """Build the validation stage for a channel, with its stage cache"""
+    editor_stage_cache = StageCache(
+        "validation_result", stage_store, channel_info, select_inputs=editor_inputs
+    )
+    return LoopAgent(
+        name="robust_script_editor",
+        description="A robust script editor that retries if it fails.",
+        sub_agents=(
+            [create_script_pre_validator(), create_script_editor(channel_info)]
+            if config.rule_based_pre_validation
+            else [create_script_editor(channel_info)]
+        ),
+        max_iterations=1,
+        before_agent_callback=(
+            editor_stage_cache.before_agent_callback
+            if config.stage_cache_enabled
+            else None
+        ),
+        after_agent_callback=(
+            [editor_stage_cache.after_agent_callback, suppress_output_callback]
+            if config.stage_cache_enabled
+            else suppress_output_callback
+        ),
+    )
@@ -1,9 +1,15 @@
 from google.adk.agents import Agent, LoopAgent
-from google.adk.tools import google_search
 
-from ..config import config
-from ..agent_utils import suppress_output_callback
+from ..config import ChannelInfo, config
+from ..agent_utils import callback_chain, suppress_output_callback
 from ..channel_utils import get_channel_aware_instruction
+from ..context_cache import context_cache
+from ..models import model_for
+from ..research_index import state_query
+from ..schemas import OUTLINE_DATA_KEY, ScriptOutline, StructuredOutputCallback
+from ..search_cache import web_search
+from ..stage_cache import StageCache, stage_store
+from ..state_compaction import state_inputs_callback
 
 SCRIPT_PANNER_INSTRUCTION = """
 You are a technical content strategist. Your job is to create an outline for a script for a video.
@@ -14,7 +20,7 @@ it should include the following sections:
 - 3-5 key points/roadmap
 
 Use Google Search to find relevant information and examples to support your work.
-Your outline should be in markdown format.
+{output_format}
 
 The outline guidelines:
 - Title options:
@@ -45,23 +51,77 @@ Weaknesses and constraints:
     - provide boundaries, where the solution is not applicable.
 """
 
+MARKDOWN_OUTPUT_FORMAT = "Your outline should be in markdown format."
+
+STRUCTURED_OUTPUT_FORMAT = """Reply with the outline as a single JSON object and nothing else, in this shape:
+{
+  "title": "the video title",
+  "main_message": "the hook, why the audience should care and why they should trust me",
+  "roadmap": [{"heading": "key point", "points": ["what this part covers"]}],
+  "solution_steps": [{"name": "Quick win", "description": "..."}, {"name": "Systematic solution", "description": "..."}, {"name": "Overkill solution with extra contingency", "description": "..."}],
+  "constraints": ["where the solution is not practical or not applicable"]
+}"""
 
-script_panner = Agent(
-    model=config.main_model,
-    name="script_panner",
-    description="Agent to plan a script for a video.",
-    instruction=get_channel_aware_instruction(
-        SCRIPT_PANNER_INSTRUCTION, config.channel_info
-    ),
-    tools=[google_search],
-    output_key="script_outline",
-    after_agent_callback=suppress_output_callback,
-)
 
-robust_script_panner = LoopAgent(
-    name="robust_script_panner",
-    description="A robust script planner that retries if it fails.",
-    sub_agents=[script_panner],
-    max_iterations=1,  # Only run once to avoid the 3-iteration issue
-    after_agent_callback=suppress_output_callback,
+SCRIPT_PANNER_STATE_INPUTS = (
+    "research_findings",
+    "script_outline",
+    "validation_result",
 )
+
+
+def create_script_panner(channel_info: ChannelInfo) -> Agent:
+    return Agent(
+        model=model_for("script_panner"),
+        name="script_panner",
+        description="Agent to plan a script for a video.",
+        instruction=get_channel_aware_instruction(
+            SCRIPT_PANNER_INSTRUCTION.format(
+                output_format=(
+                    STRUCTURED_OUTPUT_FORMAT
+                    if config.structured_outputs
+                    else MARKDOWN_OUTPUT_FORMAT
+                )
+            ),
+            channel_info,
+        ),
+        tools=[web_search],
+        output_key="script_outline",
+        before_model_callback=callback_chain(
+            state_inputs_callback(
+                *SCRIPT_PANNER_STATE_INPUTS,
+                research_query=state_query("script_outline", "validation_result"),
+                research_top_k=config.research_outline_top_k,
+            ),
+            context_cache.before_model_callback if config.context_caching else None,
+        ),
+        after_model_callback=(
+            StructuredOutputCallback(OUTLINE_DATA_KEY, ScriptOutline)
+            if config.structured_outputs
+            else None
+        ),
+        after_agent_callback=suppress_output_callback,
+    )
+
+
+def create_robust_script_panner(channel_info: ChannelInfo) -> LoopAgent:
+    """Build the planning stage for a channel, with its stage cache"""
+    planner_stage_cache = StageCache(
+        "script_outline", stage_store, channel_info, SCRIPT_PANNER_STATE_INPUTS
+    )
+    return LoopAgent(
+        name="robust_script_panner",
+        description="A robust script planner that retries if it fails.",
+        sub_agents=[create_script_panner(channel_info)],
+        max_iterations=1,  # Only run once to avoid the 3-iteration issue
+        before_agent_callback=(
+            planner_stage_cache.before_agent_callback
+            if config.stage_cache_enabled
+            else None
+        ),
+        after_agent_callback=(
+            [planner_stage_cache.after_agent_callback, suppress_output_callback]
+            if config.stage_cache_enabled
+            else suppress_output_callback
+        ),
+    )
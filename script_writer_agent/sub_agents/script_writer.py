@@ -1,9 +1,15 @@
 from google.adk.agents import Agent, LoopAgent
-from google.adk.tools import google_search
 
-from ..config import config
-from ..agent_utils import suppress_output_callback
+from ..config import ChannelInfo, config
+from ..agent_utils import callback_chain, suppress_output_callback
 from ..channel_utils import get_channel_aware_instruction
+from ..context_cache import context_cache
+from ..models import model_for
+from ..research_index import state_query
+from ..search_cache import web_search
+from ..stage_cache import StageCache, stage_store
+from ..state_compaction import state_inputs_callback
+from .section_writer import create_section_parallel_writer
 
 SCRIPT_WRITER_INSTRUCTION = """
 You are a technical content writer for a youtube video.
@@ -22,22 +28,63 @@ Requirements:
 The script should be in markdown format.
 """
 
-script_writer = Agent(
-    model=config.main_model,
-    name="script_writer",
-    description="Agent to write a script for a youtube video.",
-    instruction=get_channel_aware_instruction(
-        SCRIPT_WRITER_INSTRUCTION, config.channel_info
-    ),
-    tools=[google_search],
-    output_key="script",
-    after_agent_callback=suppress_output_callback,
-)
-
-robust_script_writer = LoopAgent(
-    name="robust_script_writer",
-    description="A robust script writer that retries if it fails.",
-    sub_agents=[script_writer],
-    max_iterations=1,
-    after_agent_callback=suppress_output_callback,
-)
+SCRIPT_WRITER_STATE_INPUTS = ("script_outline", "script", "validation_result")
+
+
+def create_script_writer(channel_info: ChannelInfo) -> Agent:
+    return Agent(
+        model=model_for("script_writer"),
+        name="script_writer",
+        description="Agent to write a script for a youtube video.",
+        instruction=get_channel_aware_instruction(
+            SCRIPT_WRITER_INSTRUCTION, channel_info
+        ),
+        tools=[web_search],
+        output_key="script",
+        before_model_callback=callback_chain(
+            state_inputs_callback(
+                *SCRIPT_WRITER_STATE_INPUTS,
+                research_query=state_query("script_outline"),
+                research_top_k=config.research_outline_top_k,
+            ),
+            context_cache.before_model_callback if config.context_caching else None,
+        ),
+        after_agent_callback=suppress_output_callback,
+    )
+
+
+def create_robust_script_writer(channel_info: ChannelInfo) -> LoopAgent:
+    """Build the writing stage for a channel, with its stage cache"""
+    writer_stage_cache = StageCache(
+        "script",
+        stage_store,
+        channel_info,
+        # The writers retrieve research snippets
+        SCRIPT_WRITER_STATE_INPUTS + ("research_findings",),
+    )
+    return LoopAgent(
+        name="robust_script_writer",
+        description="A robust script writer that retries if it fails.",
+        sub_agents=[
+            (
+                create_section_parallel_writer(
+                    create_script_writer(channel_info),
+                    direct_sections=config.pipelined_directing,
+                    channel_info=channel_info,
+                )
+                if config.parallel_script_writing
+                else create_script_writer(channel_info)
+            )
+        ],
+        max_iterations=1,
+        before_agent_callback=(
+            writer_stage_cache.before_agent_callback
+            if config.stage_cache_enabled
+            else None
+        ),
+        after_agent_callback=(
+            [writer_stage_cache.after_agent_callback, suppress_output_callback]
+            if config.stage_cache_enabled
+            else suppress_output_callback
+        ),
+    )
@@ -0,0 +1,260 @@
+from typing import Any, AsyncGenerator, Dict, List, NamedTuple, Optional, Tuple
+
+from google.adk.agents import Agent, BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.events import Event, EventActions
+
+from ..config import ChannelInfo, config
+from ..agent_utils import branch_context, merge_agent_runs, suppress_output_callback
+from ..channel_utils import get_channel_aware_instruction
+from ..disk_cache import hash_key
+from ..markdown_utils import section_tree_text, split_sections
+from ..models import model_for
+from ..state_compaction import state_inputs_callback
+
+SECTION_DIRECTOR_INSTRUCTION = """
+You are a video director and visual storytelling expert.
+Several directors are working on the script at the same time, one section each. Your job is to integrate directorial guidance into one section of the script.
+
+## Video
+- Title: {title}
+
+## Your Section ({number} of {count})
+{section}
+
+## Neighbouring Sections
+- Previous section: {previous_heading}
+- Next section: {next_heading}
+
+Requirements:
+1. Keep all of the presenter's words, the structure and the flow of the section intact.
+2. Insert directorial notes in **[BRACKETS]** at the appropriate moments:
+    - camera work: [CLOSE-UP], [WIDE SHOT], [MEDIUM SHOT], [PAN LEFT/RIGHT], [ZOOM IN/OUT], [TRACKING SHOT]
+    - visual aids: [GRAPHICS: description], [B-ROLL: description], [TEXT OVERLAY: "text"], [ANIMATION: description], [SCREEN CAPTURE]
+    - production notes: [LIGHTING: ...], [BACKGROUND: ...], [PROPS: ...], [WARDROBE: ...]
+    - engagement: [HOOK: ...], [TRANSITION: ...], [PACING: slow/fast], [MUSIC: ...]
+3. Use a [TRANSITION] note to lead into the next section, unless this is the last one.
+4. Focus on practical suggestions, YouTube audience retention and mobile viewing.
+5. Return only your section, starting with its original heading.
+"""
+
+# State key of the directed sections, keyed by direction_key
+DIRECTED_SECTION_CACHE_KEY = "directed_section_cache"
+
+
+class DirectionUnit(NamedTuple):
+    """A top-level script section, with its sub-sections, to direct on its own"""
+
+    heading: str
+    text: str
+
+
+def direction_units(script: str) -> Tuple[str, str, List[DirectionUnit]]:
+    """Split a script into its title, the text before the sections and the sections.
+
+    Returns ``(title, frame, units)``. ``units`` is empty if the script has no
+    sections below its title.
+    """
+    sections = split_sections(script or "")
+    headed = [section for section in sections if section.level]
+    if not headed:
+        return "", script, []
+
+    title = ""
+    if headed[0].level == 1 and sum(s.level == 1 for s in headed) == 1:
+        title = headed[0].heading
+        body_start = sections.index(headed[0]) + 1
+    else:
+        body_start = sections.index(headed[0])
+
+    body = sections[body_start:]
+    if not body:
+        return title, script, []
+    unit_level = min(section.level for section in body)
+    first_unit = next(
+        i for i, section in enumerate(body) if section.level == unit_level
+    )
+    frame = "\n\n".join(section.text for section in sections[: body_start + first_unit])
+    units = [
+        DirectionUnit(section.heading, section_tree_text(sections, section))
+        for section in body
+        if section.level == unit_level
+    ]
+    return title, frame, units
+
+
+def direction_key(title: str, section: str) -> str:
+    """Hash a section the same way however its blank lines were formatted"""
+    lines = [line.rstrip() for line in section.strip().splitlines() if line.strip()]
+    return hash_key(title, "\n".join(lines))
+
+
+def direction_plan(
+    title: str, headings: List[str], index: int, section: str
+) -> Dict[str, Any]:
+    return {
+        "title": title,
+        "number": index + 1,
+        "count": len(headings),
+        "section": section,
+        "previous_heading": headings[index - 1] if index else "none",
+        "next_heading": headings[index + 1] if index + 1 < len(headings) else "none",
+    }
+
+
+def assemble_production_script(frame: str, sections: List[str]) -> str:
+    """Join the directed sections behind the title, in script order"""
+    parts = [frame.strip()] if frame.strip() else []
+    parts.extend(section.strip() for section in sections)
+    return "\n\n".join(parts) + "\n"
+
+
+def plan_state_key(director: BaseAgent) -> str:
+    return f"{director.name}_plan"
+
+
+def direction_instruction(plan_key: str, channel_info: ChannelInfo):
+    """Build the instruction provider for the section director reading ``plan_key``"""
+
+    def provider(context: ReadonlyContext) -> str:
+        return get_channel_aware_instruction(
+            SECTION_DIRECTOR_INSTRUCTION.format(**context.state[plan_key]),
+            channel_info,
+        )
+
+    # Stage cache keys hash the template, so editing it invalidates them
+    provider.instruction_template = SECTION_DIRECTOR_INSTRUCTION
+    return provider
+
+
+def create_section_directors(
+    prefix: str, count: int, channel_info: ChannelInfo
+) -> List[BaseAgent]:
+    """Build ``count`` section director agents named ``<prefix>_<index>``"""
+    directors = []
+    for index in range(count):
+        name = f"{prefix}_{index}"
+        directors.append(
+            Agent(
+                model=model_for(name, group="script_section_director"),
+                name=name,
+                description="Agent to integrate directorial guidance into one section of the script.",
+                instruction=direction_instruction(f"{name}_plan", channel_info),
+                output_key=f"{name}_output",
+                disallow_transfer_to_parent=True,
+                disallow_transfer_to_peers=True,
+                # The section is part of the instruction, so no state is sent
+                before_model_callback=state_inputs_callback(),
+                after_agent_callback=suppress_output_callback,
+            )
+        )
+    return directors
+
+
+async def run_section_director(
+    parent: BaseAgent,
+    director: BaseAgent,
+    context: InvocationContext,
+    plan: Dict[str, Any],
+) -> AsyncGenerator[Event, None]:
+    """Direct one section; the result is in the director's output key afterwards"""
+    yield Event(
+        invocation_id=context.invocation_id,
+        author=parent.name,
+        branch=context.branch,
+        actions=EventActions(
+            state_delta={plan_state_key(director): plan, director.output_key: None}
+        ),
+    )
+    async for event in director.run_async(branch_context(parent, director, context)):
+        yield event
+
+
+class SectionPipelinedDirector(BaseAgent):
+    """Directs the script one top-level section at a time.
+
+    Every call only sees its own section, the title and the neighbouring
+    headings, so the context stays bounded however long the script is.
+    Sections already directed while they were written, or in an earlier run,
+    are taken from ``directed_section_cache``. The directed sections are
+    assembled into ``production_script`` in script order. Scripts without
+    sections, and runs where a section comes back empty, are handed to
+    ``fallback_director``.
+    """
+
+    section_directors: List[BaseAgent]
+    fallback_director: BaseAgent
+
+    async def _run_async_impl(
+        self, context: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        state = context.session.state
+        title, frame, units = direction_units(state.get("script", ""))
+        if not units:
+            async for event in self.fallback_director.run_async(context):
+                yield event
+            return
+
+        cache: Dict[str, str] = state.get(DIRECTED_SECTION_CACHE_KEY) or {}
+        keys = [direction_key(title, unit.text) for unit in units]
+        headings = [unit.heading for unit in units]
+        pending = [index for index, key in enumerate(keys) if key not in cache]
+        directed: Dict[int, str] = {}
+
+        async def direct(
+            director: BaseAgent, indices: List[int]
+        ) -> AsyncGenerator[Event, None]:
+            # Each director works through its share of the sections in turn
+            for index in indices:
+                plan = direction_plan(title, headings, index, units[index].text)
+                async for event in run_section_director(self, director, context, plan):
+                    yield event
+                directed[index] = context.session.state.get(director.output_key)
+
+        workers = self.section_directors[: len(pending)]
+        async for event in merge_agent_runs(
+            [
+                direct(director, pending[offset :: len(workers)])
+                for offset, director in enumerate(workers)
+            ]
+        ):
+            yield event
+
+        sections = [cache.get(key) or directed.get(i) for i, key in enumerate(keys)]
+        if not all(sections):
+            async for event in self.fallback_director.run_async(context):
+                yield event
+            return
+
+        yield Event(
+            invocation_id=context.invocation_id,
+            author=self.name,
+            branch=context.branch,
+            actions=EventActions(
+                state_delta={
+                    "production_script": assemble_production_script(frame, sections),
+                    DIRECTED_SECTION_CACHE_KEY: dict(zip(keys, sections)),
+                }
+            ),
+        )
+
+
+def create_section_pipelined_director(
+    fallback_director: BaseAgent,
+    max_concurrency: Optional[int] = None,
+    channel_info: Optional[ChannelInfo] = None,
+) -> SectionPipelinedDirector:
+    """Build the section-by-section director with a bounded pool of directors"""
+    section_directors = create_section_directors(
+        "script_section_director",
+        max_concurrency or config.max_parallel_script_sections,
+        channel_info or config.channel_info,
+    )
+    return SectionPipelinedDirector(
+        name="section_pipelined_director",
+        description="Directs the script one section at a time with a bounded context.",
+        section_directors=section_directors,
+        fallback_director=fallback_director,
+        sub_agents=section_directors + [fallback_director],
+    )
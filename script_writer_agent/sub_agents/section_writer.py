@@ -0,0 +1,337 @@
+import asyncio
+from typing import Any, AsyncGenerator, Dict, List, Optional
+
+from google.adk.agents import Agent, BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.events import Event, EventActions
+
+from ..config import ChannelInfo, config
+from ..agent_utils import branch_context, merge_agent_runs, suppress_output_callback
+from ..channel_utils import get_channel_aware_instruction
+from ..disk_cache import hash_key
+from ..markdown_utils import (
+    MarkdownSection,
+    find_section,
+    section_tree_text,
+    split_sections,
+)
+from ..models import model_for
+from ..research_index import section_plan_query
+from ..search_cache import web_search
+from ..state_compaction import state_inputs_callback
+from .section_director import (
+    DIRECTED_SECTION_CACHE_KEY,
+    create_section_directors,
+    direction_key,
+    direction_plan,
+    direction_units,
+    run_section_director,
+)
+from .validation_checkers import ROADMAP_MAX_POINTS, find_title, roadmap_sections
+
+# Roadmap points plus the solution and weaknesses sections that may follow them
+MAX_SCRIPT_SECTIONS = ROADMAP_MAX_POINTS + 3
+
+SECTION_WRITER_INSTRUCTION = """
+You are a technical content writer for a youtube video.
+Several writers are working on the script at the same time, one section each. Your job is to write one section of the script.
+
+## Video
+- Title: {title}
+- Main message: {main_message}
+
+## Your Section ({number} of {count}): {heading}
+{outline}
+
+## Neighbouring Sections
+- Previous section: {previous_heading}
+- Next section: {next_heading}
+
+Requirements:
+1. Focus on developing your section of the outline only; the neighbouring sections are written by others.
+2. Start with the markdown heading "## {heading}".
+3. {position_note}
+4. Focus on what should be said by the presenter. If necessary, place placeholders for visual aids.
+5. The text should be concise and to the point.
+6. The text should not sound like ai generated code, analogies, jokes, rythorical questions, etc. are welcome.
+
+The section should be in markdown format.
+"""
+
+_POSITION_NOTES = {
+    "only": "This is the whole video: open with the hook from the main message and end with the call to action.",
+    "first": "This is the opening section: open with the hook from the main message.",
+    "middle": "Lead in from the previous section and hand over to the next one.",
+    "last": "This is the closing section: wrap up the video and end with the call to action.",
+}
+
+
+# Outline sections that frame the video rather than becoming script sections
+_FRAME_HEADINGS = ("title", "main message")
+
+
+def _main_message(outline: str, sections: List[MarkdownSection]) -> str:
+    section = find_section(sections, "main message")
+    if section is not None:
+        return section.body.strip()
+    for line in outline.splitlines():
+        if "main message" in line.lower() and ":" in line:
+            return line.split(":", 1)[1].replace("**", "").strip()
+    return ""
+
+
+def _trailing_sections(
+    sections: List[MarkdownSection], points: List[MarkdownSection]
+) -> List[MarkdownSection]:
+    """Return the outline sections that follow the roadmap, e.g. solutions"""
+    anchor = next((s for s in sections if s is points[-1]), None)
+    if anchor is None:
+        anchor = find_section(sections, "roadmap", "key points")
+    if anchor is None:
+        return []
+
+    index = next(i for i, section in enumerate(sections) if section is anchor)
+    index += 1
+    while index < len(sections) and sections[index].level > anchor.level:
+        index += 1
+
+    candidates = [
+        section
+        for section in sections[index:]
+        if section.level
+        and not any(word in section.heading.lower() for word in _FRAME_HEADINGS)
+    ]
+    if not candidates:
+        return []
+    unit_level = min(section.level for section in candidates)
+    return [section for section in candidates if section.level == unit_level]
+
+
+def plan_script_sections(outline: str) -> List[Dict[str, Any]]:
+    """Split an outline into independently writable script sections.
+
+    Returns an empty list if the outline has no recognizable roadmap.
+    """
+    sections = split_sections(outline or "")
+    points = roadmap_sections(sections)
+    if not points:
+        return []
+
+    units = points + _trailing_sections(sections, points)
+    title = find_title(outline, sections) or ""
+    main_message = _main_message(outline, sections)
+    headings = [unit.heading for unit in units]
+
+    plans = []
+    for index, unit in enumerate(units):
+        if len(units) == 1:
+            position = "only"
+        elif index == 0:
+            position = "first"
+        elif index == len(units) - 1:
+            position = "last"
+        else:
+            position = "middle"
+        plans.append(
+            {
+                "title": title,
+                "main_message": main_message,
+                "number": index + 1,
+                "count": len(units),
+                "heading": unit.heading,
+                "outline": section_tree_text(sections, unit),
+                "previous_heading": headings[index - 1] if index else "none",
+                "next_heading": (
+                    headings[index + 1] if index + 1 < len(units) else "none"
+                ),
+                "position_note": _POSITION_NOTES[position],
+            }
+        )
+    return plans
+
+
+def stitch_script(title: str, sections: List[str]) -> str:
+    """Join the written sections into a single script"""
+    parts = [f"# {title}"] if title else []
+    parts.extend(section.strip() for section in sections)
+    return "\n\n".join(parts) + "\n"
+
+
+def section_instruction(index: int, channel_info: ChannelInfo):
+    """Build the instruction provider for the section writer at ``index``"""
+
+    def provider(context: ReadonlyContext) -> str:
+        plan = context.state["script_section_plans"][index]
+        return get_channel_aware_instruction(
+            SECTION_WRITER_INSTRUCTION.format(**plan), channel_info
+        )
+
+    # Stage cache keys hash the template, so editing it invalidates them
+    provider.instruction_template = SECTION_WRITER_INSTRUCTION
+    return provider
+
+
+class SectionParallelScriptWriter(BaseAgent):
+    """Writes the roadmap sections of the script concurrently.
+
+    Each section writer gets the title, the main message and the neighbouring
+    headings as shared context. The sections are stitched into the ``script``
+    state key. Sections whose outline slice and neighbours did not change since
+    the last run are reused instead of regenerated. Outlines without a
+    recognizable roadmap are handed to ``fallback_writer``.
+
+    With ``section_directors``, every section is directed as soon as it is
+    written, so directing overlaps with writing the other sections. The
+    results are left in ``directed_section_cache`` for the director stage.
+    """
+
+    section_writers: List[BaseAgent]
+    fallback_writer: BaseAgent
+    section_directors: List[BaseAgent] = []
+    max_concurrency: int = 3
+
+    async def _run_async_impl(
+        self, context: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        plans = plan_script_sections(context.session.state.get("script_outline", ""))
+        if not plans or len(plans) > len(self.section_writers):
+            async for event in self.fallback_writer.run_async(context):
+                yield event
+            return
+
+        # Sections whose outline slice and neighbours are unchanged are reused
+        cache: Dict[str, str] = context.session.state.get("script_section_cache") or {}
+        plan_keys = [hash_key(plan) for plan in plans]
+        writers = [
+            writer
+            for writer, plan_key in zip(self.section_writers, plan_keys)
+            if plan_key not in cache
+        ]
+        state_delta: Dict[str, Any] = {writer.output_key: None for writer in writers}
+        state_delta["script_section_plans"] = plans
+        yield Event(
+            invocation_id=context.invocation_id,
+            author=self.name,
+            branch=context.branch,
+            actions=EventActions(state_delta=state_delta),
+        )
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        directed: Dict[str, str] = {}
+        async for event in merge_agent_runs(
+            [
+                self._bounded_run(writer, context, semaphore, plans, directed)
+                for writer in writers
+            ]
+        ):
+            yield event
+
+        sections = [
+            cache.get(plan_key) or context.session.state.get(writer.output_key)
+            for writer, plan_key in zip(self.section_writers, plan_keys)
+        ]
+        if not all(sections):
+            async for event in self.fallback_writer.run_async(context):
+                yield event
+            return
+
+        script = stitch_script(plans[0]["title"], sections)
+        state_delta = {
+            "script": script,
+            "script_section_cache": dict(zip(plan_keys, sections)),
+        }
+        if self.section_directors:
+            # Keep the directed sections of this script, old and new
+            title, _, units = direction_units(script)
+            directed_cache = {
+                **(context.session.state.get(DIRECTED_SECTION_CACHE_KEY) or {}),
+                **directed,
+            }
+            keys = [direction_key(title, unit.text) for unit in units]
+            state_delta[DIRECTED_SECTION_CACHE_KEY] = {
+                key: directed_cache[key] for key in keys if key in directed_cache
+            }
+        yield Event(
+            invocation_id=context.invocation_id,
+            author=self.name,
+            branch=context.branch,
+            actions=EventActions(state_delta=state_delta),
+        )
+
+    async def _bounded_run(
+        self,
+        writer: BaseAgent,
+        context: InvocationContext,
+        semaphore: asyncio.Semaphore,
+        plans: List[Dict[str, Any]],
+        directed: Dict[str, str],
+    ) -> AsyncGenerator[Event, None]:
+        async with semaphore:
+            async for event in writer.run_async(branch_context(self, writer, context)):
+                yield event
+
+        section = context.session.state.get(writer.output_key)
+        if not self.section_directors or not section:
+            return
+        index = self.section_writers.index(writer)
+        director = self.section_directors[index]
+        title = plans[0]["title"]
+        headings = [plan["heading"] for plan in plans]
+        plan = direction_plan(title, headings, index, section)
+        # Directing waits for a free slot again, so queued writers go first
+        async with semaphore:
+            async for event in run_section_director(self, director, context, plan):
+                yield event
+        output = context.session.state.get(director.output_key)
+        if output:
+            directed[direction_key(title, section)] = output
+
+
+def create_section_parallel_writer(
+    fallback_writer: BaseAgent,
+    max_concurrency: Optional[int] = None,
+    direct_sections: bool = False,
+    channel_info: Optional[ChannelInfo] = None,
+) -> SectionParallelScriptWriter:
+    """Build the section-parallel writer with one writer agent per section slot.
+
+    With ``direct_sections`` every slot also gets a section director.
+    """
+    channel_info = channel_info or config.channel_info
+    section_writers = [
+        Agent(
+            model=model_for(
+                f"script_section_writer_{index}", group="script_section_writer"
+            ),
+            name=f"script_section_writer_{index}",
+            description="Agent to write one section of a youtube video script.",
+            instruction=section_instruction(index, channel_info),
+            tools=[web_search],
+            output_key=f"script_section_{index}",
+            disallow_transfer_to_parent=True,
+            disallow_transfer_to_peers=True,
+            # The section plan is part of the instruction; only research is sent
+            before_model_callback=state_inputs_callback(
+                research_query=section_plan_query(index)
+            ),
+            after_agent_callback=suppress_output_callback,
+        )
+        for index in range(MAX_SCRIPT_SECTIONS)
+    ]
+    section_directors = (
+        create_section_directors(
+            "written_section_director", MAX_SCRIPT_SECTIONS, channel_info
+        )
+        if direct_sections
+        else []
+    )
+    return SectionParallelScriptWriter(
+        name="section_parallel_script_writer",
+        description="Writes the script sections concurrently from the outline roadmap.",
+        section_writers=section_writers,
+        fallback_writer=fallback_writer,
+        section_directors=section_directors,
+        max_concurrency=max_concurrency or config.max_parallel_script_sections,
+        sub_agents=section_writers + section_directors + [fallback_writer],
+    )
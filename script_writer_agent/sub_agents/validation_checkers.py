@@ -1,10 +1,33 @@
-from typing import AsyncGenerator
+import re
+from typing import AsyncGenerator, List, NamedTuple, Optional
 
 from google.adk.agents import BaseAgent
 from google.adk.agents.invocation_context import InvocationContext
 from google.adk.events import Event, EventActions
+from google.adk.sessions import Session
 from google.genai.types import Content
 
+from ..markdown_utils import MarkdownSection, find_section, split_sections, subsections
+from ..schemas import REQUIRES_CHANGES, VALIDATION_DATA_KEY, ValidationResult
+
+ARTIFACT_KEYS = ("script_outline", "script", "production_script")
+
+ROADMAP_MIN_POINTS = 3
+ROADMAP_MAX_POINTS = 5
+
+SOLUTION_STEPS = {
+    "quick win": "Step 1: Quick win",
+    "systematic": "Step 2: Systematic solution",
+    "overkill": "Step 3: Overkill solution with extra contingency",
+}
+
+_TITLE_LINE_PATTERN = re.compile(
+    r"^[\s>*#\-]*\**title\**\s*:\**\s*(.+)$", re.IGNORECASE | re.MULTILINE
+)
+_NUMBERED_POINT_PATTERN = re.compile(r"^(key point|point)\s*\d|^\d+[.)]", re.IGNORECASE)
+_LIST_ITEM_PATTERN = re.compile(r"^(?:[-*+]|\d+[.)])\s+(\S.*)$")
+_DIRECTION_NOTE_PATTERN = re.compile(r"\[[A-Z][A-Z /\-]+[:\]]")
+
 
 class OutlineValidationChecker(BaseAgent):
     """Checks if the script outline is valid."""
@@ -27,3 +50,252 @@ class OutlineValidationChecker(BaseAgent):
             )
         # If outline exists, validation passed - don't yield anything
         # This tells the LoopAgent that the task is complete and it should stop retrying
+
+
+class RuleViolation(NamedTuple):
+    """A mechanical guideline violation and how to fix it"""
+
+    issue: str
+    required_change: str
+
+
+def find_title(markdown: str, sections: List[MarkdownSection]) -> Optional[str]:
+    """Return the video title from a "Title:" line, a Title heading or the H1"""
+    match = _TITLE_LINE_PATTERN.search(markdown)
+    if match:
+        return match.group(1).replace("**", "").strip().strip("\"'")
+
+    title_section = find_section(sections, "title")
+    if title_section:
+        for line in title_section.body.splitlines():
+            if line.strip():
+                return line.strip(" -*\"'")
+
+    for section in sections:
+        if section.level == 1:
+            return section.heading
+    return None
+
+
+def check_title(title: Optional[str]) -> List[RuleViolation]:
+    if not title:
+        return [
+            RuleViolation(
+                "Title Guidelines: no title found.",
+                'Add a "Title:" line following one of the approved title formats.',
+            )
+        ]
+
+    lowered = title.lower()
+    worst_format = "what is the worst" in lowered and "how to" in lowered
+    how_to_format = lowered.startswith("how to")
+    if (worst_format or how_to_format) and title.rstrip().endswith("?"):
+        return []
+    return [
+        RuleViolation(
+            f'Title Guidelines: "{title}" does not follow an approved format.',
+            'Rewrite the title as "What is the worst <scenario/error/choice> for the <target audience>? '
+            'And how to avoid it using <solution/tool/strategy>?" or "How to <task/skill> using <solution/tool/strategy>?"',
+        )
+    ]
+
+
+def roadmap_sections(
+    sections: List[MarkdownSection],
+) -> Optional[List[MarkdownSection]]:
+    """Return the roadmap key points as sections, or None if there is no roadmap"""
+    roadmap = find_section(sections, "roadmap", "key points")
+    if roadmap is not None:
+        children = subsections(sections, roadmap)
+        if children:
+            return children
+        return [
+            MarkdownSection(
+                level=roadmap.level + 1,
+                heading=_LIST_ITEM_PATTERN.match(line).group(1).strip(),
+                body="",
+            )
+            for line in roadmap.body.splitlines()
+            if _LIST_ITEM_PATTERN.match(line)
+        ]
+
+    numbered = [
+        section
+        for section in sections
+        if section.level
+        and _NUMBERED_POINT_PATTERN.match(section.heading)
+        and not any(step in section.heading.lower() for step in SOLUTION_STEPS)
+    ]
+    return numbered or None
+
+
+def roadmap_points(sections: List[MarkdownSection]) -> Optional[List[str]]:
+    """Return the roadmap key point headings, or None if there is no roadmap"""
+    points = roadmap_sections(sections)
+    if points is None:
+        return None
+    return [point.heading for point in points]
+
+
+def check_roadmap(sections: List[MarkdownSection]) -> List[RuleViolation]:
+    points = roadmap_points(sections)
+    if points is None:
+        return [
+            RuleViolation(
+                "Roadmap Guidelines: no roadmap section found.",
+                f"Add a roadmap with {ROADMAP_MIN_POINTS}-{ROADMAP_MAX_POINTS} key points, each as a sub-heading.",
+            )
+        ]
+    if not ROADMAP_MIN_POINTS <= len(points) <= ROADMAP_MAX_POINTS:
+        return [
+            RuleViolation(
+                f"Roadmap Guidelines: the roadmap has {len(points)} key points.",
+                f"Cover the main message in {ROADMAP_MIN_POINTS}-{ROADMAP_MAX_POINTS} key points.",
+            )
+        ]
+    return []
+
+
+def check_solution_steps(markdown: str) -> List[RuleViolation]:
+    lowered = markdown.lower()
+    missing = [
+        step for keyword, step in SOLUTION_STEPS.items() if keyword not in lowered
+    ]
+    if not missing:
+        return []
+    return [
+        RuleViolation(
+            f"Roadmap Guidelines: missing solution steps: {', '.join(missing)}.",
+            "Present the solution as quick win → systematic solution → overkill solution with extra contingency.",
+        )
+    ]
+
+
+def check_weaknesses(markdown: str) -> List[RuleViolation]:
+    lowered = markdown.lower()
+    if any(word in lowered for word in ("weakness", "constraint", "limitation")):
+        return []
+    return [
+        RuleViolation(
+            "Roadmap Guidelines: no weaknesses and constraints section.",
+            "Add a section on what to do when the solution is not practical and where it does not apply.",
+        )
+    ]
+
+
+def check_markdown_structure(
+    sections: List[MarkdownSection], min_headings: int
+) -> List[RuleViolation]:
+    headings = [section for section in sections if section.level]
+    if len(headings) >= min_headings:
+        return []
+    return [
+        RuleViolation(
+            f"Content Structure Guidelines: found {len(headings)} markdown headings, expected at least {min_headings}.",
+            "Structure the document in markdown with a heading for every section.",
+        )
+    ]
+
+
+def validate_outline(markdown: str) -> List[RuleViolation]:
+    """Run the mechanical outline checks"""
+    sections = split_sections(markdown)
+    return (
+        check_markdown_structure(sections, min_headings=1)
+        + check_title(find_title(markdown, sections))
+        + check_roadmap(sections)
+        + check_solution_steps(markdown)
+        + check_weaknesses(markdown)
+    )
+
+
+def validate_script(markdown: str, production: bool = False) -> List[RuleViolation]:
+    """Run the mechanical script checks, including directorial notes if ``production``.
+
+    The solution step labels and the weaknesses section are outline rules;
+    the writer turns them into prose, so the LLM editor judges them here.
+    """
+    sections = split_sections(markdown)
+    violations = check_markdown_structure(sections, min_headings=ROADMAP_MIN_POINTS)
+    if production and not _DIRECTION_NOTE_PATTERN.search(markdown):
+        violations.append(
+            RuleViolation(
+                "Production script: no bracketed directorial notes found.",
+                "Embed camera, visual aid and engagement directions in [BRACKETS] throughout the script.",
+            )
+        )
+    return violations
+
+
+def validate_artifact(artifact_key: str, markdown: str) -> List[RuleViolation]:
+    if not markdown or not markdown.strip():
+        return [
+            RuleViolation(
+                f"The {artifact_key} is empty.",
+                f"Generate the {artifact_key} before requesting validation.",
+            )
+        ]
+    if artifact_key == "script_outline":
+        return validate_outline(markdown)
+    return validate_script(markdown, production=artifact_key == "production_script")
+
+
+def validation_feedback(violations: List[RuleViolation]) -> ValidationResult:
+    """Report violations in the script_editor "REQUIRES CHANGES" format"""
+    return ValidationResult(
+        status=REQUIRES_CHANGES,
+        issues=[violation.issue for violation in violations],
+        required_changes=[violation.required_change for violation in violations],
+        recommendations=[
+            "Fix these structural issues first; the full editorial review runs once they are resolved."
+        ],
+    )
+
+
+def artifact_under_review(session: Session) -> Optional[str]:
+    """Return the state key of the most recently generated artifact.
+
+    Returns None if the user has spoken since that artifact was generated,
+    because the draft under review may then be an edit that only exists in
+    the conversation.
+    """
+    for event in reversed(session.events):
+        if event.author == "user" and event.content and event.content.parts:
+            if any(part.text for part in event.content.parts):
+                return None
+        for key in reversed(ARTIFACT_KEYS):
+            if key in event.actions.state_delta:
+                return key
+    return None
+
+
+class RuleBasedPreValidator(BaseAgent):
+    """Rejects drafts that fail mechanical checks before the LLM editor runs."""
+
+    async def _run_async_impl(
+        self, context: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        artifact_key = artifact_under_review(context.session)
+        if artifact_key is None:
+            return
+
+        violations = validate_artifact(
+            artifact_key, context.session.state.get(artifact_key, "")
+        )
+        if not violations:
+            # Mechanical checks passed - let the LLM editor do the full review
+            return
+
+        result = validation_feedback(violations)
+        feedback = result.to_markdown()
+        yield Event(
+            author=self.name,
+            actions=EventActions(
+                escalate=True,
+                state_delta={
+                    "validation_result": feedback,
+                    VALIDATION_DATA_KEY: result.model_dump(),
+                },
+            ),
+            content=Content(parts=[{"text": feedback}]),
+        )
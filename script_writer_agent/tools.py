@@ -0,0 +1,46 @@
+from google.adk.tools import ToolContext
+
+from .sub_agents.validation_checkers import ARTIFACT_KEYS
+
+
+def save_edited_artifact(
+    artifact_key: str, content: str, tool_context: ToolContext
+) -> dict:
+    """Saves a directly edited outline, script or production script to the session.
+
+    Use this after editing a document yourself, so the editor validates the
+    edited version.
+
+    Args:
+        artifact_key: One of "script_outline", "script" or "production_script".
+        content: The complete edited markdown document.
+
+    Returns:
+        The status of the save.
+    """
+    if artifact_key not in ARTIFACT_KEYS:
+        return {
+            "status": "error",
+            "message": f"Unknown artifact_key '{artifact_key}', expected one of {', '.join(ARTIFACT_KEYS)}.",
+        }
+    tool_context.state[artifact_key] = content
+    return {"status": "saved", "artifact_key": artifact_key}
+
+
+def set_research_topic(topic: str, tool_context: ToolContext) -> dict:
+    """Saves the topic of the video to the session.
+
+    Call this before the first research or planning step, and again whenever
+    the user changes the topic of the video.
+
+    Args:
+        topic: The topic of the video in a short, specific sentence.
+
+    Returns:
+        The status of the save.
+    """
+    topic = topic.strip()
+    if not topic:
+        return {"status": "error", "message": "The topic must not be empty."}
+    tool_context.state["research_topic"] = topic
+    return {"status": "saved", "research_topic": topic}
@@ -0,0 +1,99 @@
+import asyncio
+import gc
+import threading
+from types import SimpleNamespace
+
+from google.adk.agents import LlmAgent
+
+from script_writer_agent.agent_factory import ChannelSwitcher
+from script_writer_agent.channel_profiles import (
+    ChannelProfileStore,
+    ChannelProfileWatcher,
+)
+from script_writer_agent.config import ChannelInfo
+
+
+class Invocation:
+    """Stands in for an InvocationContext, which the switcher tracks weakly"""
+
+    def __init__(self):
+        self.invocation_id = f"e-{id(self)}"
+
+
+def build(channel_info: ChannelInfo) -> LlmAgent:
+    return LlmAgent(
+        name="root",
+        model="gemini-2.5-flash",
+        instruction=f"Write for {channel_info.channel_name}",
+    )
+
+
+def context(invocation: Invocation) -> SimpleNamespace:
+    return SimpleNamespace(
+        invocation_id=invocation.invocation_id, _invocation_context=invocation
+    )
+
+
+def start(switcher: ChannelSwitcher, invocation: Invocation) -> None:
+    switcher.before_invocation(context(invocation))
+
+
+def finish(switcher: ChannelSwitcher, invocation: Invocation) -> None:
+    switcher.after_invocation(context(invocation))
+
+
+def test_switch_waits_for_running_invocations():
+    root = build(ChannelInfo(channel_name="Old"))
+    switcher = ChannelSwitcher(root, build=build)
+    running = Invocation()
+    start(switcher, running)
+
+    switcher.request(ChannelInfo(channel_name="New"))
+    start(switcher, Invocation())
+    assert root.instruction == "Write for Old"
+    assert switcher.pending
+
+    finish(switcher, running)
+    gc.collect()
+    start(switcher, Invocation())
+    assert root.instruction == "Write for New"
+    assert not switcher.pending
+
+
+def test_failed_invocation_stops_blocking_once_gone():
+    root = build(ChannelInfo(channel_name="Old"))
+    switcher = ChannelSwitcher(root, build=build)
+    crashed = Invocation()
+    start(switcher, crashed)
+    switcher.request(ChannelInfo(channel_name="New"))
+
+    # Its after-agent callbacks never ran
+    del crashed
+    gc.collect()
+    start(switcher, Invocation())
+    assert root.instruction == "Write for New"
+
+
+def test_watcher_applies_changes_on_the_loop(tmp_path):
+    store = ChannelProfileStore(str(tmp_path), max_versions=5)
+    store.save("main", ChannelInfo(channel_name="Old"))
+
+    async def main():
+        applied = []
+        watcher = ChannelProfileWatcher(
+            store,
+            "main",
+            lambda profile: applied.append(
+                (profile.channel_info.channel_name, threading.current_thread())
+            ),
+            loop=asyncio.get_running_loop(),
+        )
+        store.save("main", ChannelInfo(channel_name="New"))
+        polling = threading.Thread(target=watcher.check)
+        polling.start()
+        polling.join()
+        assert applied == []
+        await asyncio.sleep(0)
+        return applied
+
+    assert asyncio.run(main()) == [("New", threading.current_thread())]
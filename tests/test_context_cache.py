@@ -0,0 +1,113 @@
+import asyncio
+
+from google.adk.models import LlmRequest
+from google.genai import types
+
+from script_writer_agent import context_cache as context_cache_module
+from script_writer_agent.context_cache import ContextCache, LocalContextCacheBackend
+
+MODEL = "gemini-2.5-flash"
+INSTRUCTION = "You are a script writer. " * 400
+
+
+class FailingBackend(LocalContextCacheBackend):
+    """Fails the first ``failures`` creates, like an unavailable provider"""
+
+    def __init__(self, failures: int):
+        super().__init__()
+        self.failures = failures
+
+    async def create(self, model, system_instruction, tools, ttl_seconds):
+        if self.failures:
+            self.failures -= 1
+            raise RuntimeError("caching unavailable")
+        return await super().create(model, system_instruction, tools, ttl_seconds)
+
+
+def make_request(instruction: str = INSTRUCTION) -> LlmRequest:
+    return LlmRequest(
+        model=MODEL,
+        config=types.GenerateContentConfig(system_instruction=instruction),
+    )
+
+
+def test_repeated_prefix_reuses_one_cached_content():
+    backend = LocalContextCacheBackend()
+    cache = ContextCache(backend, min_tokens=10)
+
+    first = asyncio.run(cache.handle_for(MODEL, INSTRUCTION, None))
+    second = asyncio.run(cache.handle_for(MODEL, INSTRUCTION, None))
+
+    assert first == second
+    assert backend.creates == 1
+    assert cache.stats()["hits"] == 1
+    assert backend.resolve(first)[1] == INSTRUCTION
+
+
+def test_concurrent_calls_create_the_cache_once():
+    backend = LocalContextCacheBackend()
+    cache = ContextCache(backend, min_tokens=10)
+
+    async def call_concurrently():
+        return await asyncio.gather(
+            *(cache.handle_for(MODEL, INSTRUCTION, None) for _ in range(5))
+        )
+
+    handles = asyncio.run(call_concurrently())
+
+    assert len(set(handles)) == 1
+    assert backend.creates == 1
+
+
+def test_request_references_the_cache_and_can_be_restored():
+    cache = ContextCache(LocalContextCacheBackend(), min_tokens=10)
+    request = make_request()
+
+    asyncio.run(cache.before_model_callback(None, request))
+
+    assert request.config.cached_content
+    assert request.config.system_instruction is None
+    assert cache.restore_prefix(request)
+    assert request.config.system_instruction == INSTRUCTION
+    assert request.config.cached_content is None
+
+
+def test_short_instruction_is_sent_as_usual():
+    backend = LocalContextCacheBackend()
+    cache = ContextCache(backend, min_tokens=10)
+    request = make_request("Be brief.")
+
+    asyncio.run(cache.before_model_callback(None, request))
+
+    assert request.config.cached_content is None
+    assert request.config.system_instruction == "Be brief."
+    assert backend.creates == 0
+    assert cache.stats()["skipped"] == 1
+
+
+def test_failed_create_is_retried_after_a_short_delay(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(context_cache_module.time, "time", lambda: now[0])
+    backend = FailingBackend(failures=1)
+    cache = ContextCache(backend, ttl_seconds=60 * 60, min_tokens=10)
+
+    assert asyncio.run(cache.handle_for(MODEL, INSTRUCTION, None)) is None
+    # Within the retry delay the failure is remembered
+    assert asyncio.run(cache.handle_for(MODEL, INSTRUCTION, None)) is None
+
+    now[0] += context_cache_module.FAILED_CREATE_RETRY_SECONDS
+    assert asyncio.run(cache.handle_for(MODEL, INSTRUCTION, None)) is not None
+    assert cache.stats()["failures"] == 1
+    assert backend.creates == 1
+
+
+def test_local_cached_content_expires_after_its_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(context_cache_module.time, "time", lambda: now[0])
+    backend = LocalContextCacheBackend()
+    handle = asyncio.run(backend.create(MODEL, INSTRUCTION, None, ttl_seconds=60))
+
+    now[0] += 59
+    assert backend.resolve(handle) is not None
+    now[0] += 1
+    assert backend.resolve(handle) is None
@@ -0,0 +1,94 @@
+import asyncio
+from typing import Any, AsyncGenerator, List
+
+from google.adk.agents import LlmAgent
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from script_writer_agent.incremental_validation import (
+    IncrementalValidation,
+    build_review_request,
+    section_hashes,
+)
+
+SCOPE = "Validate the script outline against the guidelines."
+
+OUTLINE = """# Outline
+
+## Hook
+Why registries matter.
+
+## Solution
+Quick win first.
+"""
+
+
+class SearchingEditorLlm(BaseLlm):
+    """Searches once, then answers; records the contents of every request"""
+
+    model: str = "editor-stub"
+    requests: List[List[types.Content]] = []
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        self.requests.append(list(llm_request.contents))
+        if len(self.requests) == 1:
+            part = types.Part(
+                function_call=types.FunctionCall(
+                    name="lookup", args={"query": "youtube guidelines"}
+                )
+            )
+        else:
+            part = types.Part(text="**COMPLIANCE STATUS: APPROVED**")
+        yield LlmResponse(content=types.Content(role="model", parts=[part]))
+
+
+def lookup(query: str) -> dict:
+    """Looks up a query."""
+    return {"summary": f"results for {query}"}
+
+
+def test_editor_sees_its_tool_results():
+    llm = SearchingEditorLlm(requests=[])
+    editor = LlmAgent(
+        name="script_editor",
+        model=llm,
+        tools=[lookup],
+        before_model_callback=IncrementalValidation().before_model_callback,
+    )
+
+    async def main():
+        sessions = InMemorySessionService()
+        await sessions.create_session(
+            app_name="test",
+            user_id="user",
+            session_id="session",
+            state={"validation_scope": SCOPE},
+        )
+        runner = Runner(agent=editor, app_name="test", session_service=sessions)
+        async for _ in runner.run_async(
+            user_id="user",
+            session_id="session",
+            new_message=types.Content(role="user", parts=[types.Part(text="go")]),
+        ):
+            pass
+
+    asyncio.run(main())
+    first, second = llm.requests
+    assert [content.parts[0].text for content in first] == [SCOPE]
+    assert second[0].parts[0].text == SCOPE
+    assert second[1].parts[0].function_call.name == "lookup"
+    response = second[2].parts[0].function_response
+    assert response.response == {"summary": "results for youtube guidelines"}
+
+
+def test_review_request_only_repeats_changed_sections():
+    approved = section_hashes(OUTLINE)
+    changed = OUTLINE.replace("Quick win first.", "Overkill first.")
+    request = build_review_request("script_outline", changed, approved)
+    assert "- Hook (approved, unchanged)" in request
+    assert "- Solution (changed)" in request
+    assert "Why registries matter." not in request
@@ -0,0 +1,171 @@
+import argparse
+import asyncio
+
+import pytest
+
+from benchmarks.pipeline import install_stub_models
+from script_writer_agent import channel_profiles
+from script_writer_agent.agent import create_root_agent
+from script_writer_agent.agent_factory import AgentTreeCache, ChannelPipelines
+from script_writer_agent.config import ChannelInfo, config
+from script_writer_agent.jobs import (
+    CANCELLED,
+    DONE,
+    FAILED,
+    JobQueueFullError,
+    JobService,
+)
+from script_writer_agent.pipeline import ScriptPipeline
+
+STUB_ARGS = argparse.Namespace(
+    topic="MLflow model registry",
+    latency=0.0,
+    search_latency=0.0,
+    searches=0,
+    search_cache=False,
+    output_chars=200,
+    chars_per_second=1e9,
+)
+
+
+@pytest.fixture(autouse=True)
+def no_shared_caches(monkeypatch):
+    # Jobs would otherwise be served from earlier runs' outputs on disk
+    monkeypatch.setattr(config, "research_cache_enabled", False)
+    monkeypatch.setattr(config, "stage_cache_enabled", False)
+
+
+def stub_tree(channel_info: ChannelInfo):
+    root_agent = create_root_agent(channel_info)
+    install_stub_models(root_agent, STUB_ARGS)
+    return root_agent
+
+
+def make_service(**options) -> JobService:
+    return JobService(ScriptPipeline(stub_tree(config.channel_info)), **options)
+
+
+def test_jobs_run_every_stage():
+    async def main():
+        service = make_service(workers=2, queue_size=2).start()
+        jobs = [await service.submit(f"Topic {index}") for index in range(4)]
+        for job in jobs:
+            await service.wait(job.id, timeout=60)
+        results = [await service.result(job.id) for job in jobs]
+        stats = service.stats()
+        await service.close()
+        return jobs, results, stats
+
+    jobs, results, stats = asyncio.run(main())
+    assert [job.status for job in jobs] == [DONE] * 4
+    assert jobs[0].completed_stages == [
+        "research",
+        "plan",
+        "validate",
+        "write",
+        "direct",
+    ]
+    assert all(all(result.values()) for result in results)
+    assert stats["done"] == 4 and stats["in_flight"] == 0
+
+
+def test_cancel_queued_and_running_jobs():
+    async def main():
+        service = make_service(workers=1, queue_size=2).start()
+        running = await service.submit("Running")
+        queued = await service.submit("Queued")
+        while not running.completed_stages:
+            await asyncio.sleep(0.001)
+        service.cancel(queued.id)
+        service.cancel(running.id)
+        await service.wait(running.id, timeout=60)
+        await service.wait(queued.id, timeout=60)
+        await service.close()
+        return running, queued
+
+    running, queued = asyncio.run(main())
+    assert running.status == CANCELLED and running.completed_stages
+    assert queued.status == CANCELLED and not queued.completed_stages
+
+
+def test_concurrent_submits_of_one_id():
+    async def main():
+        service = make_service(workers=1, queue_size=1)
+        await service.submit("Fills the queue")
+        first = asyncio.ensure_future(service.submit("First", "same-id"))
+        await asyncio.sleep(0)
+        with pytest.raises(ValueError):
+            await service.submit("Second", "same-id")
+        service.start()
+        job = await first
+        await service.wait(job.id, timeout=60)
+        await service.close()
+        return job
+
+    job = asyncio.run(main())
+    assert job.topic == "First" and job.status == DONE
+
+
+def test_rejected_submit_frees_its_id():
+    async def main():
+        service = make_service(workers=1, queue_size=1)
+        await service.submit("Fills the queue")
+        with pytest.raises(JobQueueFullError):
+            await service.submit("Rejected", "retry-me", wait=False)
+        service.start()
+        job = await service.submit("Retried", "retry-me")
+        await service.wait(job.id, timeout=60)
+        await service.close()
+        return job, service.stats()
+
+    job, stats = asyncio.run(main())
+    assert job.status == DONE
+    assert stats["rejected"] == 1 and stats["submitted"] == 2
+
+
+def test_jobs_run_for_their_channel_profile(tmp_path, monkeypatch):
+    monkeypatch.setattr(channel_profiles.profile_store, "directory", str(tmp_path))
+    channel_profiles.profile_store.save("cooking", ChannelInfo(channel_name="Cook TV"))
+
+    async def main():
+        trees = AgentTreeCache(build=stub_tree)
+        pipelines = ChannelPipelines(trees=trees)
+        service = JobService(
+            pipelines.get(), workers=2, channel_pipelines=pipelines
+        ).start()
+        with pytest.raises(KeyError):
+            await service.submit("Unknown", channel_profile="missing")
+        default = await service.submit("Default channel")
+        cooking = await service.submit("Cooking", channel_profile="cooking")
+        await service.wait(default.id, timeout=60)
+        await service.wait(cooking.id, timeout=60)
+        await service.close()
+        return trees, default, cooking
+
+    trees, default, cooking = asyncio.run(main())
+    assert default.status == DONE and cooking.status == DONE
+    planner = trees.get(ChannelInfo(channel_name="Cook TV")).find_agent(
+        "script_panner"
+    )
+    assert "Cook TV" in str(planner.instruction)
+    assert len(trees) == 2
+
+
+def test_job_fails_when_its_profile_is_gone(tmp_path, monkeypatch):
+    monkeypatch.setattr(channel_profiles.profile_store, "directory", str(tmp_path))
+    channel_profiles.profile_store.save("cooking", ChannelInfo(channel_name="Cook TV"))
+
+    async def main():
+        pipelines = ChannelPipelines(trees=AgentTreeCache(build=stub_tree))
+        service = JobService(pipelines.get(), channel_pipelines=pipelines)
+        job = await service.submit("Cooking", channel_profile="cooking")
+        monkeypatch.setattr(
+            channel_profiles.profile_store, "directory", str(tmp_path / "empty")
+        )
+        service.start()
+        await service.wait(job.id, timeout=60)
+        await service.close()
+        return job
+
+    job = asyncio.run(main())
+    assert job.status == FAILED and "not found" in job.error
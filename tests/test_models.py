@@ -0,0 +1,19 @@
+from script_writer_agent.config import config
+from script_writer_agent.models import model_for
+
+
+def test_agent_entry_wins_over_its_group(monkeypatch):
+    monkeypatch.setattr(config, "model_fallback_enabled", False)
+    monkeypatch.setattr(config, "main_model", "gemini-2.5-flash")
+    monkeypatch.setattr(
+        config,
+        "agent_models",
+        {
+            "platform_researcher": "gemini-2.5-flash-lite",
+            "reddit_researcher": "gemini-2.5-pro",
+        },
+    )
+    group = "platform_researcher"
+    assert model_for("google_researcher", group=group).model == "gemini-2.5-flash-lite"
+    assert model_for("reddit_researcher", group=group).model == "gemini-2.5-pro"
+    assert model_for("script_writer").model == "gemini-2.5-flash"
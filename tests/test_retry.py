@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from script_writer_agent import retry
+from script_writer_agent.retry import (
+    CircuitBreaker,
+    CircuitOpenError,
+    RetryPolicy,
+    call_with_retry,
+)
+
+NO_RETRIES = RetryPolicy(max_attempts=1)
+
+
+def open_breaker(monkeypatch) -> CircuitBreaker:
+    """Return a breaker that has opened and is due for a trial call"""
+    now = [100.0]
+    monkeypatch.setattr(retry.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker("m", failure_threshold=1, reset_seconds=10)
+    breaker.record_failure()
+    assert breaker.state == "open"
+    now[0] += 10
+    assert breaker.state == "half_open"
+    return breaker
+
+
+async def succeed() -> str:
+    return "ok"
+
+
+def test_retryable_errors_are_retried():
+    attempts = []
+
+    async def flaky() -> str:
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ConnectionError("dropped")
+        return "ok"
+
+    breaker = CircuitBreaker("m", failure_threshold=5, reset_seconds=10)
+    policy = RetryPolicy(max_attempts=3, initial_backoff_seconds=0)
+
+    assert asyncio.run(call_with_retry(flaky, breaker, policy)) == "ok"
+    assert len(attempts) == 3
+    assert breaker.failures == 0
+
+
+def test_cancelled_trial_frees_the_trial_slot(monkeypatch):
+    breaker = open_breaker(monkeypatch)
+
+    async def cancel_trial() -> None:
+        task = asyncio.ensure_future(
+            call_with_retry(lambda: asyncio.sleep(60), breaker, NO_RETRIES)
+        )
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_trial())
+
+    assert breaker.state == "half_open"
+    assert asyncio.run(call_with_retry(succeed, breaker, NO_RETRIES)) == "ok"
+    assert breaker.state == "closed"
+
+
+def test_non_retryable_error_does_not_close_the_circuit(monkeypatch):
+    breaker = open_breaker(monkeypatch)
+
+    async def invalid_request() -> None:
+        raise ValueError("invalid request")
+
+    with pytest.raises(ValueError):
+        asyncio.run(call_with_retry(invalid_request, breaker, NO_RETRIES))
+
+    assert breaker.state == "half_open"
+    assert breaker.failures == 1
+    # The trial slot is free for the next call
+    assert asyncio.run(call_with_retry(succeed, breaker, NO_RETRIES)) == "ok"
+
+
+def test_non_retryable_error_does_not_reset_failures():
+    breaker = CircuitBreaker("m", failure_threshold=2, reset_seconds=10)
+    breaker.record_failure()
+
+    async def invalid_request() -> None:
+        raise ValueError("invalid request")
+
+    with pytest.raises(ValueError):
+        asyncio.run(call_with_retry(invalid_request, breaker, NO_RETRIES))
+
+    assert breaker.failures == 1
+
+
+def test_open_circuit_fails_fast(monkeypatch):
+    breaker = open_breaker(monkeypatch)
+    breaker.before_call()
+
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(call_with_retry(succeed, breaker, NO_RETRIES))
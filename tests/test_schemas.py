@@ -0,0 +1,74 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from google.adk.models import LlmResponse
+from google.genai import types
+
+from script_writer_agent.schemas import (
+    VALIDATION_DATA_KEY,
+    StructuredOutput,
+    StructuredOutputCallback,
+    ValidationResult,
+    validation_result,
+)
+
+RESULT = {
+    "status": "REQUIRES CHANGES",
+    "issues": ["The hook is missing"],
+    "required_changes": ["Open with the problem"],
+}
+
+
+def make_response(text: str, partial: bool = False) -> LlmResponse:
+    return LlmResponse(
+        content=types.Content(role="model", parts=[types.Part(text=text)]),
+        partial=partial,
+    )
+
+
+def test_structured_output_requires_to_markdown():
+    class Incomplete(StructuredOutput):
+        title: str
+
+    with pytest.raises(TypeError):
+        Incomplete(title="x")
+
+
+def test_json_reply_is_stored_as_data_and_shown_as_markdown():
+    callback = StructuredOutputCallback(VALIDATION_DATA_KEY, ValidationResult)
+    context = SimpleNamespace(state={})
+    response = make_response(f"```json\n{json.dumps(RESULT)}\n```")
+
+    callback(context, response)
+
+    markdown = response.content.parts[0].text
+    assert markdown.startswith("**COMPLIANCE STATUS: REQUIRES CHANGES**")
+    assert context.state[VALIDATION_DATA_KEY]["required_changes"] == [
+        "Open with the problem"
+    ]
+    # The output key is saved from the rewritten reply, so the data matches it
+    result = validation_result({**context.state, "validation_result": markdown})
+    assert result is not None and not result.approved
+
+
+def test_invalid_reply_is_kept_as_it_is():
+    callback = StructuredOutputCallback(VALIDATION_DATA_KEY, ValidationResult)
+    context = SimpleNamespace(state={VALIDATION_DATA_KEY: RESULT})
+    response = make_response("**COMPLIANCE STATUS: APPROVED**")
+
+    callback(context, response)
+
+    assert response.content.parts[0].text == "**COMPLIANCE STATUS: APPROVED**"
+    assert context.state[VALIDATION_DATA_KEY] is None
+
+
+def test_partial_responses_are_left_alone():
+    callback = StructuredOutputCallback(VALIDATION_DATA_KEY, ValidationResult)
+    context = SimpleNamespace(state={})
+    response = make_response('{"status": "APPROVED"', partial=True)
+
+    callback(context, response)
+
+    assert response.content.parts[0].text == '{"status": "APPROVED"'
+    assert context.state == {}
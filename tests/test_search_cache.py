@@ -0,0 +1,124 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from script_writer_agent import search_cache as search_cache_module
+from script_writer_agent.retry import CircuitOpenError
+from script_writer_agent.search_budget import SearchBudget
+from script_writer_agent.search_cache import SearchCache, normalize_query
+
+
+class StubSearchBackend:
+    """Answers every query after ``delay`` seconds, or raises ``error``"""
+
+    def __init__(self, delay: float = 0.0, error: Exception = None):
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    async def search(self, query: str) -> dict:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return {"query": query, "summary": f"results for {query}"}
+
+
+def test_normalize_query_drops_case_and_filler_words():
+    assert normalize_query("The MLflow model registry?") == normalize_query(
+        "mlflow  model registry"
+    )
+
+
+@pytest.mark.parametrize(
+    "query, other",
+    [
+        ("migrate postgres to mysql", "migrate mysql to postgres"),
+        ('"model registry" mlflow', "model registry mlflow"),
+        ("mlflow -databricks", "mlflow databricks"),
+        ("site:reddit.com mlflow", "reddit.com mlflow"),
+    ],
+)
+def test_normalize_query_keeps_order_and_operators(query, other):
+    assert normalize_query(query) != normalize_query(other)
+
+
+def test_concurrent_queries_share_one_backend_call():
+    backend = StubSearchBackend(delay=0.01)
+    cache = SearchCache(backend, store=None, ttl_seconds=60)
+
+    async def search_concurrently():
+        return await asyncio.gather(
+            cache.search("mlflow registry", "s"), cache.search("MLflow registry", "s")
+        )
+
+    first, second = asyncio.run(search_concurrently())
+
+    assert first == second
+    assert backend.calls == 1
+    assert cache.session_stats("s")["deduplicated"] == 1
+
+
+def test_cancelled_caller_does_not_cancel_other_waiters():
+    backend = StubSearchBackend(delay=0.05)
+    cache = SearchCache(backend, store=None, ttl_seconds=60)
+
+    async def cancel_first_caller():
+        first = asyncio.ensure_future(cache.search("mlflow registry"))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(cache.search("mlflow registry"))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    result = asyncio.run(cancel_first_caller())
+
+    assert result["summary"] == "results for mlflow registry"
+    assert backend.calls == 1
+
+
+def test_web_search_returns_backend_errors_to_the_model(monkeypatch):
+    backend = StubSearchBackend(error=CircuitOpenError("circuit for search is open"))
+    monkeypatch.setattr(
+        search_cache_module,
+        "search_cache",
+        SearchCache(backend, store=None, ttl_seconds=60),
+    )
+    tool_context = SimpleNamespace(
+        _invocation_context=SimpleNamespace(session=SimpleNamespace(id="s")),
+        invocation_id="i",
+        agent_name="researcher",
+    )
+
+    result = asyncio.run(search_cache_module.web_search("mlflow", tool_context))
+
+    assert result["status"] == "error"
+    assert "circuit for search is open" in result["message"]
+
+
+def test_only_cache_misses_count_against_the_budget(monkeypatch):
+    backend = StubSearchBackend()
+    monkeypatch.setattr(
+        search_cache_module,
+        "search_cache",
+        SearchCache(backend, store=None, ttl_seconds=60),
+    )
+    monkeypatch.setattr(
+        search_cache_module,
+        "search_budget",
+        SearchBudget(max_per_session=0, max_per_agent=1),
+    )
+    tool_context = SimpleNamespace(
+        _invocation_context=SimpleNamespace(session=SimpleNamespace(id="s")),
+        invocation_id="i",
+        agent_name="researcher",
+    )
+
+    async def search(query):
+        return await search_cache_module.web_search(query, tool_context)
+
+    assert asyncio.run(search("mlflow registry"))["summary"]
+    assert asyncio.run(search("The MLflow registry?"))["summary"]
+    assert asyncio.run(search("mlflow tracking"))["status"] == "budget_exhausted"
+    assert backend.calls == 1
@@ -0,0 +1,110 @@
+import asyncio
+import re
+from typing import AsyncGenerator, List
+
+from google.adk.agents import Agent
+from google.adk.events import Event
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from benchmarks.stub_model import SAMPLE_OUTLINE
+from script_writer_agent.agent_utils import merge_agent_runs
+from script_writer_agent.sub_agents.section_writer import (
+    create_section_parallel_writer,
+    plan_script_sections,
+)
+
+_SECTION_PATTERN = re.compile(r"## Your Section \((\d+) of (\d+)\): (.+)")
+
+
+class SectionStubLlm(BaseLlm):
+    """Writes the section named in the instruction; later sections finish first"""
+
+    model: str = "section-stub"
+    finished: List[str] = []
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        number, count, heading = _SECTION_PATTERN.search(
+            str(llm_request.config.system_instruction)
+        ).groups()
+        await asyncio.sleep((int(count) - int(number)) * 0.02)
+        self.finished.append(heading)
+        text = f"## {heading}\n\nAbout {heading.lower()}."
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text=text)])
+        )
+
+
+def test_sections_follow_the_roadmap_then_the_solution():
+    plans = plan_script_sections(SAMPLE_OUTLINE)
+    assert [plan["heading"] for plan in plans] == [
+        "1. How silent failures happen",
+        "2. Why teams miss them",
+        "3. Tracking models with MLflow",
+        "4. Solution options",
+        "Weaknesses and Constraints",
+    ]
+    assert plans[0]["previous_heading"] == "none"
+    assert plans[1]["next_heading"] == "3. Tracking models with MLflow"
+    assert plans[-1]["next_heading"] == "none"
+    assert "Step 2. Systematic solution" in plans[3]["outline"]
+    assert plan_script_sections("# Notes without a roadmap\n") == []
+
+
+def test_merged_events_arrive_as_they_are_produced():
+    async def run(author: str, delays: List[float]):
+        for delay in delays:
+            await asyncio.sleep(delay)
+            yield Event(author=author)
+
+    async def main():
+        return [
+            event.author
+            async for event in merge_agent_runs(
+                [run("slow", [0.03, 0.0]), run("fast", [0.0, 0.01])]
+            )
+        ]
+
+    assert asyncio.run(main()) == ["fast", "fast", "slow", "slow"]
+
+
+def test_script_is_stitched_in_outline_order():
+    llm = SectionStubLlm(finished=[])
+    writer = create_section_parallel_writer(
+        fallback_writer=Agent(name="script_writer", model=llm), max_concurrency=5
+    )
+    for section_writer in writer.section_writers:
+        section_writer.model = llm
+
+    async def main():
+        sessions = InMemorySessionService()
+        await sessions.create_session(
+            app_name="test",
+            user_id="user",
+            session_id="session",
+            state={"script_outline": SAMPLE_OUTLINE},
+        )
+        runner = Runner(agent=writer, app_name="test", session_service=sessions)
+        async for _ in runner.run_async(
+            user_id="user",
+            session_id="session",
+            new_message=types.Content(role="user", parts=[types.Part(text="write")]),
+        ):
+            pass
+        session = await sessions.get_session(
+            app_name="test", user_id="user", session_id="session"
+        )
+        return session.state
+
+    state = asyncio.run(main())
+    headings = [plan["heading"] for plan in plan_script_sections(SAMPLE_OUTLINE)]
+    assert llm.finished == headings[::-1]
+    script = state["script"]
+    assert script.startswith("# What is the worst mistake")
+    positions = [script.index(f"## {heading}") for heading in headings]
+    assert positions == sorted(positions)
+    assert len(state["script_section_cache"]) == len(headings)
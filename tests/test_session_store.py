@@ -0,0 +1,56 @@
+import asyncio
+
+from google.adk.events import Event, EventActions
+from google.genai import types
+
+from script_writer_agent.session_store import SqliteSessionService
+
+APP, USER, SESSION = "script_writer_agent", "user", "session"
+
+
+def test_checkpoint_survives_reopening_the_database(tmp_path):
+    path = str(tmp_path / "sessions.db")
+
+    async def write():
+        service = SqliteSessionService(path)
+        session = await service.create_session(
+            app_name=APP,
+            user_id=USER,
+            session_id=SESSION,
+            state={"app:style": "concise", "user:channel": "MLOps", "temp:x": 1},
+        )
+        await service.append_event(
+            session,
+            Event(
+                author="script_panner",
+                content=types.Content(role="model", parts=[types.Part(text="Outline")]),
+                actions=EventActions(state_delta={"script_outline": "# Outline"}),
+            ),
+        )
+        await service.save_checkpoint(
+            APP, USER, SESSION, "research", {"research_findings": "Findings"}
+        )
+        await service.save_checkpoint(APP, USER, SESSION, "plan", session.state)
+        service.close()
+
+    async def read():
+        service = SqliteSessionService(path)
+        checkpoint = await service.load_checkpoint(APP, USER, SESSION)
+        session = await service.get_session(
+            app_name=APP, user_id=USER, session_id=SESSION
+        )
+        missing = await service.load_checkpoint(APP, USER, "other")
+        service.close()
+        return checkpoint, session, missing
+
+    asyncio.run(write())
+    checkpoint, session, missing = asyncio.run(read())
+
+    assert checkpoint.stages == ["research", "plan"]
+    assert checkpoint.state["script_outline"] == "# Outline"
+    assert missing is None
+    assert session.state["script_outline"] == "# Outline"
+    assert session.state["app:style"] == "concise"
+    assert session.state["user:channel"] == "MLOps"
+    assert "temp:x" not in session.state
+    assert [event.author for event in session.events] == ["script_panner"]
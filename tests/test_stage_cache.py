@@ -0,0 +1,104 @@
+import asyncio
+from typing import AsyncGenerator
+
+import pytest
+from google.adk.agents import LlmAgent
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from script_writer_agent.config import ChannelInfo, config
+from script_writer_agent.disk_cache import DiskCache
+from script_writer_agent.stage_cache import FORCE_REFRESH_KEY, StageCache
+
+INSTRUCTION = "Write a script from the outline."
+OUTLINE = "# Outline\n\n## Hook\nWhy registries matter.\n"
+
+
+class CountingLlm(BaseLlm):
+    """Returns a numbered script so each run's output can be told apart"""
+
+    model: str = "counting-stub"
+    calls: int = 0
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        self.calls += 1
+        text = f"# Script {self.calls}"
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text=text)])
+        )
+
+
+@pytest.fixture
+def store(tmp_path):
+    return DiskCache(directory=str(tmp_path), ttl_seconds=60, max_entries=100)
+
+
+def stage(store, llm, channel_info=None, instruction=INSTRUCTION):
+    cache = StageCache(
+        "script", store, channel_info or ChannelInfo(), ("script_outline",)
+    )
+    return LlmAgent(
+        name="script_writer",
+        model=llm,
+        instruction=instruction,
+        output_key="script",
+        before_agent_callback=cache.before_agent_callback,
+        after_agent_callback=cache.after_agent_callback,
+    )
+
+
+def run(agent, **state):
+    """Run ``agent`` in a fresh session and return the script it leaves in state"""
+
+    async def main():
+        sessions = InMemorySessionService()
+        session = await sessions.create_session(
+            app_name="test",
+            user_id="user",
+            state={"script_outline": OUTLINE, **state},
+        )
+        runner = Runner(agent=agent, app_name="test", session_service=sessions)
+        async for _ in runner.run_async(
+            user_id="user",
+            session_id=session.id,
+            new_message=types.Content(role="user", parts=[types.Part(text="write")]),
+        ):
+            pass
+        session = await sessions.get_session(
+            app_name="test", user_id="user", session_id=session.id
+        )
+        return session.state["script"]
+
+    return asyncio.run(main())
+
+
+def test_identical_inputs_are_served_from_the_store(store):
+    llm = CountingLlm()
+    assert run(stage(store, llm)) == "# Script 1"
+    assert run(stage(store, llm)) == "# Script 1"
+    assert llm.calls == 1
+    assert run(stage(store, llm), script_outline=OUTLINE + "More.\n") == "# Script 2"
+
+
+def test_channel_and_instruction_changes_miss(store):
+    llm = CountingLlm()
+    run(stage(store, llm))
+    assert run(stage(store, llm, ChannelInfo(channel_name="Cook TV"))) == "# Script 2"
+    assert run(stage(store, llm, instruction=INSTRUCTION + " Be brief.")) == (
+        "# Script 3"
+    )
+    assert llm.calls == 3
+
+
+def test_force_refresh_regenerates_and_restores(store, monkeypatch):
+    llm = CountingLlm()
+    run(stage(store, llm))
+    assert run(stage(store, llm), **{FORCE_REFRESH_KEY: True}) == "# Script 2"
+    assert run(stage(store, llm)) == "# Script 2"
+    monkeypatch.setattr(config, "stage_cache_force_refresh", True)
+    assert run(stage(store, llm)) == "# Script 3"
+    assert llm.calls == 3
@@ -0,0 +1,59 @@
+from types import SimpleNamespace
+
+from google.genai import types
+
+from script_writer_agent.config import config
+from script_writer_agent.research_index import state_query
+from script_writer_agent.state_compaction import StateInputs
+
+FINDINGS = """# Research Findings
+
+## Model registry
+MLflow keeps model versions and stage transitions in its registry.
+
+## Serving
+Registered models are served behind a REST endpoint.
+"""
+
+
+def make_context(state, message="go ahead"):
+    return SimpleNamespace(
+        state=state,
+        user_content=types.Content(role="user", parts=[types.Part(text=message)]),
+        _invocation_context=SimpleNamespace(
+            agent=SimpleNamespace(parent_agent=None),
+            session=SimpleNamespace(events=[]),
+            invocation_id="e-1",
+        ),
+    )
+
+
+def make_inputs(monkeypatch, query):
+    monkeypatch.setattr(config, "research_retrieval", True)
+    return StateInputs("research_findings", research_query=query, research_top_k=1)
+
+
+def test_matching_snippets_replace_the_findings(monkeypatch):
+    inputs = make_inputs(monkeypatch, lambda context: "registry stage transitions")
+    prompt = inputs.build_prompt(make_context({"research_findings": FINDINGS}))
+    assert "Relevant Research Findings" in prompt
+    assert "stage transitions" in prompt
+    assert "REST endpoint" not in prompt
+
+
+def test_findings_are_kept_when_nothing_matches(monkeypatch):
+    inputs = make_inputs(monkeypatch, lambda context: "go ahead")
+    prompt = inputs.build_prompt(make_context({"research_findings": FINDINGS}))
+    assert "## Research Findings (state key: research_findings)" in prompt
+    assert "REST endpoint" in prompt
+
+
+def test_state_query_uses_the_topic_instead_of_the_chat_reply():
+    query = state_query("script_outline")
+    context = make_context(
+        {"research_topic": "MLflow model registry", "script_outline": "# Outline"}
+    )
+    assert query(context) == "MLflow model registry\n# Outline"
+
+    without_topic = make_context({}, message="A video about model serving")
+    assert "model serving" in query(without_topic)
@@ -0,0 +1,18 @@
+import pytest
+
+from script_writer_agent.streaming import stage_for_agent
+
+
+@pytest.mark.parametrize(
+    "agent_name, stage",
+    [
+        ("google_researcher", "research"),
+        ("script_section_writer_3", "write"),
+        ("script_director", "direct"),
+        ("script_section_director_0", "direct"),
+        ("written_section_director_4", "direct"),
+        ("script_editor", None),
+    ],
+)
+def test_stage_for_agent(agent_name, stage):
+    assert stage_for_agent(agent_name) == stage
@@ -0,0 +1,135 @@
+from google.adk.events import Event, EventActions
+from google.adk.sessions import Session
+from google.genai import types
+
+from script_writer_agent.markdown_utils import split_sections
+from script_writer_agent.sub_agents.validation_checkers import (
+    artifact_under_review,
+    check_roadmap,
+    check_solution_steps,
+    check_title,
+    check_weaknesses,
+    find_title,
+    validate_artifact,
+)
+
+OUTLINE = """# Outline
+
+Title: How to version models using MLflow?
+
+## Roadmap
+
+### 1. Why registries matter
+### 2. Registering a model
+### 3. Promoting versions
+
+## Solution
+
+### Step 1: Quick win
+### Step 2: Systematic solution
+### Step 3: Overkill solution with extra contingency
+
+## Weaknesses and Constraints
+- Needs a tracking server.
+"""
+
+SCRIPT = """# How to version models using MLflow?
+
+## Hook
+Ever shipped the wrong model to production?
+
+## Registering a model
+Start small: register the model you already have.
+
+## Promoting versions
+Then make promotion part of your pipeline.
+"""
+
+
+def test_valid_outline_passes():
+    assert validate_artifact("script_outline", OUTLINE) == []
+
+
+def test_title_formats():
+    assert check_title("How to version models using MLflow?") == []
+    assert check_title(
+        "What is the worst mistake for ML teams? And how to avoid it using MLflow?"
+    ) == []
+    assert check_title("Versioning models with MLflow")
+    assert check_title(None)
+
+
+def test_title_is_found_in_a_line_or_the_heading():
+    assert find_title(OUTLINE, split_sections(OUTLINE)) == (
+        "How to version models using MLflow?"
+    )
+    assert find_title(SCRIPT, split_sections(SCRIPT)) == (
+        "How to version models using MLflow?"
+    )
+
+
+def test_roadmap_needs_three_to_five_points():
+    assert check_roadmap(split_sections(OUTLINE)) == []
+    two_points = "## Roadmap\n- One\n- Two\n"
+    assert "2 key points" in check_roadmap(split_sections(two_points))[0].issue
+    assert "no roadmap" in check_roadmap(split_sections("# Outline\n"))[0].issue
+
+
+def test_solution_steps_and_weaknesses():
+    assert check_solution_steps(OUTLINE) == []
+    missing = check_solution_steps("Step 1: Quick win only")
+    assert "Systematic solution" in missing[0].issue
+    assert "Overkill" in missing[0].issue
+    assert check_weaknesses(OUTLINE) == []
+    assert check_weaknesses("No caveats at all")
+
+
+def test_scripts_are_not_held_to_outline_labels():
+    assert validate_artifact("script", SCRIPT) == []
+    production = SCRIPT + "\n[CAMERA: close-up]\n"
+    assert validate_artifact("production_script", production) == []
+    assert validate_artifact("production_script", SCRIPT)
+
+
+def test_empty_artifact_is_rejected():
+    assert "empty" in validate_artifact("script", "  ")[0].issue
+
+
+def event(author, state_delta=None, text=None):
+    return Event(
+        author=author,
+        actions=EventActions(state_delta=state_delta or {}),
+        content=types.Content(role=author, parts=[types.Part(text=text)])
+        if text
+        else None,
+    )
+
+
+def session(*events):
+    return Session(id="s", app_name="test", user_id="u", events=list(events))
+
+
+def test_artifact_under_review_is_the_latest_one():
+    assert artifact_under_review(session()) is None
+    assert (
+        artifact_under_review(
+            session(
+                event("user", text="Write about MLflow"),
+                event("script_panner", {"script_outline": OUTLINE}),
+                event("script_writer", {"script": SCRIPT}),
+            )
+        )
+        == "script"
+    )
+
+
+def test_user_message_after_the_artifact_stops_the_review():
+    assert (
+        artifact_under_review(
+            session(
+                event("script_panner", {"script_outline": OUTLINE}),
+                event("user", text="Make the hook shorter"),
+            )
+        )
+        is None
+    )